@@ -1,44 +1,182 @@
-from config import Config
-from flask import Flask, jsonify
-from flask_cors import CORS
-
-from routes.auth_routes import init_auth_routes
-from routes.home_routes import init_home_routes
-from routes.post_routes import init_post_routes
-from routes.project_routes import init_project_routes
-from routes.technology_routes import init_technology_routes
-
-from utilities import db, swagger, jwt
-
-def init_app():
-    app = Flask(__name__)
-    app.config.from_object(Config)
-
-    CORS(app)
-    
-    db.init_app(app)
-    swagger.init_app(app)
-    jwt.init_app(app)
-
-    with app.app_context():
-        db.create_all()
-
-    init_auth_routes(app)
-    init_home_routes(app)
-    init_post_routes(app)
-    init_project_routes(app)
-    init_technology_routes(app)
-
-    @app.errorhandler(404)
-    def error():
-        return jsonify(message="path wasn't found"), 404
-    
-    @app.route('/api/ping')
-    def ping():
-        return jsonify({"status": "alive", "message": "Server is awake!"}), 200
-
-    return app
-
-if __name__ == '__main__':
-    app = init_app()
+import json
+import time
+
+started = time.perf_counter()
+
+from config import Config
+from flask import Flask, jsonify, request
+from flask_cors import CORS
+from flask_jwt_extended import jwt_required, verify_jwt_in_request
+
+from routes.asset_routes import init_asset_routes
+from routes.auth_routes import init_auth_routes
+from routes.home_routes import init_home_routes
+from routes.post_routes import init_post_routes
+from routes.project_routes import init_project_routes
+from routes.search_routes import init_search_routes
+from routes.technology_routes import init_technology_routes
+from services.post_service import PostService
+from services.project_service import ProjectService
+from services.search_service import search_index
+from services.technology_service import TechnologyService, technology_index
+
+from images import init_images
+from instrumentation import access_logger
+from migrations import init_migrations
+from models.post import Post
+from models.projects import Project
+from models.technology import GROUPS
+from utilities import db, swagger, jwt, login_guard, cache, compression, instrumentation, metrics, scheduler, snapshot, rate_limiter, ping_database, pool_stats, json_page, json_rows, Page, JSONProvider
+
+import_seconds = time.perf_counter() - started
+
+def init_app():
+    init_started = time.perf_counter()
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.json = JSONProvider(app)
+
+    CORS(app)
+    
+    db.init_app(app)
+    instrumentation.init_app(app, db)
+    metrics.init_app(app)
+    swagger.init_app(app)
+    jwt.init_app(app)
+    login_guard.init_app(app)
+    cache.init_app(app)
+    compression.init_app(app)
+    scheduler.init_app(app)
+    snapshot.init_app(app, cache)
+    # Last, so its middleware runs first
+    rate_limiter.init_app(app)
+
+    if app.config['CREATE_SCHEMA']:
+        with app.app_context():
+            db.create_all()
+
+    init_auth_routes(app)
+    init_home_routes(app)
+    init_post_routes(app)
+    init_project_routes(app)
+    init_technology_routes(app)
+    init_search_routes(app)
+    init_asset_routes(app)
+
+    init_migrations(app)
+    init_images(app)
+
+    @app.errorhandler(404)
+    def error(e):
+        return jsonify(message="path wasn't found"), 404
+    
+    @app.route('/api/ping')
+    def ping():
+        return jsonify({"status": "alive", "message": "Server is awake!"}), 200
+
+    @app.route('/api/pool')
+    @jwt_required()
+    def pool():
+        stats = pool_stats()
+        app.logger.debug('db pool: %s', stats)
+        return jsonify(stats), 200
+
+    @app.route('/api/cache')
+    @jwt_required()
+    def cache_stats():
+        return jsonify(cache.stats()), 200
+
+    metrics.register('db_pool', pool_stats)
+    metrics.register(
+        'cache',
+        lambda: {key: cache.stats()[key] for key in ('entries', 'hits', 'misses', 'sync_errors')},
+        counters=('hits', 'misses', 'sync_errors')
+    )
+
+    @app.route('/api/metrics')
+    def metrics_endpoint():
+        # A static token for scrapers, otherwise an admin JWT like the other stats endpoints
+        token = app.config['METRICS_TOKEN']
+        if token:
+            if request.headers.get('Authorization') != f'Bearer {token}':
+                return jsonify(message='Error. Invalid metrics token'), 401
+        else:
+            verify_jwt_in_request()
+
+        return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    # The same bodies as the *_json lists, built from the database rather than this worker's cache
+    snapshot.add('/api/post/list', ('posts',), lambda: json_page(Post, PostService.get_all_posts(), None, Page()))
+    snapshot.add('/api/project/list', ('projects',), lambda: json_page(Project, ProjectService.get_all_projects(), None, Page()))
+    snapshot.add('/api/technology/list', ('technologies',), lambda: json_rows(TechnologyService.get_all_technologys()))
+    for group in GROUPS:
+        snapshot.add(
+            f'/api/technology/list/{group}',
+            ('technologies',),
+            lambda group=group: json_rows(TechnologyService.get_technologies_by_group(group)),
+            public=False
+        )
+    metrics.register('snapshot', lambda: {'hits': snapshot.hits}, counters=True)
+    metrics.register('rate_limit', lambda: {
+        key: value for key, value in rate_limiter.stats().items() if key != 'backend'
+    }, counters=('limited', 'shed', 'fallbacks'))
+    metrics.register('auth', lambda: {
+        **{f'jwt_cache_{key}': value for key, value in jwt.stats().items()},
+        **{f'login_{key}': value for key, value in login_guard.stats().items()},
+    }, counters=('jwt_cache_hits', 'jwt_cache_misses', 'login_throttled', 'login_busy'))
+
+    refresh_interval = app.config['SCHEDULER_REFRESH_INTERVAL']
+    scheduler.add('db_ping', app.config['SCHEDULER_PING_INTERVAL'], ping_database)
+    scheduler.add('cache_refresh', refresh_interval, lambda: cache.refresh(2 * refresh_interval))
+    scheduler.add('cache_warm', cache.ttl, lambda: warm_caches(app))
+    scheduler.add('search_reload', cache.ttl, search_index.reload)
+    cache.on_invalidate(reset_indexes)
+    if rate_limiter.enabled:
+        scheduler.add('rate_limit_prune', 60, rate_limiter.prune)
+    metrics.register('scheduler', lambda: {
+        f'{name}_{key}': job[key]
+        for name, job in scheduler.stats()['jobs'].items()
+        for key in ('runs', 'failures')
+    }, counters=True)
+
+    @app.route('/api/scheduler')
+    @jwt_required()
+    def scheduler_stats():
+        return jsonify(scheduler.stats()), 200
+
+    @app.route('/api/timings')
+    @jwt_required()
+    def timings():
+        return jsonify(instrumentation.stats()), 200
+
+    startup = {'import_seconds': import_seconds, 'init_seconds': time.perf_counter() - init_started}
+    metrics.register('startup', lambda: startup)
+    access_logger.info(json.dumps({
+        'startup': 'ready',
+        'import_ms': round(import_seconds * 1000, 2),
+        'init_ms': round(startup['init_seconds'] * 1000, 2),
+    }))
+
+    return app
+
+def reset_indexes(collections: tuple[str, ...]):
+    # Another worker wrote: the in-memory indexes are loaded again on their next use
+    if 'technologies' in collections:
+        technology_index.reset()
+    if {'posts', 'projects'} & set(collections):
+        search_index.reset()
+
+def warm_caches(app):
+    with app.app_context():
+        PostService.get_all_posts_json()
+        ProjectService.get_all_projects_json()
+        TechnologyService.get_all_technologys_json()
+        TechnologyService.get_technologies_grouped_json()
+
+    # Also catches writes made outside the app, e.g. by `flask migrate`
+    if snapshot.directory:
+        snapshot.export()
+
+if __name__ == '__main__':
+    app = init_app()
     app.run(port=8000)
\ No newline at end of file
@@ -0,0 +1,9 @@
+from async_app import init_async_app
+
+# uvicorn asgi:application --host 0.0.0.0 --port 10000
+application = init_async_app()
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(application, port=8000)
@@ -0,0 +1,154 @@
+import io
+import sys
+
+from werkzeug.exceptions import HTTPException
+
+from app import init_app
+from routes.async_routes import init_async_routes
+from utilities import async_db, instrumentation, rate_limiter, snapshot, stream_format
+
+
+def build_environ(scope: dict) -> dict:
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+
+        value = value.decode('latin-1')
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+
+    return environ
+
+
+class AsyncApp:
+    """ASGI front of the Flask app.
+
+    GET routes with an async view are served on the event loop through
+    AsyncSession, with the usual Flask request context, hooks and error
+    handlers. Everything else goes to the WSGI app through WsgiToAsgi.
+    """
+
+    def __init__(self, app):
+        from asgiref.wsgi import WsgiToAsgi
+
+        self.app = app
+        self.wsgi = WsgiToAsgi(app)
+        self.views = {}
+
+    def view(self, endpoint: str):
+        def decorator(func):
+            self.views[endpoint] = func
+            return func
+
+        return decorator
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            environ = build_environ(scope)
+            try:
+                endpoint, _ = self.app.url_map.bind_to_environ(environ).match()
+            except HTTPException:
+                endpoint = None
+
+            # A prerendered snapshot is cheaper still, the WSGI middleware serves it.
+            # Streamed lists need the sync session's server-side cursor
+            view = self.views.get(endpoint)
+            if view is not None and snapshot.match(environ) is None and stream_format(environ) is None:
+                # The WSGI path goes through the rate limiter middleware, async views check it here
+                rejected = await rate_limiter.check_async(environ)
+                if rejected is not None:
+                    return await self._send(rejected, scope['method'], send)
+
+                rate_limiter.enter()
+                try:
+                    return await self._dispatch(view, environ, send)
+                finally:
+                    rate_limiter.leave()
+
+        await self.wsgi(scope, receive, send)
+
+    async def _dispatch(self, view, environ: dict, send):
+        app = self.app
+        context = app.request_context(environ)
+        context.push()
+
+        try:
+            try:
+                response = app.preprocess_request()
+                if response is None:
+                    response = await view(**context.request.view_args)
+                response = app.make_response(response)
+            except Exception as e:
+                try:
+                    response = app.make_response(app.handle_user_exception(e))
+                except Exception as e:
+                    response = app.handle_exception(e)
+
+            response = app.process_response(response)
+            await self._send(response, environ['REQUEST_METHOD'], send)
+
+        finally:
+            context.pop()
+
+    @staticmethod
+    async def _send(response, method: str, send):
+        headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in response.headers.items()]
+        await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+
+        try:
+            if method != 'HEAD':
+                for chunk in response.iter_encoded():
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            response.close()
+
+    @staticmethod
+    async def _lifespan(receive, send):
+        while True:
+            message = await receive()
+
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+
+            elif message['type'] == 'lifespan.shutdown':
+                await async_db.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def init_async_app(app=None):
+    app = app or init_app()
+
+    async_db.init_app(app)
+    instrumentation.listen(async_db.engine.sync_engine)
+
+    async_app = AsyncApp(app)
+    init_async_routes(async_app)
+
+    return async_app
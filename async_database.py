@@ -0,0 +1,25 @@
+from config import async_engine_options, async_url
+
+
+class AsyncDatabase:
+    """AsyncSession factory for the ASGI entry point, over the same database as db."""
+
+    def __init__(self):
+        self.engine = None
+        self._sessionmaker = None
+
+    def init_app(self, app):
+        # Imported here so the WSGI mode runs without greenlet and the async drivers
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        uri = async_url(app.config['SQLALCHEMY_DATABASE_URI'])
+        self.engine = create_async_engine(uri, **async_engine_options(uri))
+        self._sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+        app.extensions['async_db'] = self
+
+    def session(self):
+        return self._sessionmaker()
+
+    async def dispose(self):
+        if self.engine is not None:
+            await self.engine.dispose()
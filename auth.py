@@ -0,0 +1,134 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+
+from flask_jwt_extended import JWTManager
+from werkzeug.security import check_password_hash
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that remembers the claims of tokens it has already verified.
+
+    Protected routes see the same admin token over and over, so the signature
+    check runs once per token and process. Entries are keyed by the token
+    digest and dropped at the token's exp; expired and CSRF-bound decodes
+    always take the full path.
+    """
+
+    def __init__(self, app=None, add_context_processor: bool = False, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._claims: OrderedDict[bytes, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        super().__init__(app, add_context_processor)
+
+    def init_app(self, app, add_context_processor: bool = False):
+        super().init_app(app, add_context_processor)
+        self.max_entries = app.config.get('JWT_CACHE_SIZE', self.max_entries)
+        self.clear()
+
+    def _decode_jwt_from_config(self, encoded_token: str, csrf_value=None, allow_expired: bool = False) -> dict:
+        if allow_expired or csrf_value is not None or not self.max_entries:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        key = hashlib.sha256(encoded_token.encode()).digest()
+        with self._lock:
+            claims = self._claims.get(key)
+            if claims is not None and claims.get('exp', math.inf) > time.time():
+                self._claims.move_to_end(key)
+                self.hits += 1
+                return dict(claims)
+
+            self._claims.pop(key, None)
+            self.misses += 1
+
+        claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        with self._lock:
+            self._claims[key] = claims
+            while len(self._claims) > self.max_entries:
+                self._claims.popitem(last=False)
+
+        return dict(claims)
+
+    def clear(self):
+        with self._lock:
+            self._claims.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, any]:
+        with self._lock:
+            return {'entries': len(self._claims), 'hits': self.hits, 'misses': self.misses}
+
+
+class LoginGuard:
+    """Sliding-window limit of login attempts per client, and a bound on
+    concurrent password hashing so a burst of logins cannot take every
+    worker thread."""
+
+    def __init__(self, attempts: int = 5, window: float = 60.0, concurrency: int = 1, timeout: float = 1.0):
+        self.attempts = attempts
+        self.window = window
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.throttled = 0
+        self.busy = 0
+
+        self._clients: dict[str, deque] = {}
+        self._semaphore = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.attempts = app.config.get('LOGIN_RATE_LIMIT', self.attempts)
+        self.window = app.config.get('LOGIN_RATE_WINDOW', self.window)
+        self.concurrency = app.config.get('LOGIN_HASH_CONCURRENCY', self.concurrency)
+        self.timeout = app.config.get('LOGIN_HASH_TIMEOUT', self.timeout)
+        self.throttled = 0
+        self.busy = 0
+
+        self._clients = {}
+        self._semaphore = threading.BoundedSemaphore(self.concurrency)
+        app.extensions['login_guard'] = self
+
+    def hit(self, client: str) -> int:
+        # Records an attempt and returns 0, or the seconds until the client may retry
+        now = time.monotonic()
+        with self._lock:
+            attempts = self._clients.setdefault(client, deque())
+            while attempts and attempts[0] <= now - self.window:
+                attempts.popleft()
+
+            if len(attempts) >= self.attempts:
+                self.throttled += 1
+                return max(math.ceil(attempts[0] + self.window - now), 1)
+
+            attempts.append(now)
+
+            # Forget idle clients once in a while
+            if len(self._clients) > 4096:
+                self._clients = {key: value for key, value in self._clients.items() if value and value[-1] > now - self.window}
+
+        return 0
+
+    def reset(self, client: str):
+        with self._lock:
+            self._clients.pop(client, None)
+
+    def check_password(self, pwhash: str, password: str) -> bool:
+        if not self._semaphore.acquire(timeout=self.timeout):
+            with self._lock:
+                self.busy += 1
+            raise TimeoutError('Too many concurrent logins')
+
+        try:
+            return check_password_hash(pwhash, password)
+        finally:
+            self._semaphore.release()
+
+    def stats(self) -> dict[str, any]:
+        return {'throttled': self.throttled, 'busy': self.busy}
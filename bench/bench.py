@@ -0,0 +1,224 @@
+# Benchmark of the API against a local database seeded with generated data.
+#
+#   python bench/bench.py --sizes 100,10000 --requests 500 --concurrency 8 --output results.json
+#   python bench/bench.py --compare before.json after.json
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('SECRET_KEY', 'bench-secret-key')
+os.environ.setdefault('JWT_SECRET_KEY', 'bench-jwt-secret-key-with-enough-length')
+os.environ.setdefault('ADMIN_USERNAME', 'admin')
+os.environ.setdefault('ADMIN_PASSWORD', 'admin')
+os.environ.setdefault('SCHEDULER_ENABLED', 'false')
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+os.environ.setdefault('ACCESS_LOG', 'false')
+
+GROUPS = ('fund', 'ide_os', 'lang_tech')
+TEXT = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 20
+
+
+def routes(size: int) -> list[tuple[str, str, bool]]:
+    middle = max(size // 2, 1)
+    return [
+        ('post list', '/api/post/list', False),
+        ('post list page', '/api/post/list?limit=20&sort=date&order=desc', False),
+        ('post list fields', '/api/post/list?fields=id,label', False),
+        ('project list', '/api/project/list', False),
+        ('technology list', '/api/technology/list', False),
+        ('technology groups', '/api/technology/groups', True),
+        ('technology group', '/api/technology/list/lang_tech', True),
+        ('post by id', f'/api/post/{middle}', True),
+        ('project by id', f'/api/project/{middle}', True),
+        ('technology by id', f'/api/technology/{middle}', True),
+    ]
+
+
+def seed(app, size: int):
+    from sqlalchemy import insert
+
+    from models.post import Post
+    from models.projects import Project
+    from models.technology import Technology
+    from utilities import db
+
+    start = date(2020, 1, 1)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        for offset in range(0, size, 1000):
+            batch = range(offset, min(offset + 1000, size))
+            db.session.execute(insert(Post), [{
+                'label': f'Post {index}', 'text': TEXT, 'img': f'posts/{index}.jpg',
+                'date': start + timedelta(days=index % 2000), 'link': f'https://example.com/posts/{index}',
+                'mode': index % 3 != 0,
+            } for index in batch])
+            db.session.execute(insert(Project), [{
+                'label': f'Project {index}', 'text': TEXT, 'img': f'projects/{index}.png',
+                'stack': 'Python, Flask, React', 'link': f'https://example.com/projects/{index}',
+                'mode': index % 3 != 0,
+            } for index in batch])
+            db.session.execute(insert(Technology), [{
+                'label': f'Technology {index}', 'img': f'technologies/{index}.png',
+                'group': GROUPS[index % len(GROUPS)], 'mode': True,
+            } for index in batch])
+
+        db.session.commit()
+
+
+def percentile(values: list[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * share), len(ordered) - 1)]
+
+
+def run_route(app, url: str, headers: dict, requests: int, concurrency: int, queries) -> dict:
+    local = threading.local()
+    latencies, counts, statuses = [], [], {}
+    lock = threading.Lock()
+
+    def call(_):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+
+        queries.count = 0
+        started = time.perf_counter()
+        response = local.client.get(url, headers=headers)
+        response.get_data()
+        elapsed = time.perf_counter() - started
+
+        with lock:
+            latencies.append(elapsed * 1000)
+            counts.append(queries.count)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, range(requests)))
+    total = time.perf_counter() - started
+
+    return {
+        'requests': requests,
+        'statuses': {str(status): count for status, count in statuses.items()},
+        'throughput': requests / total,
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'mean': statistics.fmean(latencies),
+        'queries': statistics.fmean(counts),
+    }
+
+
+def benchmark(size: int, requests: int, concurrency: int, database: str | None, use_cache: bool) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        from sqlalchemy import event
+        from flask_jwt_extended import create_access_token
+
+        from app import init_app
+        from config import Config, engine_options
+        from services.technology_service import technology_index
+        from utilities import db, cache
+
+        Config.SQLALCHEMY_DATABASE_URI = database or f'sqlite:///{os.path.join(directory, "bench.db")}'
+        Config.SQLALCHEMY_ENGINE_OPTIONS = engine_options(Config.SQLALCHEMY_DATABASE_URI)
+
+        app = init_app()
+        seed(app, size)
+        technology_index.reset()
+
+        queries = threading.local()
+        with app.app_context():
+            headers = {'Authorization': f'Bearer {create_access_token(identity="admin")}'}
+
+            @event.listens_for(db.engine, 'before_cursor_execute')
+            def count(*args):
+                queries.count = getattr(queries, 'count', 0) + 1
+
+        results = {}
+        for name, url, protected in routes(size):
+            cache.clear()
+            cache.max_entries = app.config['CACHE_MAX_ENTRIES'] if use_cache else 0
+            results[name] = run_route(app, url, headers if protected else {}, requests, concurrency, queries)
+            print(
+                f'{size:>7} {name:<20} p50 {results[name]["p50"]:8.2f} ms  p95 {results[name]["p95"]:8.2f} ms  '
+                f'p99 {results[name]["p99"]:8.2f} ms  {results[name]["throughput"]:8.1f} rps  '
+                f'{results[name]["queries"]:.2f} sql/req'
+            )
+
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+        return results
+
+
+def revision() -> str | None:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(before_path: str, after_path: str):
+    with open(before_path) as file:
+        before = json.load(file)
+    with open(after_path) as file:
+        after = json.load(file)
+
+    print(f'{before.get("revision")} -> {after.get("revision")}')
+    for size, named in after['results'].items():
+        for name, result in named.items():
+            previous = before['results'].get(size, {}).get(name)
+            if not previous:
+                continue
+
+            change = (result['p95'] - previous['p95']) / previous['p95'] * 100 if previous['p95'] else 0.0
+            print(
+                f'{size:>7} {name:<20} p95 {previous["p95"]:8.2f} -> {result["p95"]:8.2f} ms ({change:+6.1f}%)  '
+                f'sql/req {previous["queries"]:.2f} -> {result["queries"]:.2f}'
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark API routes against a local seeded database')
+    parser.add_argument('--sizes', default='100,10000', help='comma-separated numbers of rows per table')
+    parser.add_argument('--requests', type=int, default=200, help='requests per route')
+    parser.add_argument('--concurrency', type=int, default=4, help='concurrent client threads')
+    parser.add_argument('--database', help='database URL, a temporary SQLite file by default')
+    parser.add_argument('--no-cache', action='store_true', help='disable the response cache')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='compare two result files')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = {}
+    for size in (int(size) for size in args.sizes.split(',')):
+        results[str(size)] = benchmark(size, args.requests, args.concurrency, args.database, not args.no_cache)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({
+                'revision': revision(),
+                'requests': args.requests,
+                'concurrency': args.concurrency,
+                'cache': not args.no_cache,
+                'results': results,
+            }, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# Microbenchmark of the JSON encoders on list payloads shaped like the API's posts and projects.
+#
+#   python bench/json_bench.py --sizes 20,100,1000 --repeat 50
+#   python bench/json_bench.py --output json.json
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench import TEXT, revision
+
+
+def posts(size: int) -> list[dict]:
+    start = date(2020, 1, 1)
+    return [{
+        'id': index, 'label': f'Post {index}', 'text': TEXT, 'img': f'posts/{index}.jpg',
+        'date': start + timedelta(days=index % 2000), 'link': f'https://example.com/posts/{index}',
+        'mode': index % 3 != 0,
+    } for index in range(size)]
+
+
+def projects(size: int) -> list[dict]:
+    return [{
+        'id': index, 'label': f'Проект {index}', 'text': TEXT, 'img': f'projects/{index}.png',
+        'stack': 'Python, Flask, React', 'link': f'https://example.com/projects/{index}',
+        'mode': index % 3 != 0,
+    } for index in range(size)]
+
+
+def encoders() -> dict:
+    from flask import Flask
+
+    from utilities import JSONProvider, orjson
+
+    app = Flask(__name__)
+    app.config['JSON_ENCODER'] = 'stdlib'
+
+    # What every list response paid before: the stdlib provider's str, then encoded to bytes
+    previous = JSONProvider(app)
+    found = {'str + encode': lambda data: previous.dumps(data).encode('utf-8')}
+
+    for name in ('stdlib', 'orjson'):
+        if name == 'orjson' and orjson is None:
+            continue
+
+        app.config['JSON_ENCODER'] = name
+        found[name] = JSONProvider(app).dumps_bytes
+
+    return found
+
+
+def measure(encode, data, repeat: int) -> dict:
+    encode(data)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        encode(data)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    return {'median': statistics.median(timings), 'min': min(timings), 'bytes': len(encode(data))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare JSON encoders on post and project list payloads')
+    parser.add_argument('--sizes', default='20,100,1000', help='comma-separated numbers of rows per payload')
+    parser.add_argument('--repeat', type=int, default=50, help='encodings per measurement')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    found = encoders()
+    results = {}
+    for size in (int(size) for size in args.sizes.split(',')):
+        for kind, build in (('posts', posts), ('projects', projects)):
+            data = build(size)
+            named = results.setdefault(f'{kind} {size}', {})
+            for name, encode in found.items():
+                named[name] = measure(encode, data, args.repeat)
+
+            baseline = named['str + encode']['median']
+            for name, result in named.items():
+                print(
+                    f'{kind:<9} {size:>6} {name:<14} median {result["median"]:8.3f} ms  min {result["min"]:8.3f} ms  '
+                    f'{result["bytes"]:>9} B  x{baseline / result["median"]:.2f}'
+                )
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'revision': revision(), 'repeat': args.repeat, 'results': results}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
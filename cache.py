@@ -0,0 +1,301 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from instrumentation import access_logger
+
+
+class CacheEntry:
+    # Only the content ETag validates a response: the tables keep no modification time, and a
+    # process-local bump time would let If-Modified-Since answer 304 for data changed elsewhere
+    __slots__ = ('body', 'version', 'expires_at', 'etag', 'variants', 'builder', 'hit_at')
+
+    def __init__(self, body: bytes, version: int, expires_at: float, builder=None):
+        self.body = body
+        self.version = version
+        self.expires_at = expires_at
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.variants: dict[str, bytes] = {}
+        self.builder = builder
+        self.hit_at = time.monotonic()
+
+
+class SharedVersions:
+    """Collection versions in a SQLite file shared by all gunicorn workers of the host (WAL, no fsync)."""
+
+    def __init__(self, path: str, timeout: float = 0.05):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections are per thread and never cross a fork
+        if getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS versions (collection TEXT PRIMARY KEY, version INTEGER NOT NULL) WITHOUT ROWID'
+            )
+            self._local.connection, self._local.pid = connection, os.getpid()
+
+        return self._local.connection
+
+    def all(self) -> dict[str, int]:
+        return dict(self._connection().execute('SELECT collection, version FROM versions'))
+
+    def bump(self, collections: tuple[str, ...]) -> dict[str, int]:
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            versions = {
+                collection: connection.execute(
+                    'INSERT INTO versions (collection, version) VALUES (?, 1) '
+                    'ON CONFLICT (collection) DO UPDATE SET version = version + 1 RETURNING version',
+                    (collection,)
+                ).fetchone()[0]
+                for collection in collections
+            }
+            connection.execute('COMMIT')
+        except:
+            connection.execute('ROLLBACK')
+            raise
+
+        return versions
+
+
+class ResponseCache:
+    """In-process cache of serialized responses, grouped by collection (table).
+
+    Every write to a collection bumps its version, so entries built before the
+    write are never served again. Versions live in CACHE_VERSION_STORAGE, shared
+    by the workers: a bump in one worker invalidates the entries of the others
+    within CACHE_SYNC_INTERVAL. Without it TTL bounds staleness between workers.
+    """
+
+    def __init__(self, ttl: int = 60, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared: SharedVersions | None = None
+        self.sync_interval = 0.1
+        self.hits = 0
+        self.misses = 0
+        self.sync_errors = 0
+
+        self._versions: dict[str, int] = {}
+        self._entries: OrderedDict[tuple[str, str], CacheEntry] = OrderedDict()
+        self._refreshed_at = 0.0
+        self._synced_at = 0.0
+        self._listeners = []
+        self._invalidate_listeners = []
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('CACHE_TTL', self.ttl)
+        self.max_entries = app.config.get('CACHE_MAX_ENTRIES', self.max_entries)
+        self.sync_interval = app.config.get('CACHE_SYNC_INTERVAL', self.sync_interval)
+
+        storage = app.config.get('CACHE_VERSION_STORAGE')
+        if storage is None:
+            storage = os.path.join(tempfile.gettempdir(), 'ccrayp-cache.sqlite')
+        self.shared = SharedVersions(storage) if storage else None
+        self._synced_at = 0.0
+
+        self._listeners = []
+        self._invalidate_listeners = []
+        app.extensions['response_cache'] = self
+
+    def version(self, collection: str) -> int:
+        return self._versions.get(collection, 0)
+
+    def stamp(self, collections: tuple[str, ...]) -> dict[str, int] | None:
+        # Shared versions, comparable between workers; None when the versions are per process
+        if self.shared is None:
+            return None
+
+        try:
+            versions = self.shared.all()
+        except sqlite3.Error as e:
+            self._sync_failed(e)
+            return None
+
+        return {collection: versions.get(collection, 0) for collection in collections}
+
+    def sync(self):
+        # Picks up the bumps of other workers, at most once per sync_interval
+        if self.shared is None or time.monotonic() - self._synced_at < self.sync_interval:
+            return
+
+        self._synced_at = time.monotonic()
+        try:
+            versions = self.shared.all()
+        except sqlite3.Error as e:
+            self._sync_failed(e)
+            return
+
+        with self._lock:
+            changed = tuple(
+                collection for collection, version in versions.items() if version != self.version(collection)
+            )
+            self._invalidate(changed, versions)
+
+        if changed:
+            for listener in self._invalidate_listeners:
+                listener(changed)
+
+    def _sync_failed(self, error: Exception):
+        with self._lock:
+            self.sync_errors += 1
+            first = self.sync_errors == 1
+        if first:
+            access_logger.warning(json.dumps({'warning': 'cache version storage unavailable', 'error': str(error)}))
+
+    def _invalidate(self, collections: tuple[str, ...], versions: dict[str, int]):
+        # Called with the lock held
+        for collection in collections:
+            self._versions[collection] = versions[collection]
+        for entry_key in [entry_key for entry_key in self._entries if entry_key[0] in collections]:
+            del self._entries[entry_key]
+
+    def get(self, collection: str, key: str) -> CacheEntry | None:
+        self.sync()
+        with self._lock:
+            entry = self._entries.get((collection, key))
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry.version != self.version(collection) or entry.expires_at <= time.monotonic():
+                del self._entries[(collection, key)]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end((collection, key))
+            entry.hit_at = time.monotonic()
+            self.hits += 1
+            return entry
+
+    def set(self, collection: str, key: str, body: bytes, version: int, builder=None) -> CacheEntry:
+        entry = CacheEntry(body, version, time.monotonic() + self.ttl, builder)
+
+        with self._lock:
+            # The data was read before a concurrent write committed
+            if version != self.version(collection):
+                return entry
+
+            self._entries[(collection, key)] = entry
+            self._entries.move_to_end((collection, key))
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return entry
+
+    def fetch(self, collection: str, key: str, builder) -> CacheEntry | None:
+        entry = self.get(collection, key)
+        if entry is not None:
+            return entry
+
+        version = self.version(collection)
+        body = builder()
+        if body is None:
+            return None
+
+        return self.set(collection, key, body, version, builder)
+
+    async def fetch_async(self, collection: str, key: str, builder) -> CacheEntry | None:
+        entry = self.get(collection, key)
+        if entry is not None:
+            return entry
+
+        version = self.version(collection)
+        body = await builder()
+        if body is None:
+            return None
+
+        return self.set(collection, key, body, version)
+
+    def refresh(self, margin: float) -> int:
+        # Only entries requested since the previous refresh are rebuilt, the rest expire
+        self.sync()
+        deadline = time.monotonic() + margin
+        with self._lock:
+            since, self._refreshed_at = self._refreshed_at, time.monotonic()
+            due = [
+                (entry_key, entry) for entry_key, entry in self._entries.items()
+                if entry.builder is not None and entry.expires_at <= deadline and entry.hit_at > since
+            ]
+
+        refreshed = 0
+        for (collection, key), entry in due:
+            version = self.version(collection)
+            if entry.version != version:
+                continue
+
+            body = entry.builder()
+            if body is None:
+                continue
+
+            # Unchanged data keeps the entry, with its ETag and compressed variants
+            if body == entry.body:
+                with self._lock:
+                    if version == self.version(collection):
+                        entry.expires_at = time.monotonic() + self.ttl
+            else:
+                self.set(collection, key, body, version, entry.builder).hit_at = entry.hit_at
+
+            refreshed += 1
+
+        return refreshed
+
+    def bump(self, *collections: str):
+        versions = None
+        if self.shared is not None:
+            try:
+                versions = self.shared.bump(collections)
+            except sqlite3.Error as e:
+                self._sync_failed(e)
+
+        with self._lock:
+            if versions is None:
+                versions = {collection: self.version(collection) + 1 for collection in collections}
+            self._invalidate(collections, versions)
+
+        for listener in self._listeners:
+            listener(collections)
+
+    def on_bump(self, listener):
+        # Called with the bumped collections after every write, outside the lock
+        self._listeners.append(listener)
+
+    def on_invalidate(self, listener):
+        # Called with the collections bumped by other workers, outside the lock
+        self._invalidate_listeners.append(listener)
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+            self._entries.clear()
+            self._refreshed_at = 0.0
+            self._synced_at = 0.0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, any]:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'sync_errors': self.sync_errors,
+                'hit_ratio': self.hits / requests if requests else 0.0,
+                'versions': dict(self._versions),
+            }
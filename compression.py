@@ -0,0 +1,91 @@
+import gzip
+
+from flask import request
+
+from instrumentation import timer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/css', 'application/javascript')
+
+
+class Compression:
+    """Negotiated gzip/brotli compression of responses.
+
+    Dynamic responses are compressed in after_request. Cached entries are
+    compressed once at the maximum level and the result is kept on the entry.
+    """
+
+    def __init__(self, min_size: int = 500, gzip_level: int = 6, brotli_quality: int = 5):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def init_app(self, app):
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', self.min_size)
+        self.gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', self.gzip_level)
+        self.brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', self.brotli_quality)
+
+        app.after_request(self._after_request)
+        app.extensions['compression'] = self
+
+    def negotiate(self, size: int) -> str | None:
+        if size < self.min_size:
+            return None
+
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+
+        return None
+
+    def compress(self, body: bytes, encoding: str, best: bool = False) -> bytes:
+        with timer('compress'):
+            if encoding == 'br':
+                return brotli.compress(body, quality=11 if best else self.brotli_quality)
+
+            return gzip.compress(body, compresslevel=9 if best else self.gzip_level, mtime=0)
+
+    def encode_entry(self, entry) -> tuple[str | None, bytes]:
+        encoding = self.negotiate(len(entry.body))
+        if encoding is None:
+            return None, entry.body
+
+        body = entry.variants.get(encoding)
+        if body is None:
+            body = entry.variants[encoding] = self.compress(entry.body, encoding, best=True)
+
+        return encoding, body
+
+    def _after_request(self, response):
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or not 200 <= response.status_code < 300
+            or 'Content-Encoding' in response.headers
+        ):
+            return response
+
+        encoding = self.negotiate(response.calculate_content_length() or 0)
+        if encoding is None:
+            return response
+
+        response.set_data(self.compress(response.get_data(), encoding))
+        response.headers['Content-Encoding'] = encoding
+
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f'{etag}-{encoding}', weak)
+
+        return response
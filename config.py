@@ -5,15 +5,158 @@ from werkzeug.security import generate_password_hash
 
 load_dotenv()
 
+
+def env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+def engine_options(uri: str | None) -> dict[str, any]:
+    options = {
+        'pool_pre_ping': env_flag('DB_POOL_PRE_PING', True),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 280)),
+    }
+
+    if not uri or uri.startswith('sqlite'):
+        return options
+
+    # One connection per gunicorn thread, overflow absorbs short bursts
+    options['pool_size'] = int(os.getenv('DB_POOL_SIZE', os.getenv('GUNICORN_THREADS', 4)))
+    options['max_overflow'] = int(os.getenv('DB_MAX_OVERFLOW', 2))
+    options['pool_timeout'] = int(os.getenv('DB_POOL_TIMEOUT', 10))
+
+    if uri.startswith('postgres'):
+        options['connect_args'] = {
+            'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 10)),
+            'options': f"-c statement_timeout={int(os.getenv('DB_STATEMENT_TIMEOUT', 10000))}",
+        }
+
+    return options
+
+
+def async_url(uri: str | None) -> str | None:
+    if not uri:
+        return uri
+
+    # Render hands out postgres://, the async engine needs the driver in the scheme
+    for prefix in ('postgres://', 'postgresql://', 'postgresql+psycopg2://'):
+        if uri.startswith(prefix):
+            return 'postgresql+asyncpg://' + uri[len(prefix):]
+
+    if uri.startswith('sqlite://'):
+        return 'sqlite+aiosqlite://' + uri[len('sqlite://'):]
+
+    return uri
+
+
+def async_engine_options(uri: str | None) -> dict[str, any]:
+    options = {
+        'pool_pre_ping': env_flag('DB_POOL_PRE_PING', True),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 280)),
+    }
+
+    if not uri or uri.startswith('sqlite'):
+        return options
+
+    # Hundreds of requests share one worker, the database sees at most pool_size + max_overflow
+    options['pool_size'] = int(os.getenv('ASYNC_DB_POOL_SIZE', 10))
+    options['max_overflow'] = int(os.getenv('ASYNC_DB_MAX_OVERFLOW', 10))
+    options['pool_timeout'] = int(os.getenv('DB_POOL_TIMEOUT', 10))
+
+    if uri.startswith('postgresql+asyncpg'):
+        options['connect_args'] = {
+            'timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 10)),
+            'server_settings': {'statement_timeout': str(int(os.getenv('DB_STATEMENT_TIMEOUT', 10000)))},
+        }
+
+    return options
+
+
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    # create_all() at startup costs a round trip, production creates the schema with `flask migrate`
+    CREATE_SCHEMA = env_flag('CREATE_SCHEMA', (SQLALCHEMY_DATABASE_URI or 'sqlite').startswith('sqlite'))
 
     SECRET_KEY = os.getenv('SECRET_KEY')
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
 
     ADMIN_USERNAME = os.getenv('ADMIN_USERNAME')
-    ADMIN_PASSWORD_HASH = generate_password_hash(os.getenv('ADMIN_PASSWORD'))
+    # A precomputed hash (werkzeug.security.generate_password_hash) spares the cold start a scrypt run
+    ADMIN_PASSWORD_HASH = os.getenv('ADMIN_PASSWORD_HASH') or generate_password_hash(os.getenv('ADMIN_PASSWORD'))
 
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=60)
-    JWT_TOKEN_LOCATION = ['cookies', 'headers']
\ No newline at end of file
+    JWT_TOKEN_LOCATION = ['cookies', 'headers']
+    # Verified claims are kept per process until the token expires
+    JWT_CACHE_SIZE = int(os.getenv('JWT_CACHE_SIZE', 1024))
+
+    # Login attempts per client and window; password hashing runs on at most LOGIN_HASH_CONCURRENCY threads
+    LOGIN_RATE_LIMIT = int(os.getenv('LOGIN_RATE_LIMIT', 5))
+    LOGIN_RATE_WINDOW = float(os.getenv('LOGIN_RATE_WINDOW', 60))
+    LOGIN_HASH_CONCURRENCY = int(os.getenv('LOGIN_HASH_CONCURRENCY', 1))
+    LOGIN_HASH_TIMEOUT = float(os.getenv('LOGIN_HASH_TIMEOUT', 1.0))
+    # Number of proxies in front of the app, used to find the client address for the login
+    # throttle and the rate limiter. Render has one; with 0 every client shares the proxy's
+    # address, run without a proxy only with 0 since X-Forwarded-For can then be forged
+    TRUSTED_PROXIES = int(os.getenv('TRUSTED_PROXIES', 1))
+
+    # Token buckets per client and endpoint, shared by the workers through a SQLite file
+    # (default: in the temp dir, empty string: per process). RATE_LIMIT_ROUTES overrides
+    # single endpoints as "endpoint=rate:burst,...", a rate of 0 disables the limit
+    RATE_LIMIT_ENABLED = env_flag('RATE_LIMIT_ENABLED', True)
+    RATE_LIMIT_RATE = float(os.getenv('RATE_LIMIT_RATE', 10))
+    RATE_LIMIT_BURST = float(os.getenv('RATE_LIMIT_BURST', 40))
+    RATE_LIMIT_ROUTES = os.getenv('RATE_LIMIT_ROUTES', 'search=2:10')
+    RATE_LIMIT_STORAGE = os.getenv('RATE_LIMIT_STORAGE')
+    # /api/metrics is exempt only behind METRICS_TOKEN, with a JWT it is limited like the rest
+    RATE_LIMIT_EXEMPT = ('ping', 'static', 'asset') + (('metrics_endpoint',) if os.getenv('METRICS_TOKEN') else ())
+
+    # Fast 503s instead of requests running into the 30 s worker timeout, 0 disables either check.
+    # SHED_MAX_QUEUE_MS needs a router that sets X-Request-Start (nginx, Heroku); Render does not,
+    # so there only the in-flight check applies. SHED_MAX_IN_FLIGHT counts concurrent requests per
+    # process: a gthread worker never runs more than its threads, so it only bites with the ASGI
+    # worker, where the default sheds past 4 requests per DB connection (GUNICORN_THREADS)
+    SHED_MAX_QUEUE_MS = int(os.getenv('SHED_MAX_QUEUE_MS', 10000))
+    SHED_MAX_IN_FLIGHT = int(os.getenv('SHED_MAX_IN_FLIGHT', 4 * int(os.getenv('GUNICORN_THREADS', 4))))
+    SHED_RETRY_AFTER = int(os.getenv('SHED_RETRY_AFTER', 1))
+
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 60))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 256))
+    # Collection versions shared by the workers through a SQLite file (default: in the temp dir,
+    # empty string: per process); a write in one worker reaches the others within the interval
+    CACHE_VERSION_STORAGE = os.getenv('CACHE_VERSION_STORAGE')
+    CACHE_SYNC_INTERVAL = float(os.getenv('CACHE_SYNC_INTERVAL', 0.1))
+
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 500))
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 5))
+
+    # Directory for prerendered public lists (`flask export-snapshot`), unset disables them
+    SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR')
+
+    ASSETS_URL = os.getenv('ASSETS_URL', '').rstrip('/')
+    ASSETS_MAX_AGE = int(os.getenv('ASSETS_MAX_AGE', 31536000))
+    # Width of the variant returned as img_url next to img; img_srcset lists all of them
+    IMAGE_WIDTH = int(os.getenv('IMAGE_WIDTH', 640))
+
+    # JSON line with the timings of every request; gunicorn already writes the plain access log
+    ACCESS_LOG = env_flag('ACCESS_LOG', False)
+    TIMING_WINDOW = int(os.getenv('TIMING_WINDOW', 1024))
+    QUERY_COUNT_WARNING = int(os.getenv('QUERY_COUNT_WARNING', 20))
+
+    METRICS_DIR = os.getenv('METRICS_DIR') or os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 1.0))
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+    # Background jobs of every worker: SELECT 1 pings and cache refreshes ahead of the TTL
+    SCHEDULER_ENABLED = env_flag('SCHEDULER_ENABLED', True)
+    SCHEDULER_PING_INTERVAL = float(os.getenv('SCHEDULER_PING_INTERVAL', 240))
+    SCHEDULER_REFRESH_INTERVAL = float(os.getenv('SCHEDULER_REFRESH_INTERVAL', 10))
+
+    # auto uses orjson when it is installed, stdlib forces the standard json module
+    JSON_ENCODER = os.getenv('JSON_ENCODER', 'auto')
+
+    # Rows per fetch of streamed list responses (?stream=true or Accept: application/x-ndjson)
+    STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', 500))
+
+    BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 500))
\ No newline at end of file
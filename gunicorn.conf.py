@@ -1,13 +1,72 @@
 # Gunicorn configuration
-import multiprocessing
+import gc
+import math
+import os
 
-# Количество воркеров (для Render лучше 1-2)
-workers = 1
-# Или динамически based on CPU cores:
-# workers = multiprocessing.cpu_count() * 2 + 1
 
-# Количество потоков на воркер
-threads = 4
+def read(path: str) -> str | None:
+    try:
+        with open(path) as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+
+def cpu_limit() -> int:
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+
+    # Квота контейнера: cgroup v2 (cpu.max), затем v1 (cfs_quota_us / cfs_period_us)
+    quota = read('/sys/fs/cgroup/cpu.max')
+    if quota and not quota.startswith('max'):
+        limit, period = quota.split()
+        return max(1, min(cpus, math.ceil(int(limit) / int(period))))
+
+    limit, period = read('/sys/fs/cgroup/cpu/cpu.cfs_quota_us'), read('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+    if limit and period and int(limit) > 0:
+        return max(1, min(cpus, math.ceil(int(limit) / int(period))))
+
+    return cpus
+
+
+def memory_limit() -> int | None:
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        limit = read(path)
+        # v1 без лимита отдаёт число порядка 2**63
+        if limit and limit.isdigit() and int(limit) < 1 << 60:
+            return int(limit)
+
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+cpus = cpu_limit()
+memory = memory_limit()
+
+# Класс воркера: gthread (по умолчанию), sync, или uvicorn.workers.UvicornWorker для asgi.py
+# (тогда модуль приложения в командной строке не указывается, его задаёт wsgi_app)
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+if 'uvicorn' in worker_class.lower():
+    wsgi_app = 'asgi:application'
+
+# Количество воркеров: 2 * CPU + 1 по квоте cgroup, но не больше, чем помещается в память
+# контейнера (на Render с 512 МБ получается 2). WEB_CONCURRENCY задаёт число явно.
+# Версии коллекций кэша общие для воркеров (CACHE_VERSION_STORAGE, см. config.py)
+worker_memory = int(os.getenv('GUNICORN_WORKER_MEMORY_MB', 200)) * 1024 * 1024
+workers = cpus * 2 + 1
+if memory:
+    workers = max(1, min(workers, memory // worker_memory))
+workers = int(os.getenv('WEB_CONCURRENCY', workers))
+
+# Количество потоков на воркер: около 8 одновременных запросов на CPU (запросы в основном ждут БД),
+# от 2 до 8 на воркер. GUNICORN_THREADS задаёт число явно; пул соединений с БД по умолчанию
+# такого же размера (см. config.py), поэтому значение передаётся приложению через окружение
+threads = int(os.getenv('GUNICORN_THREADS', min(8, max(2, math.ceil(cpus * 8 / workers)))))
+os.environ['GUNICORN_THREADS'] = str(threads)
+
+# Приложение загружается один раз в мастере, воркеры получают его (и прогретые кэши) через fork
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() in ('1', 'true', 'yes', 'on')
 
 # Таймауты (критически важно для Render)
 timeout = 30  # секунд
@@ -24,4 +83,67 @@ loglevel = "info"
 
 # Перезапуск воркеров периодически (предотвращает утечки памяти)
 max_requests = 1000
-max_requests_jitter = 100
\ No newline at end of file
+max_requests_jitter = 100
+
+
+def flask_app(server):
+    application = server.app.wsgi()
+    # asgi.py отдаёт AsyncApp, Flask-приложение лежит внутри
+    return getattr(application, 'app', application)
+
+
+def when_ready(server):
+    server.log.info('workers=%s threads=%s worker_class=%s cpus=%s memory=%s', workers, threads, worker_class, cpus, memory)
+
+    import images
+
+    if not os.path.exists(images.MANIFEST):
+        server.log.warning('%s not found, run `flask --app app:init_app build-assets` in the build step', images.MANIFEST)
+
+    if not preload_app:
+        return
+
+    from app import warm_caches
+    from utilities import db
+
+    app = flask_app(server)
+    try:
+        warm_caches(app)
+    except Exception as e:
+        server.log.warning('cache warm-up failed: %s', e)
+
+    # Мастер запросы не обслуживает, его соединения закрываются до fork
+    with app.app_context():
+        db.engine.dispose()
+
+    # Объекты мастера больше не трогает сборщик мусора, их страницы остаются общими после fork
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+
+    from utilities import db, async_db
+
+    # Соединения мастера не должны использоваться воркерами; close=False не закрывает их у мастера
+    with flask_app(server).app_context():
+        db.engine.dispose(close=False)
+    if async_db.engine is not None:
+        async_db.engine.sync_engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    from utilities import scheduler
+
+    # Планировщик (пинг БД, обновление кэша) запускается в каждом воркере, в мастере - никогда
+    scheduler.start()
+
+
+# При workers > 1 задайте METRICS_DIR, чтобы /api/metrics суммировал метрики всех воркеров
+def worker_exit(server, worker):
+    from utilities import metrics
+
+    # Последние счётчики воркера добавляются в общий файл завершённых, его собственный удаляется
+    metrics.retire(worker.pid)
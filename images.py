@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import time
+
+import click
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+BUILD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'assets')
+MANIFEST = os.path.join(BUILD_DIR, 'manifest.json')
+
+SOURCE_DIRS = ('posts', 'projects', 'technologies')
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+WIDTHS = (160, 320, 640, 1280)
+
+# Modern formats, each generated only when the installed Pillow can encode it
+FORMATS = {
+    'avif': {'format': 'AVIF', 'quality': 55},
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+}
+FALLBACK_FORMATS = {
+    '.png': ('png', {'format': 'PNG', 'optimize': True}),
+    '.jpg': ('jpeg', {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+    '.jpeg': ('jpeg', {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+    '.webp': ('webp', FORMATS['webp']),
+}
+
+# Every serialized row looks its image up, so the file is stat'ed at most once per interval
+MANIFEST_CHECK_INTERVAL = 1.0
+
+_manifest = None
+_manifest_mtime = None
+_manifest_checked_at = 0.0
+
+
+def load_manifest() -> dict:
+    global _manifest, _manifest_mtime, _manifest_checked_at
+
+    now = time.monotonic()
+    if _manifest_mtime is not None and now - _manifest_checked_at < MANIFEST_CHECK_INTERVAL:
+        return _manifest
+    _manifest_checked_at = now
+
+    try:
+        mtime = os.path.getmtime(MANIFEST)
+    except OSError:
+        # No build yet: images come from the repository until one appears
+        _manifest, _manifest_mtime = {}, 0.0
+        return _manifest
+
+    if mtime != _manifest_mtime:
+        with open(MANIFEST, encoding='utf-8') as file:
+            _manifest = json.load(file)
+        _manifest_mtime = mtime
+
+    return _manifest
+
+
+def variants(path: str) -> dict[str, list[list]] | None:
+    entry = load_manifest().get(path)
+    if not entry:
+        return None
+
+    return entry['variants']
+
+
+def _supported_formats() -> dict:
+    from PIL import features
+
+    return {name: options for name, options in FORMATS.items() if features.check(name)}
+
+
+def _save(image, target: str, options: dict):
+    if os.path.exists(target):
+        return
+
+    image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') and options['format'] != 'JPEG' else 'RGB')
+    temp = target + '.tmp'
+    image.save(temp, **options)
+    os.replace(temp, target)
+
+
+def build_image(relative: str, formats: dict) -> dict:
+    from PIL import Image, ImageOps
+
+    source = os.path.join(ASSETS_DIR, relative)
+    with open(source, 'rb') as file:
+        digest = hashlib.sha256(file.read()).hexdigest()[:12]
+
+    folder, filename = os.path.split(relative)
+    stem, extension = os.path.splitext(filename)
+    os.makedirs(os.path.join(BUILD_DIR, folder), exist_ok=True)
+
+    with Image.open(source) as original:
+        original = ImageOps.exif_transpose(original)
+        width, height = original.size
+        # Originals wider than the largest size are only served downscaled
+        widths = sorted({min(size, width) for size in WIDTHS})
+
+        fallback_name, fallback_options = FALLBACK_FORMATS[extension.lower()]
+        targets = {**formats, fallback_name: fallback_options}
+
+        result = {}
+        for name, options in targets.items():
+            result[name] = []
+            for size in widths:
+                resized = original if size == width else original.resize(
+                    (size, round(height * size / width)), Image.Resampling.LANCZOS
+                )
+                variant = f'{folder}/{stem}.{digest}.{size}.{name}'
+                _save(resized, os.path.join(BUILD_DIR, variant), options)
+                result[name].append([size, variant])
+
+    return {'width': width, 'height': height, 'variants': result}
+
+
+def build_assets() -> dict:
+    global _manifest_mtime
+
+    try:
+        formats = _supported_formats()
+    except ImportError:
+        raise click.ClickException('Pillow is required to build assets: pip install Pillow')
+
+    manifest = {}
+    for folder in SOURCE_DIRS:
+        for filename in sorted(os.listdir(os.path.join(ASSETS_DIR, folder))):
+            if not filename.lower().endswith(SOURCE_EXTENSIONS):
+                continue
+
+            relative = f'{folder}/{filename}'
+            manifest[relative] = build_image(relative, formats)
+            click.echo(f'{relative}: {", ".join(manifest[relative]["variants"])}')
+
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    with open(MANIFEST + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=1)
+    os.replace(MANIFEST + '.tmp', MANIFEST)
+    # Reloaded on the next lookup, without waiting for the check interval
+    _manifest_mtime = None
+
+    prune(manifest)
+
+    return manifest
+
+
+def prune(manifest: dict):
+    used = {
+        variant
+        for entry in manifest.values()
+        for sizes in entry['variants'].values()
+        for _, variant in sizes
+    }
+
+    for folder in SOURCE_DIRS:
+        directory = os.path.join(BUILD_DIR, folder)
+        if not os.path.isdir(directory):
+            continue
+
+        for filename in os.listdir(directory):
+            if f'{folder}/{filename}' not in used:
+                os.remove(os.path.join(directory, filename))
+
+
+def init_images(app):
+    @app.cli.command('build-assets')
+    def build():
+        """Build resized AVIF/WebP variants of assets/ into static/assets."""
+        build_assets()
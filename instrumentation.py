@@ -0,0 +1,141 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+access_logger = logging.getLogger('ccrayp.access')
+
+
+@contextmanager
+def timer(name: str):
+    if not has_request_context() or 'timing' not in g:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        g.timing[name] = g.timing.get(name, 0.0) + time.perf_counter() - started
+
+
+class Instrumentation:
+    """Per-request timing: DB time and query count from engine events, serialization
+    and compression from timer(), reported as Server-Timing and an access log line."""
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self.access_log = False
+        self.query_warning = 20
+
+        self._durations: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db):
+        self.window = app.config.get('TIMING_WINDOW', self.window)
+        self.access_log = app.config.get('ACCESS_LOG', self.access_log)
+        self.query_warning = app.config.get('QUERY_COUNT_WARNING', self.query_warning)
+
+        # Warnings (N+1, snapshot export, rate limit storage) are logged even without the access log
+        if not access_logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            access_logger.addHandler(handler)
+            access_logger.setLevel(logging.INFO)
+            access_logger.propagate = False
+
+        with app.app_context():
+            self.listen(db.engine)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.extensions['instrumentation'] = self
+
+    def listen(self, engine):
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and 'timing' in g:
+            conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @staticmethod
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('query_started')
+        if not started or not has_request_context() or 'timing' not in g:
+            return
+
+        g.timing['db'] = g.timing.get('db', 0.0) + time.perf_counter() - started.pop()
+        g.queries = g.get('queries', 0) + 1
+
+    @staticmethod
+    def _before_request():
+        g.request_started = time.perf_counter()
+        g.timing = {}
+        g.queries = 0
+
+    def _after_request(self, response):
+        if 'request_started' not in g:
+            return response
+
+        total = time.perf_counter() - g.request_started
+        endpoint = request.endpoint or 'unknown'
+
+        metrics = [f'{name};dur={duration * 1000:.2f}' for name, duration in g.timing.items()]
+        metrics.append(f'queries;desc="{g.queries} queries"')
+        metrics.append(f'total;dur={total * 1000:.2f}')
+        response.headers['Server-Timing'] = ', '.join(metrics)
+
+        self.observe(endpoint, total)
+
+        if self.access_log:
+            access_logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'endpoint': endpoint,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 2),
+                'db_ms': round(g.timing.get('db', 0.0) * 1000, 2),
+                'queries': g.queries,
+                'serialize_ms': round(g.timing.get('serialize', 0.0) * 1000, 2),
+                'compress_ms': round(g.timing.get('compress', 0.0) * 1000, 2),
+            }))
+
+        if g.queries >= self.query_warning:
+            access_logger.warning(json.dumps({
+                'warning': 'many queries per request, possible N+1',
+                'endpoint': endpoint,
+                'queries': g.queries,
+            }))
+
+        return response
+
+    def observe(self, endpoint: str, duration: float):
+        with self._lock:
+            durations = self._durations.get(endpoint)
+            if durations is None:
+                durations = self._durations[endpoint] = deque(maxlen=self.window)
+            durations.append(duration)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            snapshot = {endpoint: sorted(durations) for endpoint, durations in self._durations.items()}
+
+        result = {}
+        for endpoint, durations in snapshot.items():
+            count = len(durations)
+            result[endpoint] = {
+                'count': count,
+                'p50_ms': durations[int(count * 0.50)] * 1000,
+                'p95_ms': durations[min(int(count * 0.95), count - 1)] * 1000,
+                'p99_ms': durations[min(int(count * 0.99), count - 1)] * 1000,
+                'max_ms': durations[-1] * 1000,
+            }
+
+        return result
@@ -0,0 +1,292 @@
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Counters of exited workers, merged into one file so the directory does not grow with every restart
+EXITED = 'metrics-exited.json'
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+class Metrics:
+    """Prometheus-style request metrics.
+
+    With METRICS_DIR set every worker periodically dumps its own counters into
+    a file there and /api/metrics sums the files of all workers. Files of
+    exited workers are merged into one aggregate and removed.
+    """
+
+    def __init__(self):
+        self.directory = None
+        self.flush_interval = 1.0
+
+        self._requests: dict[tuple[str, str, str], int] = {}
+        self._latency: dict[tuple[str, str], list[float]] = {}
+        self._in_flight = 0
+        self._collectors: dict[str, tuple] = {}
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.directory = app.config.get('METRICS_DIR') or None
+        self.flush_interval = app.config.get('METRICS_FLUSH_INTERVAL', self.flush_interval)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.extensions['metrics'] = self
+
+    def reset(self):
+        with self._lock:
+            self._requests.clear()
+            self._latency.clear()
+            self._in_flight = 0
+
+    def register(self, name: str, collect, counters=()):
+        # counters: keys of collect() that only grow (True for all), summed over exited workers too
+        self._collectors[name] = (collect, counters)
+
+    def _before_request(self):
+        with self._lock:
+            self._in_flight += 1
+        g.metrics_started = time.perf_counter()
+
+    def _after_request(self, response):
+        if 'metrics_started' not in g:
+            return response
+
+        # The rule template keeps label cardinality bounded, unlike the raw path
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        duration = time.perf_counter() - g.metrics_started
+
+        with self._lock:
+            key = (route, request.method, str(response.status_code))
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+            histogram = self._latency.get((route, request.method))
+            if histogram is None:
+                histogram = self._latency[(route, request.method)] = [0] * len(BUCKETS) + [0.0, 0]
+            for index, bound in enumerate(BUCKETS):
+                if duration <= bound:
+                    histogram[index] += 1
+            histogram[-2] += duration
+            histogram[-1] += 1
+
+        return response
+
+    def _teardown_request(self, exception=None):
+        if 'metrics_started' not in g:
+            return
+
+        with self._lock:
+            self._in_flight -= 1
+
+        if self.directory and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def snapshot(self) -> dict:
+        gauges, counters = {}, {}
+        for name, (collect, counter_keys) in self._collectors.items():
+            try:
+                values = collect()
+            except Exception:
+                continue
+
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    target = counters if counter_keys is True or key in counter_keys else gauges
+                    target[f'{name}_{key}'] = value
+
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'requests': [[*key, count] for key, count in self._requests.items()],
+                'latency': [[*key, histogram] for key, histogram in self._latency.items()],
+                'in_flight': self._in_flight,
+                'gauges': gauges,
+                'counters': counters,
+            }
+
+    def flush(self):
+        snapshot = self.snapshot()
+        path = os.path.join(self.directory, f'metrics-{snapshot["pid"]}.json')
+
+        with open(path + '.tmp', 'w') as file:
+            json.dump(snapshot, file)
+        os.replace(path + '.tmp', path)
+
+        self._last_flush = time.monotonic()
+
+    @contextmanager
+    def _locked(self):
+        # Serializes merges and reads between the workers; the lock is released with the file
+        with open(os.path.join(self.directory, 'metrics.lock'), 'a') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            yield
+
+    def _paths(self) -> list[str]:
+        return glob.glob(os.path.join(self.directory, 'metrics-*.json'))
+
+    @staticmethod
+    def _read(path: str) -> dict | None:
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _merge(self, path: str):
+        # Counters of exited workers stay in the totals, their gauges do not
+        exited_path = os.path.join(self.directory, EXITED)
+        snapshot = self._read(path)
+        if snapshot is None:
+            return
+
+        exited = self._read(exited_path) or {
+            'pid': 0, 'dead': True, 'in_flight': 0, 'gauges': {}, 'counters': {}, 'requests': [], 'latency': [],
+        }
+
+        requests = {tuple(key): count for *key, count in exited['requests']}
+        for *key, count in snapshot['requests']:
+            requests[tuple(key)] = requests.get(tuple(key), 0) + count
+
+        latency = {tuple(key): histogram for *key, histogram in exited['latency']}
+        for *key, histogram in snapshot['latency']:
+            total = latency.setdefault(tuple(key), [0] * len(histogram))
+            for index, value in enumerate(histogram):
+                total[index] += value
+
+        counters = exited.setdefault('counters', {})
+        for name, value in snapshot.get('counters', {}).items():
+            counters[name] = counters.get(name, 0) + value
+
+        exited['requests'] = [[*key, count] for key, count in requests.items()]
+        exited['latency'] = [[*key, histogram] for key, histogram in latency.items()]
+        with open(exited_path + '.tmp', 'w') as file:
+            json.dump(exited, file)
+        os.replace(exited_path + '.tmp', exited_path)
+        os.remove(path)
+
+    def retire(self, pid: int):
+        # Called from gunicorn's worker_exit, in the exiting worker
+        if not self.directory:
+            return
+
+        if pid == os.getpid():
+            self.flush()
+
+        with self._locked():
+            self._merge(os.path.join(self.directory, f'metrics-{pid}.json'))
+
+    def collect(self) -> dict:
+        if not self.directory:
+            snapshots = [self.snapshot()]
+        else:
+            self.flush()
+            with self._locked():
+                # Workers killed before worker_exit ran are merged here
+                for path in self._paths():
+                    snapshot = self._read(path)
+                    if os.path.basename(path) != EXITED and snapshot and (snapshot.get('dead') or not _alive(snapshot['pid'])):
+                        self._merge(path)
+
+                snapshots = list(filter(None, map(self._read, self._paths())))
+
+        requests, latency, gauges, counters = {}, {}, {}, {}
+        in_flight = workers = 0
+
+        for snapshot in snapshots:
+            for route, method, status, count in snapshot['requests']:
+                requests[(route, method, status)] = requests.get((route, method, status), 0) + count
+
+            for route, method, histogram in snapshot['latency']:
+                total = latency.setdefault((route, method), [0] * len(histogram))
+                for index, value in enumerate(histogram):
+                    total[index] += value
+
+            for name, value in snapshot.get('counters', {}).items():
+                counters[name] = counters.get(name, 0) + value
+
+            if snapshot.get('dead') or not _alive(snapshot['pid']):
+                continue
+
+            workers += 1
+            in_flight += snapshot['in_flight']
+            for name, value in snapshot['gauges'].items():
+                gauges[name] = gauges.get(name, 0) + value
+
+        return {
+            'requests': requests, 'latency': latency, 'in_flight': in_flight, 'workers': workers,
+            'gauges': gauges, 'counters': counters,
+        }
+
+    def render(self) -> str:
+        data = self.collect()
+        lines = [
+            '# HELP ccrayp_requests_total Requests by route, method and status',
+            '# TYPE ccrayp_requests_total counter',
+        ]
+        for (route, method, status), count in sorted(data['requests'].items()):
+            lines.append(f'ccrayp_requests_total{{{_labels(route=route, method=method, status=status)}}} {count}')
+
+        lines += [
+            '# HELP ccrayp_request_duration_seconds Request latency',
+            '# TYPE ccrayp_request_duration_seconds histogram',
+        ]
+        for (route, method), histogram in sorted(data['latency'].items()):
+            labels = _labels(route=route, method=method)
+            for bound, count in zip(BUCKETS, histogram):
+                lines.append(f'ccrayp_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'ccrayp_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram[-1]}')
+            lines.append(f'ccrayp_request_duration_seconds_sum{{{labels}}} {histogram[-2]}')
+            lines.append(f'ccrayp_request_duration_seconds_count{{{labels}}} {histogram[-1]}')
+
+        lines += [
+            '# HELP ccrayp_requests_in_flight Requests being processed',
+            '# TYPE ccrayp_requests_in_flight gauge',
+            f'ccrayp_requests_in_flight {data["in_flight"]}',
+            '# HELP ccrayp_workers Worker processes reporting metrics',
+            '# TYPE ccrayp_workers gauge',
+            f'ccrayp_workers {data["workers"]}',
+        ]
+
+        for name, value in sorted(data['gauges'].items()):
+            lines += [f'# TYPE ccrayp_{name} gauge', f'ccrayp_{name} {value}']
+
+        for name, value in sorted(data['counters'].items()):
+            lines += [f'# TYPE ccrayp_{name}_total counter', f'ccrayp_{name}_total {value}']
+
+        hits, misses = data['counters'].get('cache_hits', 0), data['counters'].get('cache_misses', 0)
+        lines += [
+            '# HELP ccrayp_cache_hit_ratio Response cache hits over lookups, all workers',
+            '# TYPE ccrayp_cache_hit_ratio gauge',
+            f'ccrayp_cache_hit_ratio {hits / (hits + misses) if hits + misses else 0.0}',
+        ]
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,108 @@
+import click
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.types import Date
+
+from utilities import db, cache, parse_date
+from models import post, projects
+from models.post import Post
+from models.project_technology import project_technologies
+from models.projects import Project
+from models.technology import Technology
+from services.project_service import ProjectService
+
+
+def migrate_post_dates() -> int:
+    column = next(column for column in inspect(db.engine).get_columns('posts') if column['name'] == 'date')
+    if isinstance(column['type'], Date):
+        return 0
+
+    rows = db.session.execute(text('SELECT id, date FROM posts')).all()
+
+    dates, invalid = [], []
+    for id, value in rows:
+        try:
+            dates.append({'id': id, 'date': parse_date(value).isoformat()})
+        except ValueError:
+            invalid.append(f'{id} ({value!r})')
+
+    if invalid:
+        raise click.ClickException(f'Could not parse dates of posts: {", ".join(invalid)}')
+
+    try:
+        if dates:
+            db.session.execute(text('UPDATE posts SET date = :date WHERE id = :id'), dates)
+
+        # SQLite stores Date as ISO text, so only Postgres needs the type change
+        if db.engine.dialect.name == 'postgresql':
+            db.session.execute(text('ALTER TABLE posts ALTER COLUMN date TYPE DATE USING date::date'))
+
+        db.session.commit()
+        cache.bump('posts')
+
+    except:
+        db.session.rollback()
+        raise
+
+    return len(dates)
+
+
+def create_indexes() -> list[str]:
+    created = []
+    existing = inspect(db.engine)
+
+    for table in (Post.__table__, Project.__table__, Technology.__table__, project_technologies):
+        names = {index['name'] for index in existing.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in names:
+                index.create(db.engine)
+                created.append(index.name)
+
+    return created
+
+
+def create_search_indexes() -> bool:
+    if db.engine.dialect.name != 'postgresql':
+        return False
+
+    # IF NOT EXISTS makes it a no-op for tables created with the index already
+    with db.engine.begin() as connection:
+        connection.execute(post.SEARCH_INDEX)
+        connection.execute(projects.SEARCH_INDEX)
+
+    return True
+
+
+def link_project_stacks() -> tuple[int, set[str]]:
+    # Rebuilds project_technologies from the free-form projects.stack strings
+    try:
+        unknown = ProjectService.link_all_technologies()
+        linked = db.session.scalar(select(func.count()).select_from(project_technologies))
+        db.session.commit()
+        cache.bump('stacks')
+
+    except:
+        db.session.rollback()
+        raise
+
+    return linked, unknown
+
+
+def init_migrations(app):
+    @app.cli.command('migrate')
+    def migrate():
+        """Create missing tables, convert posts.date to DATE, create missing and full-text indexes and link project stacks."""
+        db.create_all()
+
+        converted = migrate_post_dates()
+        click.echo(f'posts.date: {converted} rows converted')
+
+        for name in create_indexes():
+            click.echo(f'index {name} created')
+
+        if create_search_indexes():
+            click.echo('full-text search indexes ensured')
+
+        linked, unknown = link_project_stacks()
+        click.echo(f'project_technologies: {linked} links')
+        if unknown:
+            click.echo(f'unknown stack tags: {", ".join(sorted(unknown))}')
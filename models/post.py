@@ -1,5 +1,11 @@
+from sqlalchemy import DDL, event
+
 from utilities import db
 
+# Full-text search queries must use exactly this expression to hit the GIN index
+SEARCH_VECTOR = "to_tsvector('simple', coalesce(label, '') || ' ' || coalesce(text, ''))"
+SEARCH_INDEX = DDL(f'CREATE INDEX IF NOT EXISTS ix_posts_search ON posts USING gin ({SEARCH_VECTOR})')
+
 class Post(db.Model):
     __tablename__ = 'posts'
 
@@ -7,6 +13,13 @@ class Post(db.Model):
     label = db.Column(db.Text, nullable=False)
     text = db.Column(db.Text, nullable=False)
     img = db.Column(db.Text, nullable=False)
-    date = db.Column(db.Text, nullable=False)
+    date = db.Column(db.Date, nullable=False)
     link = db.Column(db.Text, nullable=False)
-    mode = db.Column(db.Boolean, nullable=False)
\ No newline at end of file
+    mode = db.Column(db.Boolean, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_posts_mode_date', mode, date.desc(), id.desc()),
+        db.Index('ix_posts_date', date, id),
+    )
+
+event.listen(Post.__table__, 'after_create', SEARCH_INDEX.execute_if(dialect='postgresql'))
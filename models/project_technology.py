@@ -0,0 +1,9 @@
+from utilities import db
+
+project_technologies = db.Table(
+    'project_technologies',
+    db.Column('project_id', db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('technology_id', db.Integer, db.ForeignKey('technologies.id', ondelete='CASCADE'), primary_key=True),
+    # The primary key serves technologies of a project, this index projects of a technology
+    db.Index('ix_project_technologies_technology', 'technology_id', 'project_id'),
+)
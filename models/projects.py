@@ -1,4 +1,11 @@
+from sqlalchemy import DDL, event
+
 from utilities import db
+from models.project_technology import project_technologies
+
+# Full-text search queries must use exactly this expression to hit the GIN index
+SEARCH_VECTOR = "to_tsvector('simple', coalesce(label, '') || ' ' || coalesce(text, '') || ' ' || coalesce(stack, ''))"
+SEARCH_INDEX = DDL(f'CREATE INDEX IF NOT EXISTS ix_projects_search ON projects USING gin ({SEARCH_VECTOR})')
 
 class Project(db.Model):
     __tablename__ = 'projects'
@@ -9,4 +16,13 @@ class Project(db.Model):
     img = db.Column(db.Text, nullable=False)
     stack = db.Column(db.Text, nullable=False)
     link = db.Column(db.Text, nullable=False)
-    mode = db.Column(db.Boolean, nullable=False)
\ No newline at end of file
+    mode = db.Column(db.Boolean, nullable=False)
+
+    # Parsed from stack on every write, see ProjectService.link_technologies
+    technologies = db.relationship('Technology', secondary=project_technologies, back_populates='projects')
+
+    __table_args__ = (
+        db.Index('ix_projects_mode', mode, id),
+    )
+
+event.listen(Project.__table__, 'after_create', SEARCH_INDEX.execute_if(dialect='postgresql'))
@@ -1,5 +1,7 @@
 from utilities import db
 
+GROUPS = ('fund', 'ide_os', 'lang_tech')
+
 class Technology(db.Model):
     __tablename__ = 'technologies'
 
@@ -7,4 +9,10 @@ class Technology(db.Model):
     label = db.Column(db.Text, nullable=False)
     img = db.Column(db.Text, nullable=False)
     group = db.Column(db.Text, nullable=False)
-    mode = db.Column(db.Boolean, nullable=False)
\ No newline at end of file
+    mode = db.Column(db.Boolean, nullable=False)
+
+    projects = db.relationship('Project', secondary='project_technologies', back_populates='technologies')
+
+    __table_args__ = (
+        db.Index('ix_technologies_group_mode', group, mode),
+    )
\ No newline at end of file
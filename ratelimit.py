@@ -0,0 +1,300 @@
+import asyncio
+import json
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from werkzeug.exceptions import HTTPException
+from werkzeug.wrappers import Request, Response
+
+from instrumentation import access_logger
+
+
+def forwarded_address(environ, proxies: int) -> str:
+    # Behind N trusted proxies the client is the Nth address from the end of X-Forwarded-For
+    route = Request(environ).access_route
+    if proxies and len(route) >= proxies:
+        return route[-proxies]
+
+    return environ.get('REMOTE_ADDR') or ''
+
+
+def parse_limits(value: str | None) -> dict[str, tuple[float, float]]:
+    # "search=2:10,get_all_posts=5:20" -> {endpoint: (tokens per second, burst)}
+    limits = {}
+    for item in filter(None, (item.strip() for item in (value or '').split(','))):
+        endpoint, limit = item.split('=')
+        rate, burst = limit.split(':')
+        limits[endpoint.strip()] = (float(rate), float(burst))
+
+    return limits
+
+
+def queue_seconds(value: str | None, now: float) -> float:
+    # X-Request-Start as set by the router: "t=<seconds|ms|µs>" or a bare number
+    if not value:
+        return 0.0
+
+    try:
+        started = float(value.removeprefix('t='))
+    except ValueError:
+        return 0.0
+
+    for scale in (1.0, 1e3, 1e6):
+        if started / scale < now * 10:
+            return max(now - started / scale, 0.0)
+
+    return 0.0
+
+
+def take(tokens: float, updated: float, now: float, rate: float, burst: float) -> tuple[float, float]:
+    # Returns the tokens left and 0, or the unchanged tokens and the seconds until one is available
+    tokens = min(burst, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryBuckets:
+    name = 'memory'
+
+    def __init__(self):
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, now: float, rate: float, burst: float) -> float:
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens, wait = take(tokens, updated, now, rate, burst)
+            self._buckets[key] = (tokens, now)
+
+        return wait
+
+    def prune(self, before: float) -> int:
+        with self._lock:
+            idle = [key for key, (_, updated) in self._buckets.items() if updated < before]
+            for key in idle:
+                del self._buckets[key]
+
+        return len(idle)
+
+
+class SQLiteBuckets:
+    """Buckets in a SQLite file shared by all gunicorn workers of the host (WAL, no fsync)."""
+
+    name = 'sqlite'
+
+    def __init__(self, path: str, timeout: float = 0.05):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections are per thread and never cross a fork
+        if getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL) WITHOUT ROWID'
+            )
+            self._local.connection, self._local.pid = connection, os.getpid()
+
+        return self._local.connection
+
+    def take(self, key: str, now: float, rate: float, burst: float) -> float:
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens, wait = take(*(row or (burst, now)), now, rate, burst)
+            connection.execute('INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)', (key, tokens, now))
+            connection.execute('COMMIT')
+        except:
+            connection.execute('ROLLBACK')
+            raise
+
+        return wait
+
+    def prune(self, before: float) -> int:
+        return self._connection().execute('DELETE FROM buckets WHERE updated < ?', (before,)).rowcount
+
+
+class RateLimiter:
+    """Per-client and per-endpoint token buckets plus load shedding, as a WSGI
+    middleware in front of everything else (snapshots and docs included).
+
+    Buckets live in RATE_LIMIT_STORAGE, a SQLite file shared by the workers;
+    when it is locked or unavailable a request falls back to in-process buckets.
+    Requests that already waited in the router queue longer than SHED_MAX_QUEUE_MS
+    (X-Request-Start), or that find SHED_MAX_IN_FLIGHT requests in the process,
+    get a fast 503 instead of running into the worker timeout.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.enabled = True
+        self.rate = 10.0
+        self.burst = 40.0
+        self.limits: dict[str, tuple[float, float]] = {}
+        self.exempt: tuple[str, ...] = ()
+        self.proxies = 0
+        self.max_in_flight = 0
+        self.max_queue = 0.0
+        self.retry_after = 1
+
+        self.backend = MemoryBuckets()
+        self.fallback = MemoryBuckets()
+        self.limited = 0
+        self.shed = 0
+        self.fallbacks = 0
+
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        config = app.config
+        self.app = app
+        self.enabled = config.get('RATE_LIMIT_ENABLED', self.enabled)
+        self.rate = config.get('RATE_LIMIT_RATE', self.rate)
+        self.burst = config.get('RATE_LIMIT_BURST', self.burst)
+        self.limits = parse_limits(config.get('RATE_LIMIT_ROUTES'))
+        self.exempt = tuple(config.get('RATE_LIMIT_EXEMPT', ()))
+        self.proxies = config.get('TRUSTED_PROXIES', self.proxies)
+        self.max_in_flight = config.get('SHED_MAX_IN_FLIGHT', self.max_in_flight)
+        self.max_queue = config.get('SHED_MAX_QUEUE_MS', 0) / 1000
+        self.retry_after = config.get('SHED_RETRY_AFTER', self.retry_after)
+
+        storage = config.get('RATE_LIMIT_STORAGE')
+        if storage is None:
+            storage = os.path.join(tempfile.gettempdir(), 'ccrayp-ratelimit.sqlite')
+        self.backend = SQLiteBuckets(storage) if storage else MemoryBuckets()
+        self.fallback = MemoryBuckets()
+        self.limited = 0
+        self.shed = 0
+        self.fallbacks = 0
+        self._in_flight = 0
+
+        if self.enabled:
+            app.wsgi_app = self._middleware(app.wsgi_app)
+        app.extensions['rate_limiter'] = self
+
+    def endpoint(self, environ) -> str | None:
+        try:
+            endpoint, _ = self.app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            return None
+
+        return endpoint
+
+    def _take(self, key: str, now: float, rate: float, burst: float) -> float:
+        try:
+            return self.backend.take(key, now, rate, burst)
+        except sqlite3.Error as e:
+            with self._lock:
+                self.fallbacks += 1
+                first = self.fallbacks == 1
+            if first:
+                access_logger.warning(json.dumps({'warning': 'rate limit storage unavailable', 'error': str(e)}))
+
+            return self.fallback.take(key, now, rate, burst)
+
+    def check(self, environ) -> Response | None:
+        # Returns the rejection, or None when the request may run
+        if not self.enabled:
+            return None
+
+        endpoint = self.endpoint(environ)
+        if endpoint in self.exempt:
+            return None
+
+        now = time.time()
+        if self.max_queue and queue_seconds(environ.get('HTTP_X_REQUEST_START'), now) > self.max_queue:
+            return self._reject(503, 'Error. Server is overloaded', self.retry_after)
+
+        if self.max_in_flight and self._in_flight >= self.max_in_flight:
+            return self._reject(503, 'Error. Server is overloaded', self.retry_after)
+
+        rate, burst = self.limits.get(endpoint, (self.rate, self.burst))
+        if not rate:
+            return None
+
+        wait = self._take(f'{forwarded_address(environ, self.proxies)}|{endpoint or "-"}', now, rate, burst)
+        if wait:
+            return self._reject(429, 'Error. Too many requests', math.ceil(wait))
+
+        return None
+
+    async def check_async(self, environ) -> Response | None:
+        # The SQLite take can wait for the file lock, on the event loop that would stall every request
+        if not self.enabled or isinstance(self.backend, MemoryBuckets):
+            return self.check(environ)
+
+        return await asyncio.to_thread(self.check, environ)
+
+    def _reject(self, status: int, message: str, retry_after: int) -> Response:
+        with self._lock:
+            if status == 429:
+                self.limited += 1
+            else:
+                self.shed += 1
+
+        return Response(
+            json.dumps({'message': message}),
+            status=status,
+            mimetype='application/json',
+            headers={'Retry-After': str(retry_after), 'Access-Control-Allow-Origin': '*'},
+        )
+
+    def enter(self):
+        with self._lock:
+            self._in_flight += 1
+
+    def leave(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def prune(self) -> int:
+        # A bucket idle for burst / rate seconds is full again, the same as a missing one
+        limits = [*self.limits.values(), (self.rate, self.burst)]
+        idle = max((burst / rate for rate, burst in limits if rate), default=0)
+        if not idle:
+            # Every limit is off, nothing is ever taken
+            return 0
+
+        before = time.time() - idle
+
+        try:
+            pruned = self.backend.prune(before)
+        except sqlite3.Error:
+            pruned = 0
+
+        return pruned + self.fallback.prune(before)
+
+    def _middleware(self, wsgi_app):
+        def middleware(environ, start_response):
+            rejected = self.check(environ)
+            if rejected is not None:
+                return rejected(environ, start_response)
+
+            # Streamed bodies are iterated after the call returns, so this counts the app call only
+            self.enter()
+            try:
+                return wsgi_app(environ, start_response)
+            finally:
+                self.leave()
+
+        return middleware
+
+    def stats(self) -> dict[str, any]:
+        return {
+            'backend': self.backend.name,
+            'in_flight': self._in_flight,
+            'limited': self.limited,
+            'shed': self.shed,
+            'fallbacks': self.fallbacks,
+        }
@@ -0,0 +1,16 @@
+from flask import send_from_directory
+
+import images
+
+def init_asset_routes(app):
+    @app.route('/assets/<path:filename>', methods=['GET'])
+    def asset(filename: str):
+        if filename == 'manifest.json':
+            return send_from_directory(images.BUILD_DIR, filename, max_age=60)
+
+        # Variant names contain a content hash, so they never change
+        response = send_from_directory(images.BUILD_DIR, filename, max_age=app.config['ASSETS_MAX_AGE'])
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+
+        return response
\ No newline at end of file
@@ -0,0 +1,152 @@
+from flask import request, jsonify
+from flask_jwt_extended import verify_jwt_in_request
+
+from utilities import cached_response, parse_date, parse_fields, parse_page
+from models.post import Post
+from models.projects import Project
+from models.technology import Technology, GROUPS
+from services.post_service import PostService
+from services.project_service import ProjectService
+from services.technology_service import TechnologyService
+
+# Async counterparts of the read routes, registered under the Flask endpoint names.
+# jwt_required() cannot wrap a coroutine, so protected views verify the token themselves.
+def init_async_routes(app):
+
+    @app.view('get_all_posts')
+    async def get_all_posts():
+        try:
+            fields = parse_fields(Post, request.args.get('fields'))
+            page = parse_page(request.args, sorts={'id': int, 'date': parse_date})
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            payload = await PostService.get_all_posts_json_async(fields, page)
+            if not payload:
+                return jsonify(message='Error. Posts were not found'), 404
+
+            return cached_response(payload)
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.view('get_post_by_id')
+    async def get_post_by_id(id: int):
+        verify_jwt_in_request()
+
+        try:
+            fields = parse_fields(Post, request.args.get('fields'))
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            payload = await PostService.get_post_by_id_json_async(id, fields)
+            if not payload:
+                return jsonify(message='Error. Post with such id does not exist'), 404
+
+            return cached_response(payload, private=True)
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.view('get_all_projects')
+    async def get_all_projects():
+        try:
+            fields = parse_fields(Project, request.args.get('fields'))
+            page = parse_page(request.args)
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            payload = await ProjectService.get_all_projects_json_async(fields, page)
+            if not payload:
+                return jsonify(message='Projects were not found'), 404
+
+            return cached_response(payload)
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.view('get_project_by_id')
+    async def get_project_by_id(id: int):
+        verify_jwt_in_request()
+
+        try:
+            fields = parse_fields(Project, request.args.get('fields'))
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            payload = await ProjectService.get_project_by_id_json_async(id, fields)
+            if not payload:
+                return jsonify(message='Project with such id does not exist'), 404
+
+            return cached_response(payload, private=True)
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.view('get_all_technologys')
+    async def get_all_technologys():
+        try:
+            fields = parse_fields(Technology, request.args.get('fields'))
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            payload = await TechnologyService.get_all_technologys_json_async(fields)
+            if not payload:
+                return jsonify(message='Technologies were not found'), 404
+
+            return cached_response(payload)
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.view('get_technology_by_id')
+    async def get_technology_by_id(id: int):
+        verify_jwt_in_request()
+
+        try:
+            fields = parse_fields(Technology, request.args.get('fields'))
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            payload = await TechnologyService.get_technology_by_id_json_async(id, fields)
+            if not payload:
+                return jsonify(message='Technology with such id does not exist'), 404
+
+            return cached_response(payload, private=True)
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.view('get_technologies_by_group')
+    async def get_technologies_by_group(group: str):
+        verify_jwt_in_request()
+
+        if group not in GROUPS:
+            return jsonify(message=f'Error. Invalid group {group}'), 400
+
+        try:
+            fields = parse_fields(Technology, request.args.get('fields'))
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            payload = await TechnologyService.get_technologies_by_group_json_async(group, fields)
+            if not payload:
+                return jsonify(message='Technologies with such group does not exist'), 404
+
+            return cached_response(payload, private=True)
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
@@ -1,19 +1,31 @@
 from flask import jsonify, request
-from flasgger import swag_from
+from apidocs import swag_from
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from config import Config
-from werkzeug.security import check_password_hash
+
+from utilities import client_address, login_guard
 
 def init_auth_routes(app):
     @app.route('/api/login', methods=['POST'])
     @swag_from('../docs/auth/login.yml')
     def login():
+        client = client_address()
+        retry_after = login_guard.hit(client)
+        if retry_after:
+            return jsonify(message='Error. Too many login attempts'), 429, {'Retry-After': str(retry_after)}
+
         username = request.json.get('username')
         password = request.json.get('password')
         
-        if username != Config.ADMIN_USERNAME or not check_password_hash(Config.ADMIN_PASSWORD_HASH, password):
+        try:
+            valid = username == Config.ADMIN_USERNAME and login_guard.check_password(Config.ADMIN_PASSWORD_HASH, password)
+        except TimeoutError:
+            return jsonify(message='Error. Server is busy, try again later'), 503, {'Retry-After': '1'}
+
+        if not valid:
             return jsonify({"message": "Error. Invalid credentials"}), 401
         
+        login_guard.reset(client)
         access_token = create_access_token(identity=username)
         return jsonify(access_token=access_token), 200
 
@@ -1,5 +1,5 @@
 from flask import request, redirect, jsonify, render_template
-from flasgger import swag_from
+from apidocs import swag_from
 
 def init_home_routes(app):
     @app.route('/', methods=['GET'])
@@ -1,11 +1,16 @@
-from flasgger import swag_from
+from apidocs import swag_from
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required
 
-from utilities import check_method, json
+from utilities import check_method, bulk_ids, bulk_items, bulk_results, cached_response, check_item_id, model_fields, parse_date, parse_fields, parse_page, stream_format, stream_response
+from models.post import Post
 from services.post_service import PostService
 
 def init_post_routes(app):
+
+    def validate_update(item):
+        check_item_id(item)
+        parse_date(item['date'])
     
     @app.route('/api/post/new', methods=['POST'])
     @jwt_required()
@@ -24,6 +29,11 @@ def init_post_routes(app):
             return jsonify({
                 'message': f'Error. Missing required fields: {", ".join(missing_fields)}'
             }), 400
+
+        try:
+            parse_date(data['date'])
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
         
         try:
             post = PostService.new_post(data)
@@ -52,6 +62,11 @@ def init_post_routes(app):
             return jsonify({
                 'message': f'Error. Missing required fields: {", ".join(missing_fields)}'
             }), 400
+
+        try:
+            parse_date(data['date'])
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
         
         try:
             PostService.update_post_by_id(data, id)
@@ -69,11 +84,28 @@ def init_post_routes(app):
             return jsonify(message='Error. Method not allowed'), 405
         
         try:
-            posts = PostService.get_all_posts()
-            if not posts:
+            fields = parse_fields(Post, request.args.get('fields'))
+            page = parse_page(request.args, sorts={'id': int, 'date': parse_date})
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        format = stream_format(request.environ)
+        if format and page.paginated:
+            return jsonify(message='Error. Streaming does not support limit and cursor'), 400
+
+        try:
+            if format:
+                response = stream_response(PostService.stream_all_posts(fields, page), fields or model_fields(Post), format)
+                if not response:
+                    return jsonify(message='Error. Posts were not found'), 404
+
+                return response
+
+            payload = PostService.get_all_posts_json(fields, page)
+            if not payload:
                 return jsonify(message='Error. Posts were not found'), 404
             
-            return jsonify([json(post) for post in posts]), 200
+            return cached_response(payload)
         
         except Exception as e:
             return jsonify(message=f'Internal error. {str(e)}'), 500
@@ -90,11 +122,16 @@ def init_post_routes(app):
             return jsonify(message='Error. Invalid id', id=id), 400
 
         try:
-            post = PostService.get_post_by_id(id)
-            if not post:
+            fields = parse_fields(Post, request.args.get('fields'))
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            payload = PostService.get_post_by_id_json(id, fields)
+            if not payload:
                 return jsonify(message='Error. Post with such id does not exist'), 404
 
-            return jsonify(json(post)), 200
+            return cached_response(payload, private=True)
 
         except Exception as e:
             return jsonify(message=f'Internal error. {str(e)}'), 500
@@ -118,4 +155,87 @@ def init_post_routes(app):
             return jsonify(message='Record was successfully deleted'), 200
 
         except Exception as e:
-            return jsonify(message=f'Internal error. {str(e)}'), 500
\ No newline at end of file
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.route('/api/post/bulk/new', methods=['POST'])
+    @jwt_required()
+    @swag_from('../docs/posts/bulk_new_posts.yml')
+    def bulk_new_posts():
+        if not check_method(request.method, 'POST'):
+            return jsonify(message='Error. Method not allowed'), 405
+
+        try:
+            items, results = bulk_items(
+                request.get_json(silent=True),
+                ['label', 'text', 'img', 'link', 'date', 'mode'],
+                app.config['BULK_MAX_ITEMS'], validate=lambda item: parse_date(item['date'])
+            )
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            ids = PostService.bulk_new_posts([item for _, item in items])
+            results += [{'index': index, 'id': id, 'status': 'created'} for (index, _), id in zip(items, ids)]
+
+            return jsonify(results=bulk_results(results)), 200
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.route('/api/post/bulk/update', methods=['PUT'])
+    @jwt_required()
+    @swag_from('../docs/posts/bulk_update_posts.yml')
+    def bulk_update_posts():
+        if not check_method(request.method, 'PUT'):
+            return jsonify(message='Error. Method not allowed'), 405
+
+        try:
+            items, results = bulk_items(
+                request.get_json(silent=True),
+                ['id', 'label', 'text', 'img', 'link', 'date', 'mode'],
+                app.config['BULK_MAX_ITEMS'],
+                validate=validate_update
+            )
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            updated = PostService.bulk_update_posts([item for _, item in items])
+            for index, item in items:
+                if item['id'] in updated:
+                    results.append({'index': index, 'id': item['id'], 'status': 'updated'})
+                else:
+                    results.append({'index': index, 'id': item['id'], 'status': 'error', 'message': 'Error. Record does not exist'})
+
+            return jsonify(results=bulk_results(results)), 200
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.route('/api/post/bulk/delete', methods=['DELETE'])
+    @jwt_required()
+    @swag_from('../docs/posts/bulk_delete_posts.yml')
+    def bulk_delete_posts():
+        if not check_method(request.method, 'DELETE'):
+            return jsonify(message='Error. Method not allowed'), 405
+
+        try:
+            ids = bulk_ids(request.get_json(silent=True), app.config['BULK_MAX_ITEMS'])
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            deleted = PostService.bulk_delete_posts(ids)
+            results = [
+                {'index': index, 'id': id, 'status': 'deleted'} if id in deleted
+                else {'index': index, 'id': id, 'status': 'error', 'message': 'Error. Record does not exist'}
+                for index, id in enumerate(ids)
+            ]
+
+            return jsonify(results=results), 200
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
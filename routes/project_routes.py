@@ -1,8 +1,9 @@
-from flasgger import swag_from
+from apidocs import swag_from
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required
 
-from utilities import check_method, json
+from utilities import check_method, bulk_ids, bulk_items, bulk_results, cached_response, check_item_id, model_fields, parse_fields, parse_page, stream_format, stream_response
+from models.projects import Project
 from services.project_service import ProjectService
 
 def init_project_routes(app):
@@ -69,11 +70,28 @@ def init_project_routes(app):
             return jsonify(message='Error. Method not allowed'), 405
         
         try:
-            projects = ProjectService.get_all_projects()
-            if not projects:
+            fields = parse_fields(Project, request.args.get('fields'))
+            page = parse_page(request.args)
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        format = stream_format(request.environ)
+        if format and page.paginated:
+            return jsonify(message='Error. Streaming does not support limit and cursor'), 400
+
+        try:
+            if format:
+                response = stream_response(ProjectService.stream_all_projects(fields, page), fields or model_fields(Project), format)
+                if not response:
+                    return jsonify(message='Projects were not found'), 404
+
+                return response
+
+            payload = ProjectService.get_all_projects_json(fields, page)
+            if not payload:
                 return jsonify(message='Projects were not found'), 404
             
-            return jsonify([json(project) for project in projects]), 200
+            return cached_response(payload)
         
         except Exception as e:
             return jsonify(message=f'Internal error. {str(e)}'), 500
@@ -90,12 +108,40 @@ def init_project_routes(app):
             return jsonify(error='Invalid id', id=id), 400
 
         try:
-            project = ProjectService.get_project_by_id(id)
+            fields = parse_fields(Project, request.args.get('fields'))
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            payload = ProjectService.get_project_by_id_json(id, fields)
             
-            if not project:
+            if not payload:
                 return jsonify(message='Project with such id does not exist'), 404
 
-            return jsonify(json(project)), 200
+            return cached_response(payload, private=True)
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.route('/api/project/list/technology/<int:id>', methods=['GET'])
+    @swag_from('../docs/projects/get_projects_by_technology.yml')
+    def get_projects_by_technology(id: int):
+        if not check_method(request.method, 'GET'):
+            return jsonify(message='Error. Method not allowed'), 405
+
+        try:
+            fields = parse_fields(Project, request.args.get('fields'))
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            payload = ProjectService.get_projects_by_technology_json(id, fields)
+
+            if not payload:
+                return jsonify(message='Projects with such technology were not found'), 404
+
+            return cached_response(payload)
 
         except Exception as e:
             return jsonify(message=f'Internal error. {str(e)}'), 500
@@ -119,4 +165,87 @@ def init_project_routes(app):
             return jsonify(message='Record was successfully deleted'), 200
 
         except Exception as e:
-            return jsonify(message=f'Internal error. {str(e)}'), 500
\ No newline at end of file
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.route('/api/project/bulk/new', methods=['POST'])
+    @jwt_required()
+    @swag_from('../docs/projects/bulk_new_projects.yml')
+    def bulk_new_projects():
+        if not check_method(request.method, 'POST'):
+            return jsonify(message='Error. Method not allowed'), 405
+
+        try:
+            items, results = bulk_items(
+                request.get_json(silent=True),
+                ['label', 'text', 'img', 'stack', 'link', 'mode'],
+                app.config['BULK_MAX_ITEMS']
+            )
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            ids = ProjectService.bulk_new_projects([item for _, item in items])
+            results += [{'index': index, 'id': id, 'status': 'created'} for (index, _), id in zip(items, ids)]
+
+            return jsonify(results=bulk_results(results)), 200
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.route('/api/project/bulk/update', methods=['PUT'])
+    @jwt_required()
+    @swag_from('../docs/projects/bulk_update_projects.yml')
+    def bulk_update_projects():
+        if not check_method(request.method, 'PUT'):
+            return jsonify(message='Error. Method not allowed'), 405
+
+        try:
+            items, results = bulk_items(
+                request.get_json(silent=True),
+                ['id', 'label', 'text', 'img', 'stack', 'link', 'mode'],
+                app.config['BULK_MAX_ITEMS'],
+                validate=check_item_id
+            )
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            updated = ProjectService.bulk_update_projects([item for _, item in items])
+            for index, item in items:
+                if item['id'] in updated:
+                    results.append({'index': index, 'id': item['id'], 'status': 'updated'})
+                else:
+                    results.append({'index': index, 'id': item['id'], 'status': 'error', 'message': 'Error. Record does not exist'})
+
+            return jsonify(results=bulk_results(results)), 200
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.route('/api/project/bulk/delete', methods=['DELETE'])
+    @jwt_required()
+    @swag_from('../docs/projects/bulk_delete_projects.yml')
+    def bulk_delete_projects():
+        if not check_method(request.method, 'DELETE'):
+            return jsonify(message='Error. Method not allowed'), 405
+
+        try:
+            ids = bulk_ids(request.get_json(silent=True), app.config['BULK_MAX_ITEMS'])
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            deleted = ProjectService.bulk_delete_projects(ids)
+            results = [
+                {'index': index, 'id': id, 'status': 'deleted'} if id in deleted
+                else {'index': index, 'id': id, 'status': 'error', 'message': 'Error. Record does not exist'}
+                for index, id in enumerate(ids)
+            ]
+
+            return jsonify(results=results), 200
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
@@ -0,0 +1,36 @@
+from flask import request, jsonify
+
+from apidocs import swag_from
+from utilities import check_method, json_response, json_value
+from services.search_service import SearchService, SEARCH_TYPES
+
+def init_search_routes(app):
+
+    @app.route('/api/search', methods=['GET'])
+    @swag_from('../docs/search/search.yml')
+    def search():
+        if not check_method(request.method, 'GET'):
+            return jsonify(message='Error. Method not allowed'), 405
+
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify(message='Error. Missing query parameter q'), 400
+        if len(query) > 200:
+            return jsonify(message='Error. Query is longer than 200 characters'), 400
+
+        type = request.args.get('type')
+        if type is not None and type not in SEARCH_TYPES:
+            return jsonify(message=f'Error. Invalid type {type}. Allowed: {", ".join(SEARCH_TYPES)}'), 400
+
+        limit, offset = request.args.get('limit', '20'), request.args.get('offset', '0')
+        if not (limit.isascii() and limit.isdigit()) or not 0 < int(limit) <= 50:
+            return jsonify(message=f'Error. Invalid limit {limit}. Must be between 1 and 50'), 400
+        if not (offset.isascii() and offset.isdigit()):
+            return jsonify(message=f'Error. Invalid offset {offset}'), 400
+
+        try:
+            result = SearchService.search(query, (type,) if type else tuple(SEARCH_TYPES), int(limit), int(offset))
+            return json_response(json_value(result))
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
@@ -1,11 +1,20 @@
-from flasgger import swag_from
+from apidocs import swag_from
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required
 
-from utilities import check_method, json
+from utilities import check_method, bulk_ids, bulk_items, bulk_results, cached_response, check_item_id, model_fields, parse_fields, stream_format, stream_response
+from models.technology import Technology, GROUPS
 from services.technology_service import TechnologyService
 
 def init_technology_routes(app):
+
+    def check_group(item):
+        if item['group'] not in GROUPS:
+            raise ValueError(f'Invalid group {item["group"]}')
+
+    def validate_update(item):
+        check_item_id(item)
+        check_group(item)
     
     @app.route('/api/technology/new', methods=['POST'])
     @jwt_required()
@@ -24,6 +33,9 @@ def init_technology_routes(app):
             return jsonify({
                 'message': f'Error. Missing required fields: {", ".join(missing_fields)}'
             }), 400
+
+        if data['group'] not in GROUPS:
+            return jsonify(message=f'Error. Invalid group {data["group"]}'), 400
         
         try:
             technology = TechnologyService.new_technology(data)
@@ -53,6 +65,9 @@ def init_technology_routes(app):
                 'message': f'Error. Missing required fields: {", ".join(missing_fields)}'
             }), 400
         
+        if data['group'] not in GROUPS:
+            return jsonify(message=f'Error. Invalid group {data["group"]}'), 400
+
         try:
             TechnologyService.update_technology_by_id(data, id)
             return jsonify(message='Record was successfully updated'), 200
@@ -69,11 +84,24 @@ def init_technology_routes(app):
             return jsonify(message='Error. Method not allowed'), 405
         
         try:
-            technologies = TechnologyService.get_all_technologys()
-            if not technologies:
+            fields = parse_fields(Technology, request.args.get('fields'))
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            format = stream_format(request.environ)
+            if format:
+                response = stream_response(TechnologyService.stream_all_technologys(fields), fields or model_fields(Technology), format)
+                if not response:
+                    return jsonify(message='Technologies were not found'), 404
+
+                return response
+
+            payload = TechnologyService.get_all_technologys_json(fields)
+            if not payload:
                 return jsonify(message='Technologies were not found'), 404
             
-            return jsonify([json(technology) for technology in technologies]), 200
+            return cached_response(payload)
         
         except Exception as e:
             return jsonify(message=f'Internal error. {str(e)}'), 500
@@ -90,12 +118,17 @@ def init_technology_routes(app):
             return jsonify(message='Error. Invalid id', id=id), 400
 
         try:
-            technology = TechnologyService.get_technology_by_id(id)
+            fields = parse_fields(Technology, request.args.get('fields'))
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            payload = TechnologyService.get_technology_by_id_json(id, fields)
             
-            if not technology:
+            if not payload:
                 return jsonify(message='Technology with such id does not exist'), 404
 
-            return jsonify(json(technology)), 200
+            return cached_response(payload, private=True)
 
         except Exception as e:
             return jsonify(message=f'Internal error. {str(e)}'), 500
@@ -108,16 +141,64 @@ def init_technology_routes(app):
         if not check_method(request.method, 'GET'):
             return jsonify(message='Error. Method not allowed'), 405
         
-        if group not in ('fund', 'ide_os', 'lang_tech'):
+        if group not in GROUPS:
             return jsonify(message=f'Error. Invalid group {group}', id=id), 400
 
         try:
-            technologies = TechnologyService.get_technologies_by_group(group)
+            fields = parse_fields(Technology, request.args.get('fields'))
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            payload = TechnologyService.get_technologies_by_group_json(group, fields)
             
-            if not technologies:
+            if not payload:
                 return jsonify(message='Technologies with such group does not exist'), 404
 
-            return jsonify([json(technology) for technology in technologies]), 200
+            return cached_response(payload, private=True)
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.route('/api/technology/list/project/<int:id>', methods=['GET'])
+    @jwt_required()
+    @swag_from('../docs/technologies/get_technologies_by_project.yml')
+    def get_technologies_by_project(id: int):
+        if not check_method(request.method, 'GET'):
+            return jsonify(message='Error. Method not allowed'), 405
+
+        try:
+            fields = parse_fields(Technology, request.args.get('fields'))
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            payload = TechnologyService.get_technologies_by_project_json(id, fields)
+
+            if not payload:
+                return jsonify(message='Technologies of such project were not found'), 404
+
+            return cached_response(payload, private=True)
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.route('/api/technology/groups', methods=['GET'])
+    @jwt_required()
+    @swag_from('../docs/technologies/get_technologies_grouped.yml')
+    def get_technologies_grouped():
+        if not check_method(request.method, 'GET'):
+            return jsonify(message='Error. Method not allowed'), 405
+
+        try:
+            payload = TechnologyService.get_technologies_grouped_json()
+
+            if not payload:
+                return jsonify(message='Technologies were not found'), 404
+
+            return cached_response(payload, private=True)
 
         except Exception as e:
             return jsonify(message=f'Internal error. {str(e)}'), 500
@@ -142,3 +223,87 @@ def init_technology_routes(app):
 
         except Exception as e:
             return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.route('/api/technology/bulk/new', methods=['POST'])
+    @jwt_required()
+    @swag_from('../docs/technologies/bulk_new_technologies.yml')
+    def bulk_new_technologies():
+        if not check_method(request.method, 'POST'):
+            return jsonify(message='Error. Method not allowed'), 405
+
+        try:
+            items, results = bulk_items(
+                request.get_json(silent=True),
+                ['label', 'img', 'group', 'mode'],
+                app.config['BULK_MAX_ITEMS'],
+                validate=check_group
+            )
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            ids = TechnologyService.bulk_new_technologies([item for _, item in items])
+            results += [{'index': index, 'id': id, 'status': 'created'} for (index, _), id in zip(items, ids)]
+
+            return jsonify(results=bulk_results(results)), 200
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.route('/api/technology/bulk/update', methods=['PUT'])
+    @jwt_required()
+    @swag_from('../docs/technologies/bulk_update_technologies.yml')
+    def bulk_update_technologies():
+        if not check_method(request.method, 'PUT'):
+            return jsonify(message='Error. Method not allowed'), 405
+
+        try:
+            items, results = bulk_items(
+                request.get_json(silent=True),
+                ['id', 'label', 'img', 'group', 'mode'],
+                app.config['BULK_MAX_ITEMS'],
+                validate=validate_update
+            )
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            updated = TechnologyService.bulk_update_technologies([item for _, item in items])
+            for index, item in items:
+                if item['id'] in updated:
+                    results.append({'index': index, 'id': item['id'], 'status': 'updated'})
+                else:
+                    results.append({'index': index, 'id': item['id'], 'status': 'error', 'message': 'Error. Record does not exist'})
+
+            return jsonify(results=bulk_results(results)), 200
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
+
+
+    @app.route('/api/technology/bulk/delete', methods=['DELETE'])
+    @jwt_required()
+    @swag_from('../docs/technologies/bulk_delete_technologies.yml')
+    def bulk_delete_technologies():
+        if not check_method(request.method, 'DELETE'):
+            return jsonify(message='Error. Method not allowed'), 405
+
+        try:
+            ids = bulk_ids(request.get_json(silent=True), app.config['BULK_MAX_ITEMS'])
+        except ValueError as e:
+            return jsonify(message=f'Error. {str(e)}'), 400
+
+        try:
+            deleted = TechnologyService.bulk_delete_technologies(ids)
+            results = [
+                {'index': index, 'id': id, 'status': 'deleted'} if id in deleted
+                else {'index': index, 'id': id, 'status': 'error', 'message': 'Error. Record does not exist'}
+                for index, id in enumerate(ids)
+            ]
+
+            return jsonify(results=results), 200
+
+        except Exception as e:
+            return jsonify(message=f'Internal error. {str(e)}'), 500
@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+import time
+
+from instrumentation import access_logger
+
+
+class Job:
+    __slots__ = ('name', 'interval', 'func', 'next_run', 'runs', 'failures', 'last_duration', 'last_error')
+
+    def __init__(self, name: str, interval: float, func):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.next_run = 0.0
+        self.runs = 0
+        self.failures = 0
+        self.last_duration = 0.0
+        self.last_error = None
+
+
+class Scheduler:
+    """Periodic jobs on a daemon thread, started once per process.
+
+    Threads do not survive fork, so every gunicorn worker starts its own one
+    (post_worker_init, or the first request as a fallback). The master never does.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.enabled = True
+        self.jobs: dict[str, Job] = {}
+
+        self._pid = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('SCHEDULER_ENABLED', self.enabled)
+        self.jobs = {}
+        app.before_request(self._before_request)
+        app.extensions['scheduler'] = self
+
+    def add(self, name: str, interval: float, func):
+        self.jobs[name] = Job(name, interval, func)
+
+    def _before_request(self):
+        if self.enabled and self._pid != os.getpid():
+            self.start()
+
+    def start(self):
+        with self._lock:
+            if not self.enabled or self._pid == os.getpid():
+                return
+
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+            for job in self.jobs.values():
+                job.next_run = 0.0
+
+            self._thread = threading.Thread(target=self._run, name='ccrayp-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            self._stop.set()
+            if self._thread is not None and self._pid == os.getpid():
+                self._thread.join(timeout=5)
+            self._pid = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._stop.wait(self.run_pending())
+
+    def run_pending(self) -> float:
+        for job in list(self.jobs.values()):
+            if job.next_run <= time.monotonic():
+                self.run(job)
+
+        if not self.jobs:
+            return 60.0
+
+        return max(min(job.next_run for job in self.jobs.values()) - time.monotonic(), 0.1)
+
+    def run(self, job: Job):
+        started = time.perf_counter()
+        try:
+            with self.app.app_context():
+                job.func()
+            job.last_error = None
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            access_logger.warning(json.dumps({'warning': 'scheduled job failed', 'job': job.name, 'error': str(e)}))
+        finally:
+            job.runs += 1
+            job.last_duration = time.perf_counter() - started
+            job.next_run = time.monotonic() + job.interval
+
+    def stats(self) -> dict[str, any]:
+        return {
+            'running': self._thread is not None and self._thread.is_alive() and self._pid == os.getpid(),
+            'jobs': {
+                job.name: {
+                    'interval': job.interval,
+                    'runs': job.runs,
+                    'failures': job.failures,
+                    'last_duration_ms': round(job.last_duration * 1000, 2),
+                    'last_error': job.last_error,
+                    'next_run_in': round(max(job.next_run - time.monotonic(), 0.0), 2),
+                }
+                for job in self.jobs.values()
+            },
+        }
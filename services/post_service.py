@@ -1,5 +1,8 @@
-from utilities import db
+from sqlalchemy import delete, insert, select, update
+
+from utilities import db, async_db, after_commit, cache, cache_key, parse_date, parse_mode, select_page, streamed, json_one, json_page, Page
 from models.post import Post
+from services.search_service import search_index
 
 class PostService():
 
@@ -11,18 +14,21 @@ class PostService():
                 text=data['text'],
                 img=data['img'],
                 link=data['link'],
-                date=data['date'],
+                date=parse_date(data['date']),
                 mode= True if data['mode'] == 'true' else False
             )
 
             db.session.add(post)
             db.session.commit()
 
-            return post
-
         except:
             db.session.rollback()
             raise
+
+        with after_commit('posts'):
+            search_index.put('post', post.id, {'label': post.label, 'text': post.text})
+
+        return post
         
 
     @staticmethod
@@ -34,7 +40,7 @@ class PostService():
             post.text = data['text']
             post.img = data['img']
             post.link = data['link']
-            post.date = data['date']
+            post.date = parse_date(data['date'])
             post.mode = True if data['mode'] == 'true' else False
             
             db.session.commit()
@@ -43,11 +49,14 @@ class PostService():
             db.session.rollback()
             raise
 
+        with after_commit('posts'):
+            search_index.put('post', id, {'label': data['label'], 'text': data['text']})
+
 
     @staticmethod
-    def get_all_posts():
+    def get_all_posts(fields=None, page=Page()):
         try:
-            posts = Post.query.all()
+            posts = db.session.execute(select_page(Post, fields, page)).mappings().all()
             
             if not posts:
                 return None
@@ -58,6 +67,24 @@ class PostService():
             raise
 
 
+    @staticmethod
+    def stream_all_posts(fields=None, page=Page()):
+        try:
+            return db.session.execute(streamed(select_page(Post, fields, page)))
+
+        except:
+            raise
+
+
+    @staticmethod
+    def get_all_posts_json(fields=None, page=Page()):
+        return cache.fetch(
+            'posts',
+            cache_key('list', fields, page),
+            lambda: json_page(Post, PostService.get_all_posts(fields, page), fields, page)
+        )
+
+
     @staticmethod
     def get_post_by_id(id: int):
         try:
@@ -72,6 +99,57 @@ class PostService():
             raise
 
 
+    @staticmethod
+    def get_post_by_id_json(id: int, fields=None):
+        return cache.fetch('posts', cache_key(f'id:{id}', fields), lambda: json_one(PostService.get_post_by_id(id), fields))
+
+
+    @staticmethod
+    async def get_all_posts_async(fields=None, page=Page()):
+        try:
+            async with async_db.session() as session:
+                posts = (await session.execute(select_page(Post, fields, page))).mappings().all()
+
+            if not posts:
+                return None
+
+            return posts
+
+        except:
+            raise
+
+
+    @staticmethod
+    async def get_all_posts_json_async(fields=None, page=Page()):
+        async def build():
+            return json_page(Post, await PostService.get_all_posts_async(fields, page), fields, page)
+
+        return await cache.fetch_async('posts', cache_key('list', fields, page), build)
+
+
+    @staticmethod
+    async def get_post_by_id_async(id: int):
+        try:
+            async with async_db.session() as session:
+                post = await session.get(Post, id)
+
+            if not post:
+                return None
+
+            return post
+
+        except:
+            raise
+
+
+    @staticmethod
+    async def get_post_by_id_json_async(id: int, fields=None):
+        async def build():
+            return json_one(await PostService.get_post_by_id_async(id), fields)
+
+        return await cache.fetch_async('posts', cache_key(f'id:{id}', fields), build)
+
+
     @staticmethod
     def delete_post_by_id(id: int):
         try:
@@ -83,13 +161,101 @@ class PostService():
 
             db.session.delete(post)
             db.session.commit()
-
-            return temp
             
         except:
             db.session.rollback()
             raise
 
+        with after_commit('posts'):
+            search_index.remove('post', [id])
+
+        return temp
+
+
+    @staticmethod
+    def _values(data) -> dict:
+        return {
+            'label': data['label'],
+            'text': data['text'],
+            'img': data['img'],
+            'link': data['link'],
+            'date': parse_date(data['date']),
+            'mode': parse_mode(data['mode']),
+        }
+
+
+    @staticmethod
+    def bulk_new_posts(items) -> list[int]:
+        if not items:
+            return []
+
+        try:
+            ids = db.session.scalars(
+                insert(Post).returning(Post.id, sort_by_parameter_order=True),
+                [PostService._values(item) for item in items]
+            ).all()
+
+            db.session.commit()
+
+        except:
+            db.session.rollback()
+            raise
+
+        with after_commit('posts'):
+            for id, item in zip(ids, items):
+                search_index.put('post', id, item)
+
+        return ids
+
+
+    @staticmethod
+    def bulk_update_posts(items) -> set[int]:
+        if not items:
+            return set()
+
+        try:
+            existing = set(db.session.scalars(
+                select(Post.id).where(Post.id.in_([item['id'] for item in items]))
+            ))
+
+            rows = [{'id': item['id'], **PostService._values(item)} for item in items if item['id'] in existing]
+            if rows:
+                db.session.execute(update(Post), rows)
+                db.session.commit()
+
+        except:
+            db.session.rollback()
+            raise
+
+        if rows:
+            with after_commit('posts'):
+                for row in rows:
+                    search_index.put('post', row['id'], row)
+
+        return existing
+
+
+    @staticmethod
+    def bulk_delete_posts(ids: list[int]) -> set[int]:
+        try:
+            existing = set(db.session.scalars(select(Post.id).where(Post.id.in_(ids))))
+
+            if existing:
+                db.session.execute(
+                    delete(Post).where(Post.id.in_(existing)).execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+
+        except:
+            db.session.rollback()
+            raise
+
+        if existing:
+            with after_commit('posts'):
+                search_index.remove('post', existing)
+
+        return existing
+
 
     # @staticmethod
     # def delete_all_posts():
\ No newline at end of file
@@ -1,5 +1,10 @@
-from utilities import db
+from sqlalchemy import delete, insert, select, update
+
+from utilities import db, async_db, after_commit, cache, cache_key, parse_mode, parse_stack, select_columns, select_page, streamed, json_one, json_page, json_rows, Page
+from models.project_technology import project_technologies
 from models.projects import Project
+from models.technology import Technology
+from services.search_service import search_index
 
 class ProjectService():
     
@@ -16,13 +21,18 @@ class ProjectService():
             )
 
             db.session.add(project)
+            db.session.flush()
+            ProjectService.link_technologies({project.id: project.stack})
             db.session.commit()
 
-            return project
-
         except:
             db.session.rollback()
             raise
+
+        with after_commit('projects', 'stacks'):
+            search_index.put('project', project.id, {'label': project.label, 'text': project.text, 'stack': project.stack})
+
+        return project
         
 
     @staticmethod
@@ -37,17 +47,21 @@ class ProjectService():
             project.link = data['link']
             project.mode = True if data['mode'] == 'true' else False
             
+            ProjectService.link_technologies({id: data['stack']})
             db.session.commit()
 
         except:
             db.session.rollback()
             raise
 
+        with after_commit('projects', 'stacks'):
+            search_index.put('project', id, {'label': data['label'], 'text': data['text'], 'stack': data['stack']})
+
 
     @staticmethod
-    def get_all_projects():
+    def get_all_projects(fields=None, page=Page()):
         try:
-            projects = Project.query.all()
+            projects = db.session.execute(select_page(Project, fields, page)).mappings().all()
             
             if not projects:
                 return None
@@ -58,6 +72,24 @@ class ProjectService():
             raise
 
 
+    @staticmethod
+    def stream_all_projects(fields=None, page=Page()):
+        try:
+            return db.session.execute(streamed(select_page(Project, fields, page)))
+
+        except:
+            raise
+
+
+    @staticmethod
+    def get_all_projects_json(fields=None, page=Page()):
+        return cache.fetch(
+            'projects',
+            cache_key('list', fields, page),
+            lambda: json_page(Project, ProjectService.get_all_projects(fields, page), fields, page)
+        )
+
+
     @staticmethod
     def get_project_by_id(id: int):
         try:
@@ -72,6 +104,125 @@ class ProjectService():
             raise
 
 
+    @staticmethod
+    def get_project_by_id_json(id: int, fields=None):
+        return cache.fetch('projects', cache_key(f'id:{id}', fields), lambda: json_one(ProjectService.get_project_by_id(id), fields))
+
+
+    @staticmethod
+    async def get_all_projects_async(fields=None, page=Page()):
+        try:
+            async with async_db.session() as session:
+                projects = (await session.execute(select_page(Project, fields, page))).mappings().all()
+
+            if not projects:
+                return None
+
+            return projects
+
+        except:
+            raise
+
+
+    @staticmethod
+    async def get_all_projects_json_async(fields=None, page=Page()):
+        async def build():
+            return json_page(Project, await ProjectService.get_all_projects_async(fields, page), fields, page)
+
+        return await cache.fetch_async('projects', cache_key('list', fields, page), build)
+
+
+    @staticmethod
+    async def get_project_by_id_async(id: int):
+        try:
+            async with async_db.session() as session:
+                project = await session.get(Project, id)
+
+            if not project:
+                return None
+
+            return project
+
+        except:
+            raise
+
+
+    @staticmethod
+    async def get_project_by_id_json_async(id: int, fields=None):
+        async def build():
+            return json_one(await ProjectService.get_project_by_id_async(id), fields)
+
+        return await cache.fetch_async('projects', cache_key(f'id:{id}', fields), build)
+
+
+    @staticmethod
+    def get_projects_by_technology(technology_id: int, fields=None):
+        try:
+            projects = db.session.execute(
+                select_columns(Project, fields)
+                .join(project_technologies, project_technologies.c.project_id == Project.id)
+                .where(project_technologies.c.technology_id == technology_id)
+                .order_by(Project.id)
+            ).mappings().all()
+
+            if not projects:
+                return None
+
+            return projects
+
+        except:
+            raise
+
+
+    @staticmethod
+    def get_projects_by_technology_json(technology_id: int, fields=None):
+        return cache.fetch(
+            'stacks',
+            cache_key(f'projects:{technology_id}', fields),
+            lambda: json_rows(ProjectService.get_projects_by_technology(technology_id, fields))
+        )
+
+
+    @staticmethod
+    def link_technologies(stacks: dict[int, str]) -> set[str]:
+        # Tags are matched to technologies by label, case-insensitively; unknown ones are returned
+        labels = {label.strip().lower(): id for id, label in db.session.execute(select(Technology.id, Technology.label))}
+
+        db.session.execute(delete(project_technologies).where(project_technologies.c.project_id.in_(stacks)))
+
+        rows, unknown = [], set()
+        for project_id, stack in stacks.items():
+            for tag in parse_stack(stack):
+                if tag in labels:
+                    rows.append({'project_id': project_id, 'technology_id': labels[tag]})
+                else:
+                    unknown.add(tag)
+
+        if rows:
+            db.session.execute(insert(project_technologies), rows)
+
+        return unknown
+
+
+    @staticmethod
+    def link_all_technologies() -> set[str]:
+        return ProjectService.link_technologies(dict(db.session.execute(select(Project.id, Project.stack)).all()))
+
+
+    @staticmethod
+    def link_technologies_by_label(labels) -> set[str]:
+        # A technology write only changes the links of projects whose stack names its old or new label
+        labels = {label.strip().lower() for label in labels if label}
+        stacks = {
+            id: stack for id, stack in db.session.execute(select(Project.id, Project.stack))
+            if labels.intersection(parse_stack(stack))
+        }
+        if not stacks:
+            return set()
+
+        return ProjectService.link_technologies(stacks)
+
+
     @staticmethod
     def delete_project_by_id(id: int):
         try:
@@ -83,13 +234,104 @@ class ProjectService():
 
             db.session.delete(project)
             db.session.commit()
-
-            return temp
             
         except:
             db.session.rollback()
             raise
 
+        with after_commit('projects', 'stacks'):
+            search_index.remove('project', [id])
+
+        return temp
+
+
+    @staticmethod
+    def _values(data) -> dict:
+        return {
+            'label': data['label'],
+            'text': data['text'],
+            'img': data['img'],
+            'stack': data['stack'],
+            'link': data['link'],
+            'mode': parse_mode(data['mode']),
+        }
+
+
+    @staticmethod
+    def bulk_new_projects(items) -> list[int]:
+        if not items:
+            return []
+
+        try:
+            ids = db.session.scalars(
+                insert(Project).returning(Project.id, sort_by_parameter_order=True),
+                [ProjectService._values(item) for item in items]
+            ).all()
+
+            ProjectService.link_technologies({id: item['stack'] for id, item in zip(ids, items)})
+            db.session.commit()
+
+        except:
+            db.session.rollback()
+            raise
+
+        with after_commit('projects', 'stacks'):
+            for id, item in zip(ids, items):
+                search_index.put('project', id, item)
+
+        return ids
+
+
+    @staticmethod
+    def bulk_update_projects(items) -> set[int]:
+        if not items:
+            return set()
+
+        try:
+            existing = set(db.session.scalars(
+                select(Project.id).where(Project.id.in_([item['id'] for item in items]))
+            ))
+
+            rows = [{'id': item['id'], **ProjectService._values(item)} for item in items if item['id'] in existing]
+            if rows:
+                db.session.execute(update(Project), rows)
+                ProjectService.link_technologies({row['id']: row['stack'] for row in rows})
+                db.session.commit()
+
+        except:
+            db.session.rollback()
+            raise
+
+        if rows:
+            with after_commit('projects', 'stacks'):
+                for row in rows:
+                    search_index.put('project', row['id'], row)
+
+        return existing
+
+
+    @staticmethod
+    def bulk_delete_projects(ids: list[int]) -> set[int]:
+        try:
+            existing = set(db.session.scalars(select(Project.id).where(Project.id.in_(ids))))
+
+            if existing:
+                db.session.execute(delete(project_technologies).where(project_technologies.c.project_id.in_(existing)))
+                db.session.execute(
+                    delete(Project).where(Project.id.in_(existing)).execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+
+        except:
+            db.session.rollback()
+            raise
+
+        if existing:
+            with after_commit('projects', 'stacks'):
+                search_index.remove('project', existing)
+
+        return existing
+
 
     # @staticmethod
     # def delete_all_projects():
@@ -0,0 +1,258 @@
+import heapq
+import math
+import re
+import threading
+
+from markupsafe import escape
+from sqlalchemy import func, literal, literal_column, select, union_all
+
+from utilities import db
+from models.post import Post, SEARCH_VECTOR as POST_VECTOR
+from models.projects import Project, SEARCH_VECTOR as PROJECT_VECTOR
+
+TOKEN = re.compile(r'\w+')
+# ts_headline marks matches with control characters, so the text can be escaped before they become <mark>
+START_SEL, STOP_SEL = '\x02', '\x03'
+HEADLINE_OPTIONS = f'StartSel={START_SEL}, StopSel={STOP_SEL}, MaxWords=35, MinWords=15, MaxFragments=2'
+SNIPPET = 160
+
+# Fields of every searchable type and their weight in the ranking
+SEARCH_TYPES = {
+    'post': (Post, {'label': 2.0, 'text': 1.0}),
+    'project': (Project, {'label': 2.0, 'text': 1.0, 'stack': 1.5}),
+}
+
+
+def tokenize(value: str | None) -> list[str]:
+    return TOKEN.findall(str(value or '').lower())
+
+
+def mark(headline: str | None) -> str:
+    return str(escape(headline or '')).replace(START_SEL, '<mark>').replace(STOP_SEL, '</mark>')
+
+
+def highlight(text: str, terms: set[str]) -> str:
+    # Texts are stored unescaped, only the <mark> tags are markup
+    text = str(text or '')
+    matches = [match for match in TOKEN.finditer(text) if match.group().lower() in terms]
+    if not matches:
+        return str(escape(text[:SNIPPET]))
+
+    start = max(matches[0].start() - SNIPPET // 4, 0)
+    space = text.find(' ', start, matches[0].start())
+    if start > 0 and space != -1:
+        start = space + 1
+    end = min(start + SNIPPET, len(text))
+
+    parts, position = [], start
+    for match in matches:
+        if match.start() < start:
+            continue
+        if match.end() > end:
+            break
+        parts += [escape(text[position:match.start()]), f'<mark>{escape(match.group())}</mark>']
+        position = match.end()
+    parts.append(escape(text[position:end]))
+
+    return ('…' if start > 0 else '') + ''.join(parts) + ('…' if end < len(text) else '')
+
+
+class SearchIndex:
+    """Inverted index of posts and projects with BM25 ranking, for databases
+    without full-text search (SQLite). Kept in memory and patched on every write;
+    the scheduler reloads it to pick up writes of other gunicorn workers."""
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._documents: dict[tuple[str, int], dict] | None = None
+        self._postings: dict[str, dict[tuple[str, int], float]] = {}
+        self._total_length = 0.0
+        self._pending: list[tuple] | None = None
+        self._lock = threading.Lock()
+
+    def _add(self, key: tuple[str, int], document: dict):
+        weights = {}
+        for field, weight in SEARCH_TYPES[key[0]][1].items():
+            for term in tokenize(document.get(field)):
+                weights[term] = weights.get(term, 0.0) + weight
+
+        length = sum(weights.values())
+        self._documents[key] = {'label': document['label'], 'text': document['text'], 'length': length, 'terms': tuple(weights)}
+        self._total_length += length
+        for term, frequency in weights.items():
+            self._postings.setdefault(term, {})[key] = frequency
+
+    def _discard(self, key: tuple[str, int]):
+        document = self._documents.pop(key, None)
+        if document is None:
+            return
+
+        self._total_length -= document['length']
+        for term in document['terms']:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+
+    def _load(self):
+        self._documents, self._postings, self._total_length = {}, {}, 0.0
+
+        for type, (model, fields) in SEARCH_TYPES.items():
+            table = model.__table__
+            rows = db.session.execute(select(table.c.id, *(table.c[field] for field in fields))).mappings()
+            for row in rows:
+                self._add((type, row['id']), row)
+
+    def _put(self, key: tuple[str, int], document: dict | None):
+        self._discard(key)
+        if document is not None:
+            self._add(key, document)
+
+    def put(self, type: str, id: int, document: dict):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(((type, id), document))
+            if self._documents is not None:
+                self._put((type, id), document)
+
+    def remove(self, type: str, ids):
+        with self._lock:
+            for id in ids:
+                if self._pending is not None:
+                    self._pending.append(((type, id), None))
+                if self._documents is not None:
+                    self._put((type, id), None)
+
+    def reload(self):
+        # Builds a fresh index without holding the lock; writes made meanwhile are replayed on it
+        with self._lock:
+            if self._documents is None or self._pending is not None:
+                return
+            self._pending = []
+
+        fresh = SearchIndex()
+        try:
+            fresh._load()
+        finally:
+            with self._lock:
+                pending, self._pending = self._pending, None
+
+        with self._lock:
+            for key, document in pending:
+                fresh._put(key, document)
+            self._documents, self._postings, self._total_length = fresh._documents, fresh._postings, fresh._total_length
+
+    def reset(self):
+        with self._lock:
+            self._documents = None
+
+    def search(self, query: str, types: tuple[str, ...], limit: int, offset: int) -> list[dict]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            if self._documents is None:
+                self._load()
+
+            postings = sorted((self._postings.get(term, {}) for term in terms), key=len)
+            if not postings[0]:
+                return []
+
+            count = len(self._documents)
+            average = self._total_length / count if count else 1.0
+            idf = [math.log(1 + (count - len(entries) + 0.5) / (len(entries) + 0.5)) for entries in postings]
+
+            # Every term must match: walk the rarest term's postings only
+            scored = []
+            for key in postings[0]:
+                if key[0] not in types or not all(key in entries for entries in postings[1:]):
+                    continue
+
+                norm = self.K1 * (1 - self.B + self.B * self._documents[key]['length'] / average)
+                score = sum(
+                    weight * entries[key] * (self.K1 + 1) / (entries[key] + norm)
+                    for weight, entries in zip(idf, postings)
+                )
+                scored.append((-score, key))
+
+            page = heapq.nsmallest(offset + limit + 1, scored)[offset:]
+            documents = [(score, key, self._documents[key]) for score, key in page]
+
+        return [
+            {
+                'type': key[0],
+                'id': key[1],
+                'label': document['label'],
+                'rank': round(-score, 4),
+                'highlight': highlight(document['text'], set(terms)),
+            }
+            for score, key, document in documents
+        ]
+
+
+search_index = SearchIndex()
+
+
+class SearchService():
+
+    @staticmethod
+    def _search_postgres(query: str, types: tuple[str, ...], limit: int, offset: int) -> list[dict]:
+        tsquery = func.websearch_to_tsquery(literal_column("'simple'"), query)
+
+        selects = []
+        for type, model, vector in (('post', Post, POST_VECTOR), ('project', Project, PROJECT_VECTOR)):
+            if type not in types:
+                continue
+
+            vector = literal_column(vector)
+            selects.append(
+                select(
+                    literal(type).label('type'),
+                    model.id,
+                    model.label,
+                    model.text,
+                    func.ts_rank_cd(vector, tsquery).label('rank'),
+                ).where(vector.op('@@')(tsquery))
+            )
+
+        ranked = union_all(*selects).subquery()
+        page = (
+            select(ranked)
+            .order_by(ranked.c.rank.desc(), ranked.c.type, ranked.c.id)
+            .limit(limit + 1)
+            .offset(offset)
+            .subquery()
+        )
+
+        # ts_headline reparses the whole text, so it only runs for the rows of the page
+        rows = db.session.execute(
+            select(
+                page.c.type,
+                page.c.id,
+                page.c.label,
+                page.c.rank,
+                func.ts_headline(literal_column("'simple'"), page.c.text, tsquery, HEADLINE_OPTIONS).label('highlight'),
+            ).order_by(page.c.rank.desc(), page.c.type, page.c.id)
+        ).mappings().all()
+
+        return [{**row, 'rank': round(row['rank'], 4), 'highlight': mark(row['highlight'])} for row in rows]
+
+
+    @staticmethod
+    def search(query: str, types: tuple[str, ...], limit: int = 20, offset: int = 0) -> dict:
+        try:
+            if db.engine.dialect.name == 'postgresql':
+                items = SearchService._search_postgres(query, types, limit, offset)
+            else:
+                items = search_index.search(query, types, limit, offset)
+
+            return {
+                'items': items[:limit],
+                'next_offset': offset + limit if len(items) > limit else None,
+            }
+
+        except:
+            raise
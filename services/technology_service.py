@@ -1,5 +1,58 @@
-from utilities import db
+import threading
+import time
+
+from sqlalchemy import delete, insert, select, update
+
+from utilities import db, async_db, after_commit, cache, cache_key, image_fields, parse_mode, select_columns, streamed, json_one, json_rows, json_value
+from models.project_technology import project_technologies
 from models.technology import Technology
+from services.project_service import ProjectService
+
+
+class TechnologyIndex:
+    """Technologies bucketed by group, kept in memory and patched on every write."""
+
+    def __init__(self):
+        self._rows: dict[int, dict] | None = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        rows = db.session.execute(select_columns(Technology).order_by(Technology.id)).mappings().all()
+        self._rows = {row['id']: dict(row) for row in rows}
+        self._loaded_at = time.monotonic()
+
+    def groups(self, ttl: float) -> dict[str, list[dict]]:
+        with self._lock:
+            # Other gunicorn workers may have written since the last load
+            if self._rows is None or self._loaded_at + ttl <= time.monotonic():
+                self._load()
+
+            groups = {}
+            for id in sorted(self._rows):
+                row = self._rows[id]
+                groups.setdefault(row['group'], []).append(row)
+
+            return groups
+
+    def put(self, row: dict):
+        with self._lock:
+            if self._rows is not None:
+                self._rows[row['id']] = row
+
+    def remove(self, ids):
+        with self._lock:
+            if self._rows is not None:
+                for id in ids:
+                    self._rows.pop(id, None)
+
+    def reset(self):
+        with self._lock:
+            self._rows = None
+
+
+technology_index = TechnologyIndex()
+
 
 class TechnologyService():
 
@@ -14,36 +67,49 @@ class TechnologyService():
             )
 
             db.session.add(technology)
+            db.session.flush()
+            ProjectService.link_technologies_by_label([technology.label])
             db.session.commit()
 
-            return technology
-
         except:
             db.session.rollback()
             raise
+
+        with after_commit('technologies', 'stacks'):
+            technology_index.put({'id': technology.id, **TechnologyService._values(data)})
+
+        return technology
         
 
     @staticmethod
     def update_technology_by_id(data, id: int):
         try:
             technology = Technology.query.get(id)
+            labels = [technology.label, data['label']]
             
             technology.label = data['label']
             technology.img = data['img']
             technology.group = data['group']
             technology.mode = True if data['mode'] == 'true' else False
             
+            db.session.flush()
+            ProjectService.link_technologies_by_label(labels)
             db.session.commit()
 
         except:
             db.session.rollback()
             raise
 
+        with after_commit('technologies', 'stacks'):
+            technology_index.put({'id': id, **TechnologyService._values(data)})
+
 
     @staticmethod
-    def get_all_technologys():
+    def get_all_technologys(fields=None):
         try:
-            technologies = Technology.query.all()
+            technologies = db.session.execute(
+                select_columns(Technology, fields).order_by(Technology.id)
+            ).mappings().all()
             
             if not technologies:
                 return None
@@ -54,6 +120,20 @@ class TechnologyService():
             raise
 
 
+    @staticmethod
+    def stream_all_technologys(fields=None):
+        try:
+            return db.session.execute(streamed(select_columns(Technology, fields).order_by(Technology.id)))
+
+        except:
+            raise
+
+
+    @staticmethod
+    def get_all_technologys_json(fields=None):
+        return cache.fetch('technologies', cache_key('list', fields), lambda: json_rows(TechnologyService.get_all_technologys(fields)))
+
+
     @staticmethod
     def get_technology_by_id(id: int):
         try:
@@ -69,9 +149,16 @@ class TechnologyService():
 
 
     @staticmethod
-    def get_technologies_by_group(group: str):
+    def get_technology_by_id_json(id: int, fields=None):
+        return cache.fetch('technologies', cache_key(f'id:{id}', fields), lambda: json_one(TechnologyService.get_technology_by_id(id), fields))
+
+
+    @staticmethod
+    def get_technologies_by_group(group: str, fields=None):
         try:
-            technologies = Technology.query.filter(Technology.group == group).all()
+            technologies = db.session.execute(
+                select_columns(Technology, fields).where(Technology.group == group).order_by(Technology.id)
+            ).mappings().all()
             
             if not technologies:
                 return None
@@ -82,6 +169,132 @@ class TechnologyService():
             raise
 
 
+    @staticmethod
+    def get_technologies_by_group_json(group: str, fields=None):
+        return cache.fetch('technologies', cache_key(f'group:{group}', fields), lambda: json_rows(TechnologyService.get_technologies_by_group(group, fields)))
+
+
+    @staticmethod
+    async def get_all_technologys_async(fields=None):
+        try:
+            async with async_db.session() as session:
+                technologies = (await session.execute(
+                    select_columns(Technology, fields).order_by(Technology.id)
+                )).mappings().all()
+
+            if not technologies:
+                return None
+
+            return technologies
+
+        except:
+            raise
+
+
+    @staticmethod
+    async def get_all_technologys_json_async(fields=None):
+        async def build():
+            return json_rows(await TechnologyService.get_all_technologys_async(fields))
+
+        return await cache.fetch_async('technologies', cache_key('list', fields), build)
+
+
+    @staticmethod
+    async def get_technology_by_id_async(id: int):
+        try:
+            async with async_db.session() as session:
+                technology = await session.get(Technology, id)
+
+            if not technology:
+                return None
+
+            return technology
+
+        except:
+            raise
+
+
+    @staticmethod
+    async def get_technology_by_id_json_async(id: int, fields=None):
+        async def build():
+            return json_one(await TechnologyService.get_technology_by_id_async(id), fields)
+
+        return await cache.fetch_async('technologies', cache_key(f'id:{id}', fields), build)
+
+
+    @staticmethod
+    async def get_technologies_by_group_async(group: str, fields=None):
+        try:
+            async with async_db.session() as session:
+                technologies = (await session.execute(
+                    select_columns(Technology, fields).where(Technology.group == group).order_by(Technology.id)
+                )).mappings().all()
+
+            if not technologies:
+                return None
+
+            return technologies
+
+        except:
+            raise
+
+
+    @staticmethod
+    async def get_technologies_by_group_json_async(group: str, fields=None):
+        async def build():
+            return json_rows(await TechnologyService.get_technologies_by_group_async(group, fields))
+
+        return await cache.fetch_async('technologies', cache_key(f'group:{group}', fields), build)
+
+
+    @staticmethod
+    def get_technologies_by_project(project_id: int, fields=None):
+        try:
+            technologies = db.session.execute(
+                select_columns(Technology, fields)
+                .join(project_technologies, project_technologies.c.technology_id == Technology.id)
+                .where(project_technologies.c.project_id == project_id)
+                .order_by(Technology.id)
+            ).mappings().all()
+
+            if not technologies:
+                return None
+
+            return technologies
+
+        except:
+            raise
+
+
+    @staticmethod
+    def get_technologies_by_project_json(project_id: int, fields=None):
+        return cache.fetch(
+            'stacks',
+            cache_key(f'technologies:{project_id}', fields),
+            lambda: json_rows(TechnologyService.get_technologies_by_project(project_id, fields))
+        )
+
+
+    @staticmethod
+    def get_technologies_grouped():
+        try:
+            groups = technology_index.groups(cache.ttl)
+
+            if not groups:
+                return None
+
+            # The index rows are shared, the payload gets copies
+            return {group: [image_fields(dict(row)) for row in rows] for group, rows in groups.items()}
+
+        except:
+            raise
+
+
+    @staticmethod
+    def get_technologies_grouped_json():
+        return cache.fetch('technologies', 'groups', lambda: json_value(TechnologyService.get_technologies_grouped()))
+
+
     @staticmethod
     def delete_technology_by_id(id: int):
         try:
@@ -93,13 +306,104 @@ class TechnologyService():
 
             db.session.delete(technology)
             db.session.commit()
-
-            return temp
             
         except:
             db.session.rollback()
             raise
 
+        with after_commit('technologies', 'stacks'):
+            technology_index.remove([id])
+
+        return temp
+
+
+    @staticmethod
+    def _values(data) -> dict:
+        return {
+            'label': data['label'],
+            'img': data['img'],
+            'group': data['group'],
+            'mode': parse_mode(data['mode']),
+        }
+
+
+    @staticmethod
+    def bulk_new_technologies(items) -> list[int]:
+        if not items:
+            return []
+
+        try:
+            rows = [TechnologyService._values(item) for item in items]
+            ids = db.session.scalars(
+                insert(Technology).returning(Technology.id, sort_by_parameter_order=True),
+                rows
+            ).all()
+
+            ProjectService.link_technologies_by_label(row['label'] for row in rows)
+            db.session.commit()
+
+        except:
+            db.session.rollback()
+            raise
+
+        with after_commit('technologies', 'stacks'):
+            for id, row in zip(ids, rows):
+                technology_index.put({'id': id, **row})
+
+        return ids
+
+
+    @staticmethod
+    def bulk_update_technologies(items) -> set[int]:
+        if not items:
+            return set()
+
+        try:
+            previous = dict(db.session.execute(
+                select(Technology.id, Technology.label).where(Technology.id.in_([item['id'] for item in items]))
+            ).all())
+            existing = set(previous)
+
+            rows = [{'id': item['id'], **TechnologyService._values(item)} for item in items if item['id'] in existing]
+            if rows:
+                db.session.execute(update(Technology), rows)
+                ProjectService.link_technologies_by_label([*previous.values(), *(row['label'] for row in rows)])
+                db.session.commit()
+
+        except:
+            db.session.rollback()
+            raise
+
+        if rows:
+            with after_commit('technologies', 'stacks'):
+                for row in rows:
+                    technology_index.put(row)
+
+        return existing
+
+
+    @staticmethod
+    def bulk_delete_technologies(ids: list[int]) -> set[int]:
+        try:
+            existing = set(db.session.scalars(select(Technology.id).where(Technology.id.in_(ids))))
+
+            if existing:
+                db.session.execute(delete(project_technologies).where(project_technologies.c.technology_id.in_(existing)))
+                db.session.execute(
+                    delete(Technology).where(Technology.id.in_(existing)).execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+
+        except:
+            db.session.rollback()
+            raise
+
+        if existing:
+            with after_commit('technologies', 'stacks'):
+                technology_index.remove(existing)
+
+        return existing
+
 
     # @staticmethod
     # def delete_all_technologys():
\ No newline at end of file
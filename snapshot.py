@@ -0,0 +1,253 @@
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import click
+from werkzeug.datastructures import Headers
+from werkzeug.http import http_date, parse_accept_header, parse_etags
+from werkzeug.wrappers import Response
+
+from compression import brotli
+from instrumentation import access_logger
+
+STAMPS = '.versions.json'
+
+
+class Source:
+    __slots__ = ('path', 'collections', 'builder', 'public')
+
+    def __init__(self, path: str, collections: tuple[str, ...], builder, public: bool):
+        self.path = path
+        self.collections = collections
+        self.builder = builder
+        self.public = public
+
+
+class SnapshotFile:
+    __slots__ = ('stat', 'etag', 'last_modified', 'variants')
+
+    def __init__(self, stat: os.stat_result, variants: dict[str | None, bytes]):
+        # os.replace gives every export a new inode, even within one mtime tick
+        self.stat = (stat.st_ino, stat.st_mtime_ns)
+        self.etag = hashlib.sha256(variants[None]).hexdigest()[:32]
+        self.last_modified = http_date(datetime.fromtimestamp(stat.st_mtime, timezone.utc))
+        self.variants = variants
+
+
+class Snapshot:
+    """Public list endpoints prerendered to SNAPSHOT_DIR as .json, .json.gz and .json.br.
+
+    A WSGI middleware serves them before Flask routing and the database, so the
+    lists keep working while the database sleeps. Files are re-exported after
+    every write (cache bump) and by `flask export-snapshot`; the directory can
+    also be uploaded to a static host as is.
+
+    Builders query the database directly, not through the worker's cache, and
+    each file is stamped with the shared collection versions it was built at:
+    a worker never replaces a file with an export older than it.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.cache = None
+        self.directory = None
+        self.sources: dict[str, Source] = {}
+        self.hits = 0
+
+        self._files: dict[str, SnapshotFile] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app, cache):
+        self.app = app
+        self.cache = cache
+        self.directory = app.config.get('SNAPSHOT_DIR')
+        self.sources = {}
+        self._files = {}
+        self.hits = 0
+
+        if self.directory:
+            app.wsgi_app = self._middleware(app.wsgi_app)
+            cache.on_bump(self._on_bump)
+        app.extensions['snapshot'] = self
+
+        @app.cli.command('export-snapshot')
+        def export():
+            """Render the public list endpoints into SNAPSHOT_DIR."""
+            if not self.directory:
+                raise click.ClickException('SNAPSHOT_DIR is not set')
+
+            for path, written in self.export().items():
+                click.echo(f'{path}: {"written" if written else "unchanged" if written is False else "removed"}')
+
+    def add(self, path: str, collections: tuple[str, ...], builder, public: bool = True):
+        # builder() returns the body, or None when the list is empty.
+        # Non-public sources are only exported for static hosting, the app keeps serving them through its routes
+        self.sources[path] = Source(path, collections, builder, public)
+
+    def filename(self, path: str) -> str:
+        return os.path.join(self.directory, path.lstrip('/') + '.json')
+
+    def export(self, collections=None) -> dict[str, bool | None]:
+        results = {}
+        with self.app.app_context(), self._locked():
+            stamps = self._read_stamps()
+            for source in self.sources.values():
+                if collections is not None and not set(source.collections) & set(collections):
+                    continue
+
+                # Taken before the query, so the rows are at least this new
+                stamp = self.cache.stamp(source.collections)
+                written = stamps.get(source.path, {})
+                if stamp is not None and any(written.get(name, 0) > version for name, version in stamp.items()):
+                    results[source.path] = False
+                    continue
+
+                body = source.builder()
+                results[source.path] = self._write(source.path, body) if body is not None else self._remove(source.path)
+                if stamp is not None:
+                    stamps[source.path] = stamp
+
+            self._write_stamps(stamps)
+
+        return results
+
+    @contextmanager
+    def _locked(self):
+        # Serializes exports between the workers; the lock is released with the file
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, '.lock'), 'a') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            yield
+
+    def _read_stamps(self) -> dict[str, dict[str, int]]:
+        try:
+            with open(os.path.join(self.directory, STAMPS)) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_stamps(self, stamps: dict[str, dict[str, int]]):
+        path = os.path.join(self.directory, STAMPS)
+        with open(path + '.tmp', 'w') as file:
+            json.dump(stamps, file)
+        os.replace(path + '.tmp', path)
+
+    def _write(self, path: str, body: bytes) -> bool:
+        filename = self.filename(path)
+        try:
+            with open(filename, 'rb') as file:
+                if file.read() == body:
+                    return False
+        except OSError:
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+        variants = {'.gz': gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(body, quality=11)
+
+        # The plain file goes last: its stat is what the middleware checks
+        for suffix, data in (*variants.items(), ('', body)):
+            with open(f'{filename}{suffix}.tmp', 'wb') as file:
+                file.write(data)
+            os.replace(f'{filename}{suffix}.tmp', filename + suffix)
+
+        return True
+
+    def _remove(self, path: str) -> None:
+        filename = self.filename(path)
+        for suffix in ('', '.gz', '.br'):
+            try:
+                os.remove(filename + suffix)
+            except FileNotFoundError:
+                pass
+
+    def _on_bump(self, collections: tuple[str, ...]):
+        try:
+            self.export(collections)
+        except Exception as e:
+            # Files older than the committed write must not be served
+            access_logger.warning(json.dumps({'warning': 'snapshot export failed', 'error': str(e)}))
+            for source in self.sources.values():
+                if set(source.collections) & set(collections):
+                    self._remove(source.path)
+
+    def load(self, path: str) -> SnapshotFile | None:
+        filename = self.filename(path)
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            self._files.pop(path, None)
+            return None
+
+        current = self._files.get(path)
+        if current is not None and current.stat == (stat.st_ino, stat.st_mtime_ns):
+            return current
+
+        variants = {}
+        try:
+            for encoding, suffix in ((None, ''), ('gzip', '.gz'), ('br', '.br')):
+                if os.path.exists(filename + suffix):
+                    with open(filename + suffix, 'rb') as file:
+                        variants[encoding] = file.read()
+        except OSError:
+            return None
+
+        if None not in variants:
+            return None
+
+        with self._lock:
+            current = self._files[path] = SnapshotFile(stat, variants)
+
+        return current
+
+    def match(self, environ) -> SnapshotFile | None:
+        if not self.directory or environ['REQUEST_METHOD'] not in ('GET', 'HEAD') or environ.get('QUERY_STRING'):
+            return None
+
+        # NDJSON is streamed by the app
+        if 'application/x-ndjson' in environ.get('HTTP_ACCEPT', ''):
+            return None
+
+        source = self.sources.get(environ.get('PATH_INFO', ''))
+        if source is None or not source.public:
+            return None
+
+        return self.load(source.path)
+
+    def serve(self, snapshot: SnapshotFile, environ, start_response):
+        accepted = parse_accept_header(environ.get('HTTP_ACCEPT_ENCODING'))
+        encoding = next((encoding for encoding in ('br', 'gzip') if encoding in snapshot.variants and accepted[encoding]), None)
+        etag = f'{snapshot.etag}-{encoding}' if encoding else snapshot.etag
+
+        headers = Headers({
+            'Content-Type': 'application/json',
+            'ETag': f'"{etag}"',
+            'Last-Modified': snapshot.last_modified,
+            'Cache-Control': 'no-cache',
+            'Vary': 'Accept-Encoding',
+            'Access-Control-Allow-Origin': '*',
+        })
+
+        self.hits += 1
+        if parse_etags(environ.get('HTTP_IF_NONE_MATCH')).contains(etag):
+            return Response(status=304, headers=headers)(environ, start_response)
+
+        if encoding:
+            headers['Content-Encoding'] = encoding
+
+        return Response(snapshot.variants[encoding], headers=headers)(environ, start_response)
+
+    def _middleware(self, wsgi_app):
+        def middleware(environ, start_response):
+            snapshot = self.match(environ)
+            if snapshot is None:
+                return wsgi_app(environ, start_response)
+
+            return self.serve(snapshot, environ, start_response)
+
+        return middleware
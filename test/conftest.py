@@ -0,0 +1,92 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+os.environ.setdefault('JWT_SECRET_KEY', 'test-jwt-secret-key-with-enough-length')
+os.environ.setdefault('ADMIN_USERNAME', 'admin')
+os.environ.setdefault('ADMIN_PASSWORD', 'admin')
+os.environ.setdefault('SCHEDULER_ENABLED', 'false')
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+os.environ.setdefault('CACHE_VERSION_STORAGE', '')
+
+
+POST = {
+    'label': 'ICPC NWRRC 2025',
+    'text': 'Полуфинал ICPC',
+    'img': 'posts/ICPC NWRRC 2025.jpg',
+    'link': 'https://nerc.itmo.ru',
+    'date': '2025-11-30',
+    'mode': 'true',
+}
+
+PROJECT = {
+    'label': 'ccrayp-api',
+    'text': 'Backend of the personal site on Flask',
+    'img': 'projects/api.png',
+    'stack': 'Python, Flask, PostgreSQL',
+    'link': 'https://github.com/ccrayp/ccrayp-api',
+    'mode': 'true',
+}
+
+# mode строкой подходит и для форм, и для bulk JSON
+TECHNOLOGY = {'label': 'Python', 'img': 'technologies/Python.png', 'group': 'lang_tech', 'mode': 'true'}
+
+CREDENTIALS = {'username': 'admin', 'password': 'admin'}
+
+
+@pytest.fixture
+def make_app(monkeypatch):
+    """Фабрика приложений: параметры Config переопределяются на время теста,
+    factory — init_app или init_async_app (тогда Flask-приложение в .app)."""
+    from config import Config
+    from utilities import db, cache, metrics
+    from services.search_service import search_index
+    from services.technology_service import technology_index
+
+    created = []
+
+    def make(factory=None, **config):
+        from app import init_app
+
+        for name, value in config.items():
+            monkeypatch.setattr(Config, name, value)
+
+        application = (factory or init_app)()
+        app = getattr(application, 'app', application)
+        app.config['TESTING'] = True
+        cache.clear()
+        metrics.reset()
+        technology_index.reset()
+        search_index.reset()
+
+        created.append(app)
+        return application
+
+    yield make
+
+    for app in created:
+        with app.app_context():
+            db.drop_all()
+            db.engine.dispose()
+    cache.clear()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(client):
+    response = client.post('/api/login', json=CREDENTIALS)
+    return {'Authorization': f'Bearer {response.json["access_token"]}'}
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('asgiref')
+pytest.importorskip('aiosqlite')
+pytest.importorskip('greenlet')
+
+from conftest import POST
+
+
+@pytest.fixture
+def asgi(make_app, tmp_path):
+    from async_app import init_async_app
+    from config import engine_options
+
+    uri = f'sqlite:///{tmp_path / "asgi.db"}'
+    return make_app(init_async_app, SQLALCHEMY_DATABASE_URI=uri, SQLALCHEMY_ENGINE_OPTIONS=engine_options(uri))
+
+
+async def call(application, method: str, path: str, query: bytes = b'', headers=(), body: bytes = b''):
+    messages = []
+    received = False
+    if body:
+        headers = [*headers, ('Content-Length', str(len(body)))]
+
+    async def receive():
+        nonlocal received
+        if received:
+            return {'type': 'http.disconnect'}
+        received = True
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application({
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query, 'root_path': '',
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers],
+        'client': ('127.0.0.1', 5000), 'server': ('testserver', 80),
+    }, receive, send)
+
+    start = messages[0]
+    return {
+        'status': start['status'],
+        'headers': {name.decode(): value.decode() for name, value in start['headers']},
+        'body': b''.join(message.get('body', b'') for message in messages[1:]),
+    }
+
+
+def run(application, requests):
+    from utilities import async_db
+
+    async def main():
+        try:
+            return [await call(application, *request) for request in requests]
+        finally:
+            await async_db.dispose()
+
+    return asyncio.run(main())
+
+
+class TestAsgi:
+    """Тесты ASGI-режима: async-обработчики чтения и делегирование остального во Flask"""
+
+    def test_async_list_reads_data_written_through_wsgi(self, asgi):
+        import json
+
+        from urllib.parse import urlencode
+
+        login = json.dumps({'username': 'admin', 'password': 'admin'}).encode()
+        token, = run(asgi, [('POST', '/api/login', b'', [('Content-Type', 'application/json')], login)])
+        headers = [('Authorization', f'Bearer {json.loads(token["body"])["access_token"]}')]
+        form = [('Content-Type', 'application/x-www-form-urlencoded')]
+
+        created, listed, fields, single, anonymous = run(asgi, [
+            ('POST', '/api/post/new', b'', headers + form, urlencode(POST).encode()),
+            ('GET', '/api/post/list'),
+            ('GET', '/api/post/list', b'fields=id,label'),
+            ('GET', '/api/post/1', b'', headers),
+            ('GET', '/api/post/1'),
+        ])
+
+        assert created['status'] == 201
+        assert listed['status'] == 200
+        assert json.loads(listed['body'])[0]['label'] == POST['label']
+        assert json.loads(fields['body']) == [{'id': 1, 'label': POST['label']}]
+        assert single['status'] == 200
+        assert 'private' in single['headers']['cache-control']
+        assert anonymous['status'] == 401
+
+    def test_hooks_and_conditional_requests(self, asgi):
+        first, = run(asgi, [('GET', '/api/technology/list')])
+        assert first['status'] == 404
+        assert 'server-timing' in first['headers']
+
+        from services.technology_service import TechnologyService
+
+        with asgi.app.app_context():
+            TechnologyService.bulk_new_technologies([{'label': 'Python', 'img': 'python.png', 'group': 'lang_tech', 'mode': 'true'}])
+
+        listed, = run(asgi, [('GET', '/api/technology/list')])
+        etag = listed['headers']['etag']
+        cached, head = run(asgi, [
+            ('GET', '/api/technology/list', b'', [('If-None-Match', etag)]),
+            ('HEAD', '/api/technology/list'),
+        ])
+
+        assert listed['status'] == 200
+        assert cached['status'] == 304
+        assert head['status'] == 200 and head['body'] == b''
@@ -0,0 +1,79 @@
+from conftest import CREDENTIALS
+from utilities import jwt, login_guard
+
+
+class TestJwtCache:
+    """Тесты кэша проверенных JWT"""
+
+    def test_claims_are_cached(self, client, auth):
+        client.get('/api/protected', headers=auth)
+        response = client.get('/api/protected', headers=auth)
+
+        assert response.status_code == 200
+        assert response.json['logged_in_as'] == 'admin'
+        assert jwt.stats() == {'entries': 1, 'hits': 1, 'misses': 1}
+
+    def test_expired_claims_are_not_served(self, client, auth):
+        client.get('/api/protected', headers=auth)
+        for claims in jwt._claims.values():
+            claims['exp'] = 0
+
+        response = client.get('/api/protected', headers=auth)
+
+        # Полная проверка подписи снова проходит, т.к. настоящий токен ещё действителен
+        assert response.status_code == 200
+        assert jwt.stats()['misses'] == 2
+
+    def test_invalid_token_is_rejected(self, client, auth):
+        client.get('/api/protected', headers=auth)
+
+        response = client.get('/api/protected', headers={'Authorization': auth['Authorization'][:-2] + 'xx'})
+
+        assert response.status_code == 422
+
+
+class TestLoginGuard:
+    """Тесты ограничения попыток входа"""
+
+    def test_attempts_are_limited(self, app, client):
+        app.config['LOGIN_RATE_LIMIT'] = 2
+        login_guard.init_app(app)
+
+        assert client.post('/api/login', json={**CREDENTIALS, 'password': 'wrong'}).status_code == 401
+        assert client.post('/api/login', json={**CREDENTIALS, 'password': 'wrong'}).status_code == 401
+
+        response = client.post('/api/login', json=CREDENTIALS)
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) > 0
+        assert client.post('/api/login', json=CREDENTIALS, environ_base={'REMOTE_ADDR': '10.0.0.2'}).status_code == 200
+
+    def test_success_resets_attempts(self, app, client):
+        app.config['LOGIN_RATE_LIMIT'] = 2
+        login_guard.init_app(app)
+
+        client.post('/api/login', json={**CREDENTIALS, 'password': 'wrong'})
+        assert client.post('/api/login', json=CREDENTIALS).status_code == 200
+        assert client.post('/api/login', json={**CREDENTIALS, 'password': 'wrong'}).status_code == 401
+
+    def test_busy_hashing_returns_503(self, app, client):
+        app.config['LOGIN_HASH_TIMEOUT'] = 0.01
+        login_guard.init_app(app)
+
+        # Единственный слот хэширования занят другим запросом
+        login_guard._semaphore.acquire()
+        try:
+            response = client.post('/api/login', json=CREDENTIALS)
+        finally:
+            login_guard._semaphore.release()
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+
+    def test_forwarded_client_address(self, app, client):
+        # По умолчанию приложение стоит за одним прокси (Render)
+        app.config['LOGIN_RATE_LIMIT'] = 1
+        login_guard.init_app(app)
+
+        client.post('/api/login', json=CREDENTIALS, headers={'X-Forwarded-For': '1.1.1.1, 2.2.2.2'})
+        assert client.post('/api/login', json={**CREDENTIALS, 'password': 'wrong'}, headers={'X-Forwarded-For': '2.2.2.2'}).status_code == 401
+        assert client.post('/api/login', json={**CREDENTIALS, 'password': 'wrong'}, headers={'X-Forwarded-For': '9.9.9.9, 2.2.2.2'}).status_code == 429
@@ -0,0 +1,88 @@
+from conftest import POST, TECHNOLOGY
+
+
+class TestBulk:
+    """Тесты пакетного создания, обновления и удаления"""
+
+    def test_bulk_new(self, client, auth):
+        response = client.post('/api/technology/bulk/new', json=[
+            TECHNOLOGY,
+            {'label': 'Git'},
+            {**TECHNOLOGY, 'label': 'Flask'},
+        ], headers=auth)
+
+        assert response.status_code == 200
+        results = response.json['results']
+        assert [result['status'] for result in results] == ['created', 'error', 'created']
+        assert [result['id'] for result in results if 'id' in result] == [1, 2]
+        assert [technology['label'] for technology in client.get('/api/technology/list').json] == ['Python', 'Flask']
+
+    def test_bulk_update(self, client, auth):
+        client.post('/api/post/bulk/new', json=[{**POST, 'mode': True}] * 2, headers=auth)
+        client.get('/api/post/list')
+
+        response = client.put('/api/post/bulk/update', json=[
+            {**POST, 'id': 2, 'label': 'Updated'},
+            {**POST, 'id': 7},
+            {**POST, 'id': 1, 'date': 'someday'},
+        ], headers=auth)
+
+        assert [result['status'] for result in response.json['results']] == ['updated', 'error', 'error']
+        assert [post['label'] for post in client.get('/api/post/list').json] == [POST['label'], 'Updated']
+
+    def test_bulk_delete(self, client, auth):
+        client.post('/api/technology/bulk/new', json=[TECHNOLOGY] * 3, headers=auth)
+
+        response = client.delete('/api/technology/bulk/delete', json=[1, 3, 5], headers=auth)
+
+        assert [result['status'] for result in response.json['results']] == ['deleted', 'deleted', 'error']
+        assert [technology['id'] for technology in client.get('/api/technology/list').json] == [2]
+
+    def test_invalid_values_are_item_errors(self, client, auth):
+        response = client.post('/api/post/bulk/new', json=[
+            POST,
+            {**POST, 'label': None},
+            {**POST, 'mode': 'maybe'},
+        ], headers=auth)
+
+        assert response.status_code == 200
+        assert [result['status'] for result in response.json['results']] == ['created', 'error', 'error']
+        assert response.json['results'][1]['message'] == 'Error. Field label must be a string'
+        assert len(client.get('/api/post/list').json) == 1
+
+    def test_invalid_group_is_rejected(self, client, auth):
+        response = client.post('/api/technology/bulk/new', json=[TECHNOLOGY, {**TECHNOLOGY, 'group': 'misc'}], headers=auth)
+        assert [result['status'] for result in response.json['results']] == ['created', 'error']
+
+        response = client.put('/api/technology/bulk/update', json=[{**TECHNOLOGY, 'id': 1, 'group': 'misc'}], headers=auth)
+        assert response.json['results'][0]['status'] == 'error'
+
+        assert client.post('/api/technology/new', data={**TECHNOLOGY, 'group': 'misc', 'mode': 'true'}, headers=auth).status_code == 400
+
+    def test_bulk_requires_array(self, client, auth):
+        assert client.post('/api/project/bulk/new', json={'label': 'x'}, headers=auth).status_code == 400
+        assert client.delete('/api/project/bulk/delete', json=['1'], headers=auth).status_code == 400
+
+
+class TestTechnologyGroups:
+    """Тесты сгруппированного списка технологий"""
+
+    def test_groups_follow_writes(self, client, auth):
+        client.post('/api/technology/bulk/new', json=[
+            TECHNOLOGY,
+            {**TECHNOLOGY, 'label': 'Git', 'group': 'ide_os'},
+            {**TECHNOLOGY, 'label': 'OOP', 'group': 'fund'},
+        ], headers=auth)
+
+        groups = client.get('/api/technology/groups', headers=auth).json
+        assert {group: [item['label'] for item in items] for group, items in groups.items()} == {
+            'lang_tech': ['Python'], 'ide_os': ['Git'], 'fund': ['OOP']
+        }
+
+        client.put('/api/technology/update/2', data={**TECHNOLOGY, 'label': 'Git', 'mode': 'true'}, headers=auth)
+        client.delete('/api/technology/delete/3', headers=auth)
+
+        groups = client.get('/api/technology/groups', headers=auth).json
+        assert {group: [item['label'] for item in items] for group, items in groups.items()} == {
+            'lang_tech': ['Python', 'Git']
+        }
@@ -0,0 +1,166 @@
+from conftest import POST, TECHNOLOGY
+from utilities import cache
+
+
+class TestListCache:
+    """Тесты кэша ответов для /list эндпоинтов"""
+
+    def test_list_is_served_from_cache(self, client, auth):
+        client.post('/api/post/new', data=POST, headers=auth)
+
+        first = client.get('/api/post/list')
+        second = client.get('/api/post/list')
+
+        assert first.status_code == 200
+        assert first.headers['Content-Type'] == 'application/json'
+        assert first.data == second.data
+        assert cache.stats()['hits'] == 1
+
+    def test_write_invalidates_list(self, client, auth):
+        client.post('/api/post/new', data=POST, headers=auth)
+        assert len(client.get('/api/post/list').json) == 1
+
+        client.post('/api/post/new', data=POST, headers=auth)
+        assert len(client.get('/api/post/list').json) == 2
+
+        client.delete('/api/post/delete/1', headers=auth)
+        assert [post['id'] for post in client.get('/api/post/list').json] == [2]
+
+    def test_entries_are_capped(self, app):
+        cache.max_entries = 2
+        for key in ('a', 'b', 'c'):
+            cache.set('posts', key, b'[]', cache.version('posts'))
+
+        assert cache.get('posts', 'a') is None
+        assert cache.get('posts', 'c').body == b'[]'
+        assert cache.stats()['entries'] == 2
+
+    def test_stale_build_is_not_stored(self, app):
+        version = cache.version('projects')
+        cache.bump('projects')
+        cache.set('projects', 'list', b'[]', version)
+
+        assert cache.get('projects', 'list') is None
+
+
+class TestSharedVersions:
+    """Тесты общих для воркеров версий коллекций (SQLite файл)"""
+
+    def worker(self, path):
+        from cache import ResponseCache, SharedVersions
+
+        worker = ResponseCache()
+        worker.shared = SharedVersions(str(path))
+        worker.sync_interval = 0
+        return worker
+
+    def test_bump_invalidates_other_workers(self, tmp_path):
+        first, second = self.worker(tmp_path / 'versions.sqlite'), self.worker(tmp_path / 'versions.sqlite')
+        invalidated = []
+        second.on_invalidate(invalidated.append)
+
+        second.set('posts', 'list', b'[]', second.version('posts'))
+        second.set('projects', 'list', b'[]', second.version('projects'))
+        first.bump('posts')
+
+        assert second.get('posts', 'list') is None
+        assert second.get('projects', 'list').body == b'[]'
+        assert invalidated == [('posts',)]
+        assert first.version('posts') == second.version('posts') == 1
+
+        # Свой bump не считается чужим
+        second.bump('posts')
+        second.set('posts', 'list', b'[]', second.version('posts'))
+        assert second.get('posts', 'list') is not None
+        assert invalidated == [('posts',)]
+
+    def test_unavailable_storage_falls_back_to_process(self, tmp_path):
+        worker = self.worker(tmp_path / 'missing' / 'versions.sqlite')
+        worker.set('posts', 'list', b'[]', worker.version('posts'))
+
+        worker.bump('posts')
+
+        assert worker.get('posts', 'list') is None
+        assert worker.version('posts') == 1
+        assert worker.stats()['sync_errors'] >= 1
+
+    def test_indexes_are_reset(self, app, client, auth):
+        from services.technology_service import technology_index
+
+        client.post('/api/technology/new', data=TECHNOLOGY, headers=auth)
+        client.get('/api/technology/groups', headers=auth)
+        assert technology_index._rows is not None
+
+        for listener in cache._invalidate_listeners:
+            listener(('technologies',))
+
+        assert technology_index._rows is None
+
+
+class TestConditionalRequests:
+    """Тесты ETag и ответов 304"""
+
+    def test_list_not_modified(self, client, auth):
+        client.post('/api/post/new', data=POST, headers=auth)
+
+        response = client.get('/api/post/list')
+        assert response.headers['ETag']
+        assert 'Last-Modified' not in response.headers
+
+        repeated = client.get('/api/post/list', headers={'If-None-Match': response.headers['ETag']})
+        assert repeated.status_code == 304
+        assert repeated.data == b''
+
+    def test_if_modified_since_is_ignored(self, client, auth):
+        client.post('/api/post/new', data=POST, headers=auth)
+
+        response = client.get('/api/post/list', headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'})
+        assert response.status_code == 200
+
+    def test_write_changes_etag(self, client, auth):
+        client.post('/api/post/new', data=POST, headers=auth)
+        etag = client.get('/api/post/list').headers['ETag']
+
+        client.put('/api/post/update/1', data={**POST, 'label': 'ICPC NWRRC'}, headers=auth)
+
+        response = client.get('/api/post/list', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_by_id_not_modified(self, client, auth):
+        client.post('/api/post/new', data=POST, headers=auth)
+
+        response = client.get('/api/post/1', headers=auth)
+        assert response.status_code == 200
+        assert response.json['label'] == POST['label']
+
+        repeated = client.get('/api/post/1', headers={**auth, 'If-None-Match': response.headers['ETag']})
+        assert repeated.status_code == 304
+
+
+class TestCompression:
+    """Тесты сжатия ответов"""
+
+    def test_list_is_gzipped_once(self, client, auth):
+        import gzip
+        import json
+
+        client.post('/api/post/bulk/new', json=[{**POST, 'mode': True}] * 10, headers=auth)
+
+        plain = client.get('/api/post/list')
+        first = client.get('/api/post/list', headers={'Accept-Encoding': 'gzip'})
+        second = client.get('/api/post/list', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in plain.headers
+        assert first.headers['Content-Encoding'] == 'gzip'
+        assert first.headers['Vary'] == 'Accept-Encoding'
+        assert first.data == second.data
+        assert list(cache.get('posts', 'list?sort=id&order=asc').variants) == ['gzip']
+        assert json.loads(gzip.decompress(first.data)) == plain.json
+
+        repeated = client.get('/api/post/list', headers={'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']})
+        assert repeated.status_code == 304
+
+    def test_small_responses_are_not_compressed(self, client):
+        response = client.get('/api/ping', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from conftest import POST
+
+
+@pytest.fixture
+def assets(monkeypatch, tmp_path):
+    from PIL import Image
+
+    import images
+
+    source, build = tmp_path / 'assets', tmp_path / 'build'
+    for folder in images.SOURCE_DIRS:
+        (source / folder).mkdir(parents=True)
+    Image.new('RGB', (400, 200), 'red').save(source / 'posts' / 'ICPC NWRRC 2025.jpg')
+    Image.new('RGBA', (100, 100), 'blue').save(source / 'technologies' / 'python.png')
+    (source / 'posts' / 'notes.txt').write_text('not an image')
+
+    monkeypatch.setattr(images, 'ASSETS_DIR', str(source))
+    monkeypatch.setattr(images, 'BUILD_DIR', str(build))
+    monkeypatch.setattr(images, 'MANIFEST', str(build / 'manifest.json'))
+    monkeypatch.setattr(images, '_manifest_mtime', None)
+
+    return build
+
+
+class TestImages:
+    """Тесты сборки вариантов изображений и их выдачи в ответах API"""
+
+    def test_build_assets_writes_variants_and_manifest(self, assets):
+        import images
+
+        manifest = images.build_assets()
+
+        assert set(manifest) == {'posts/ICPC NWRRC 2025.jpg', 'technologies/python.png'}
+        assert json.loads((assets / 'manifest.json').read_text()) == manifest
+
+        post = manifest['posts/ICPC NWRRC 2025.jpg']
+        assert (post['width'], post['height']) == (400, 200)
+        assert 'jpeg' in post['variants'] and 'webp' in post['variants']
+        # Оригинал уже 400 px, больших вариантов нет
+        assert [width for width, _ in post['variants']['jpeg']] == [160, 320, 400]
+        assert all((assets / variant).exists() for sizes in post['variants'].values() for _, variant in sizes)
+
+    def test_rebuild_prunes_removed_sources(self, assets):
+        import images
+
+        images.build_assets()
+        stale = images.variants('technologies/python.png')['png'][0][1]
+        (assets.parent / 'assets' / 'technologies' / 'python.png').unlink()
+
+        images.build_assets()
+
+        assert not (assets / stale).exists()
+        assert images.variants('technologies/python.png') is None
+
+    def test_variants_are_immutable(self, assets, client):
+        import images
+
+        variant = images.build_assets()['posts/ICPC NWRRC 2025.jpg']['variants']['webp'][0][1]
+
+        response = client.get(f'/assets/{variant}')
+        assert response.status_code == 200
+        assert response.cache_control.immutable and response.cache_control.public
+        assert response.cache_control.max_age == 31536000
+
+        manifest = client.get('/assets/manifest.json')
+        assert manifest.status_code == 200 and not manifest.cache_control.immutable
+
+    def test_payloads_contain_chosen_variant_and_srcset(self, assets, client, auth):
+        import images
+
+        images.build_assets()
+        client.post('/api/post/new', data=POST, headers=auth)
+
+        post = client.get('/api/post/list').json[0]
+
+        assert post['img'] == POST['img']
+        assert post['img_url'].startswith('/assets/posts/ICPC%20NWRRC%202025.')
+        assert post['img_url'].endswith('.400.webp')
+        assert post['img_srcset']['webp'].endswith(' 400w')
+        assert post['img_srcset']['webp'].count('w, ') == 2
+
+    def test_payloads_fall_back_to_repository(self, assets, client, auth):
+        client.post('/api/post/new', data=POST, headers=auth)
+
+        post = client.get('/api/post/1', headers=auth).json
+
+        assert post['img_url'].endswith('/assets/posts/ICPC NWRRC 2025.jpg')
+        assert post['img_srcset'] is None
+
+    def test_manifest_is_checked_once_per_interval(self, assets, client, auth, monkeypatch):
+        import os
+
+        import images
+
+        images.build_assets()
+        client.post('/api/post/bulk/new', json=[POST] * 5, headers=auth)
+
+        stats = []
+        getmtime = os.path.getmtime
+        monkeypatch.setattr(images.os.path, 'getmtime', lambda path: stats.append(path) or getmtime(path))
+
+        assert len(client.get('/api/post/list').json) == 5
+        assert len(stats) <= 1
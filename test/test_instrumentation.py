@@ -0,0 +1,46 @@
+import json
+import logging
+
+from conftest import POST
+
+
+def server_timing(response) -> dict[str, str]:
+    metrics = {}
+    for metric in response.headers['Server-Timing'].split(', '):
+        name, _, value = metric.partition(';')
+        metrics[name] = value
+
+    return metrics
+
+
+class TestInstrumentation:
+    """Тесты Server-Timing, подсчёта запросов к БД и access log"""
+
+    def test_server_timing_counts_queries(self, client, auth):
+        client.post('/api/post/new', data=POST, headers=auth)
+
+        built = server_timing(client.get('/api/post/list'))
+        assert built['queries'] == 'desc="1 queries"'
+        assert built['db'].startswith('dur=') and built['serialize'].startswith('dur=')
+        assert float(built['total'].removeprefix('dur=')) > 0
+
+        # Ответ из кэша в базу не ходит
+        cached = server_timing(client.get('/api/post/list'))
+        assert cached['queries'] == 'desc="0 queries"'
+        assert 'db' not in cached
+
+    def test_access_log_is_off_by_default(self, app, client, caplog):
+        from utilities import instrumentation
+
+        with caplog.at_level(logging.INFO, logger='ccrayp.access'):
+            client.get('/api/ping')
+            assert not [record for record in caplog.records if 'total_ms' in record.getMessage()]
+
+            instrumentation.access_log = True
+            try:
+                client.get('/api/ping')
+            finally:
+                instrumentation.access_log = False
+
+        line = json.loads(caplog.records[-1].getMessage())
+        assert line['endpoint'] == 'ping' and line['queries'] == 0
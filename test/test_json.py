@@ -0,0 +1,81 @@
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from utilities import JSONProvider, orjson
+
+DATA = {
+    'label': 'Полуфинал ICPC',
+    'date': date(2025, 11, 30),
+    'created': datetime(2025, 11, 30, 12, 30, tzinfo=timezone.utc),
+    'price': Decimal('10.50'),
+    'mode': True,
+    'tags': ['a', 'b'],
+}
+
+EXPECTED = {
+    'label': 'Полуфинал ICPC',
+    'date': '2025-11-30',
+    'created': '2025-11-30T12:30:00+00:00',
+    'price': '10.50',
+    'mode': True,
+    'tags': ['a', 'b'],
+}
+
+ENCODERS = ['stdlib', pytest.param('orjson', marks=pytest.mark.skipif(orjson is None, reason='orjson is not installed'))]
+
+
+class TestJSONProvider:
+    """Тесты JSON-провайдера: одинаковые данные с orjson и stdlib"""
+
+    @pytest.mark.parametrize('encoder', ENCODERS)
+    def test_types(self, app, encoder):
+        app.config['JSON_ENCODER'] = encoder
+        provider = JSONProvider(app)
+
+        body = provider.dumps_bytes(DATA)
+
+        assert provider.encoder == encoder
+        assert isinstance(body, bytes)
+        assert json.loads(body) == EXPECTED
+        assert json.loads(provider.dumps(DATA)) == EXPECTED
+
+    @pytest.mark.parametrize('encoder', ENCODERS)
+    def test_row_mappings(self, app, encoder):
+        from models.post import Post
+        from utilities import db
+
+        app.config['JSON_ENCODER'] = encoder
+        provider = JSONProvider(app)
+
+        with app.app_context():
+            db.session.add(Post(label='Post', text='Text', img='posts/1.jpg', link='https://example.com', date=date(2025, 1, 2), mode=True))
+            db.session.commit()
+            rows = db.session.execute(select(Post.id, Post.date)).mappings().all()
+
+            assert json.loads(provider.dumps_bytes(rows)) == [{'id': 1, 'date': '2025-01-02'}]
+
+    def test_encoders_agree_on_non_ascii(self, app):
+        app.config['JSON_ENCODER'] = 'stdlib'
+        body = JSONProvider(app).dumps_bytes({'label': 'Полуфинал ICPC'})
+
+        assert body == '{"label":"Полуфинал ICPC"}'.encode('utf-8')
+        if orjson is not None:
+            app.config['JSON_ENCODER'] = 'orjson'
+            assert JSONProvider(app).dumps_bytes({'label': 'Полуфинал ICPC'}) == body
+
+    def test_fallback_for_non_string_keys(self, app):
+        provider = JSONProvider(app)
+
+        assert json.loads(provider.dumps_bytes({2: 'two', 1: 'one'})) == {'1': 'one', '2': 'two'}
+
+    def test_response(self, app, client):
+        with app.app_context():
+            response = app.json.response(DATA)
+
+        assert response.mimetype == 'application/json'
+        assert json.loads(response.data) == EXPECTED
+        assert client.get('/api/ping').json['status'] == 'alive'
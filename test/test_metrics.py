@@ -0,0 +1,82 @@
+class TestMetrics:
+    """Тесты эндпоинта /api/metrics"""
+
+    def test_request_counters_and_histograms(self, client, auth):
+        client.get('/api/post/list')
+        client.get('/api/post/list')
+
+        body = client.get('/api/metrics', headers=auth).get_data(as_text=True)
+
+        assert 'ccrayp_requests_total{route="/api/post/list",method="GET",status="404"} 2' in body
+        assert 'ccrayp_request_duration_seconds_count{route="/api/post/list",method="GET"} 2' in body
+        assert 'ccrayp_requests_in_flight 1' in body
+        assert '# TYPE ccrayp_cache_misses_total counter' in body
+        assert '# TYPE ccrayp_cache_entries gauge' in body
+
+    def test_requires_token_or_jwt(self, make_app):
+        app = make_app(METRICS_TOKEN='scrape')
+        client = app.test_client()
+
+        assert client.get('/api/metrics').status_code == 401
+        assert client.get('/api/metrics', headers={'Authorization': 'Bearer scrape'}).status_code == 200
+
+    def test_multiprocess_files_are_summed(self, app, client, auth, tmp_path):
+        import json
+        import os
+
+        from utilities import metrics
+
+        app.config['METRICS_DIR'] = str(tmp_path)
+        metrics.directory = str(tmp_path)
+        (tmp_path / 'metrics-1.json').write_text(json.dumps({
+            'pid': 1, 'dead': True, 'in_flight': 0, 'gauges': {},
+            'requests': [['/api/ping', 'GET', '200', 5]],
+            'latency': [['/api/ping', 'GET', [5] * 11 + [0.01, 5]]],
+        }))
+
+        try:
+            client.get('/api/ping')
+            body = client.get('/api/metrics', headers=auth).get_data(as_text=True)
+        finally:
+            metrics.directory = None
+
+        assert 'ccrayp_requests_total{route="/api/ping",method="GET",status="200"} 6' in body
+        assert 'ccrayp_workers 1' in body
+        assert os.path.exists(tmp_path / f'metrics-{os.getpid()}.json')
+        assert not os.path.exists(tmp_path / 'metrics-1.json')
+        assert os.path.exists(tmp_path / 'metrics-exited.json')
+
+    def test_exited_workers_are_merged(self, app, tmp_path):
+        import json
+        import os
+
+        from utilities import metrics
+
+        metrics.directory = str(tmp_path)
+        try:
+            for pid in (999998, 999999):
+                (tmp_path / f'metrics-{pid}.json').write_text(json.dumps({
+                    'pid': pid, 'in_flight': 1, 'gauges': {'cache_entries': 3}, 'counters': {'cache_hits': 3},
+                    'requests': [['/api/ping', 'GET', '200', 2]],
+                    'latency': [['/api/ping', 'GET', [2] * 11 + [0.01, 2]]],
+                }))
+                metrics.retire(pid)
+
+            data = metrics.collect()
+        finally:
+            metrics.directory = None
+
+        assert set(os.listdir(tmp_path)) == {'metrics-exited.json', f'metrics-{os.getpid()}.json', 'metrics.lock'}
+        assert data['requests'][('/api/ping', 'GET', '200')] == 4
+        assert data['latency'][('/api/ping', 'GET')][-1] == 4
+        assert data['workers'] == 1
+        # Счётчики ушедших воркеров не пропадают, а gauges не суммируются
+        assert data['counters']['cache_hits'] == 6
+        assert data['gauges']['cache_entries'] == 0
+
+    def test_pool_stats_require_auth(self, client, auth):
+        assert client.get('/api/pool').status_code == 401
+
+        response = client.get('/api/pool', headers=auth)
+        assert response.status_code == 200
+        assert 'pool' in response.json
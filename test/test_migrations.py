@@ -0,0 +1,102 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import inspect, text
+
+from utilities import parse_date
+
+# Схема posts до перевода date в DATE: даты хранились строками в разных форматах
+BASELINE_POSTS = '''
+    CREATE TABLE posts (
+        id INTEGER PRIMARY KEY,
+        label TEXT NOT NULL,
+        text TEXT NOT NULL,
+        img TEXT NOT NULL,
+        date TEXT NOT NULL,
+        link TEXT NOT NULL,
+        mode BOOLEAN NOT NULL
+    )
+'''
+
+
+@pytest.fixture
+def baseline(app):
+    from utilities import db
+
+    def create(*dates):
+        with app.app_context():
+            db.session.execute(text('DROP TABLE posts'))
+            db.session.execute(text(BASELINE_POSTS))
+            db.session.execute(
+                text("INSERT INTO posts (label, text, img, date, link, mode) VALUES ('ICPC', 'Text', 'posts/1.jpg', :date, 'https://t.me', 1)"),
+                [{'date': value} for value in dates]
+            )
+            db.session.commit()
+
+    return create
+
+
+def post_dates(app) -> list[str]:
+    from utilities import db
+
+    with app.app_context():
+        return [row[0] for row in db.session.execute(text('SELECT date FROM posts ORDER BY id'))]
+
+
+def post_indexes(app) -> set[str]:
+    from utilities import db
+
+    with app.app_context():
+        return {index['name'] for index in inspect(db.engine).get_indexes('posts')}
+
+
+class TestMigrations:
+    """Тесты `flask migrate`: перевод posts.date в DATE и создание индексов"""
+
+    @pytest.mark.parametrize('value, expected', [
+        ('2025-01-02', date(2025, 1, 2)),
+        ('03.02.2025', date(2025, 2, 3)),
+        ('04.03.25', date(2025, 3, 4)),
+        ('05/04/2025', date(2025, 4, 5)),
+        (' 2025-05-06T10:30:00 ', date(2025, 5, 6)),
+        (datetime(2025, 6, 7, 12), date(2025, 6, 7)),
+        (date(2025, 7, 8), date(2025, 7, 8)),
+    ])
+    def test_parse_date(self, value, expected):
+        assert parse_date(value) == expected
+
+    @pytest.mark.parametrize('value', ['yesterday', '31.02.2025', '', None])
+    def test_parse_date_rejects_invalid(self, value):
+        with pytest.raises(ValueError):
+            parse_date(value)
+
+    def test_text_dates_are_converted(self, app, baseline):
+        baseline('2025-01-02', '03.02.2025', '04.03.25', '05/04/2025')
+        assert not post_indexes(app) & {'ix_posts_date', 'ix_posts_mode_date'}
+
+        result = app.test_cli_runner().invoke(args=['migrate'])
+
+        assert result.exit_code == 0, result.output
+        assert 'posts.date: 4 rows converted' in result.output
+        assert post_dates(app) == ['2025-01-02', '2025-02-03', '2025-03-04', '2025-04-05']
+        assert {'ix_posts_date', 'ix_posts_mode_date'} <= post_indexes(app)
+
+    def test_invalid_date_aborts_without_changes(self, app, baseline):
+        baseline('2025-01-02', '03.02.2025', 'yesterday')
+
+        result = app.test_cli_runner().invoke(args=['migrate'])
+
+        assert result.exit_code != 0
+        assert "3 ('yesterday')" in result.output
+        assert post_dates(app) == ['2025-01-02', '03.02.2025', 'yesterday']
+        assert not post_indexes(app) & {'ix_posts_date', 'ix_posts_mode_date'}
+
+    def test_migrate_is_idempotent(self, app, baseline):
+        baseline('03.02.2025')
+        app.test_cli_runner().invoke(args=['migrate'])
+
+        result = app.test_cli_runner().invoke(args=['migrate'])
+
+        assert result.exit_code == 0, result.output
+        assert 'index ' not in result.output
+        assert post_dates(app) == ['2025-02-03']
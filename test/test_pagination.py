@@ -0,0 +1,46 @@
+from conftest import POST
+
+
+class TestKeysetPagination:
+    """Тесты курсорной пагинации, фильтрации и сортировки списка постов"""
+
+    def _seed(self, client, auth):
+        dates = ['2025-03-01', '2025-01-15', '2025-03-01', '2024-12-31', '2025-02-10']
+        for index, date in enumerate(dates):
+            client.post('/api/post/new', data={**POST, 'date': date, 'mode': 'true' if index % 2 == 0 else 'false'}, headers=auth)
+
+    def test_pages_by_id(self, client, auth):
+        self._seed(client, auth)
+
+        first = client.get('/api/post/list?limit=2&fields=id').json
+        assert first['items'] == [{'id': 1}, {'id': 2}]
+
+        second = client.get(f'/api/post/list?limit=2&fields=id&cursor={first["next_cursor"]}').json
+        assert second['items'] == [{'id': 3}, {'id': 4}]
+
+        last = client.get(f'/api/post/list?limit=2&fields=id&cursor={second["next_cursor"]}').json
+        assert last == {'items': [{'id': 5}], 'next_cursor': None}
+
+    def test_pages_by_date_desc(self, client, auth):
+        self._seed(client, auth)
+
+        url = '/api/post/list?limit=2&sort=date&order=desc&fields=id'
+        page = client.get(url).json
+        ids = [item['id'] for item in page['items']]
+        while page['next_cursor']:
+            page = client.get(f'{url}&cursor={page["next_cursor"]}').json
+            ids += [item['id'] for item in page['items']]
+
+        assert ids == [3, 1, 5, 2, 4]
+
+    def test_mode_filter(self, client, auth):
+        self._seed(client, auth)
+
+        posts = client.get('/api/post/list?mode=false&fields=id,mode').json
+        assert posts == [{'id': 2, 'mode': False}, {'id': 4, 'mode': False}]
+
+    def test_invalid_parameters(self, client):
+        assert client.get('/api/post/list?limit=0').status_code == 400
+        assert client.get('/api/post/list?limit=%C2%B2').json['message'].startswith('Error. Invalid limit')
+        assert client.get('/api/post/list?cursor=garbage').status_code == 400
+        assert client.get('/api/project/list?sort=date').status_code == 400
@@ -0,0 +1,123 @@
+import time
+
+import pytest
+
+from ratelimit import SQLiteBuckets, queue_seconds
+
+
+@pytest.fixture
+def app(make_app, tmp_path):
+    return make_app(
+        RATE_LIMIT_ENABLED=True,
+        RATE_LIMIT_RATE=0.5,
+        RATE_LIMIT_BURST=3,
+        RATE_LIMIT_ROUTES='search=0.5:1',
+        RATE_LIMIT_STORAGE=str(tmp_path / 'ratelimit.sqlite'),
+    )
+
+
+class TestRateLimit:
+    """Тесты token bucket ограничения запросов и сброса нагрузки"""
+
+    def test_bucket_is_exhausted(self, app, client):
+        statuses = [client.get('/api/post/list').status_code for _ in range(4)]
+
+        assert statuses == [404, 404, 404, 429]
+        response = client.get('/api/post/list')
+        assert response.json['message'] == 'Error. Too many requests'
+        assert response.headers['Retry-After'] == '2'
+        assert app.extensions['rate_limiter'].stats()['limited'] == 2
+
+    def test_buckets_are_per_client_and_endpoint(self, client):
+        for _ in range(3):
+            client.get('/api/post/list')
+
+        assert client.get('/api/post/list').status_code == 429
+        assert client.get('/api/project/list').status_code == 404
+        assert client.get('/api/post/list', environ_base={'REMOTE_ADDR': '10.0.0.2'}).status_code == 404
+
+    def test_buckets_are_per_forwarded_client(self, client):
+        # За прокси REMOTE_ADDR у всех один, клиент — последний адрес X-Forwarded-For
+        for _ in range(3):
+            client.get('/api/post/list', headers={'X-Forwarded-For': '1.1.1.1, 2.2.2.2'})
+
+        assert client.get('/api/post/list', headers={'X-Forwarded-For': '9.9.9.9, 2.2.2.2'}).status_code == 429
+        assert client.get('/api/post/list', headers={'X-Forwarded-For': '3.3.3.3'}).status_code == 404
+
+    def test_route_overrides_and_exemptions(self, client):
+        assert client.get('/api/search?q=a').status_code == 200
+        assert client.get('/api/search?q=a').status_code == 429
+
+        assert all(client.get('/api/ping').status_code == 200 for _ in range(5))
+        assert all(client.get('/assets/missing.webp').status_code == 404 for _ in range(5))
+
+    def test_buckets_are_shared_between_processes(self, tmp_path):
+        first, second = SQLiteBuckets(str(tmp_path / 'shared.sqlite')), SQLiteBuckets(str(tmp_path / 'shared.sqlite'))
+        now = time.time()
+
+        assert first.take('client|endpoint', now, 1.0, 2) == 0
+        assert second.take('client|endpoint', now, 1.0, 2) == 0
+        assert first.take('client|endpoint', now, 1.0, 2) == pytest.approx(1.0)
+        assert second.prune(now + 1) == 1
+
+    def test_prune_with_every_limit_off(self, app):
+        limiter = app.extensions['rate_limiter']
+        limiter.rate, limiter.limits = 0, {'search': (0, 1)}
+
+        assert limiter.prune() == 0
+
+    def test_async_check_runs_off_the_event_loop(self, app, monkeypatch):
+        import asyncio
+        import threading
+
+        from werkzeug.test import EnvironBuilder
+
+        limiter = app.extensions['rate_limiter']
+        threads = []
+        take = limiter.backend.take
+
+        def record(*args):
+            threads.append(threading.current_thread())
+            return take(*args)
+
+        monkeypatch.setattr(limiter.backend, 'take', record)
+
+        assert asyncio.run(limiter.check_async(EnvironBuilder(path='/api/post/list').get_environ())) is None
+        assert threads and threads[0] is not threading.main_thread()
+
+    def test_unavailable_storage_falls_back_to_memory(self, app, client, tmp_path):
+        limiter = app.extensions['rate_limiter']
+        limiter.backend = SQLiteBuckets(str(tmp_path / 'missing' / 'ratelimit.sqlite'))
+
+        statuses = [client.get('/api/post/list').status_code for _ in range(4)]
+
+        assert statuses == [404, 404, 404, 429]
+        assert limiter.stats()['fallbacks'] == 4
+
+    def test_queued_requests_are_shed(self, app, client):
+        started = f't={int((time.time() - 15) * 1e6)}'
+
+        response = client.get('/api/post/list', headers={'X-Request-Start': started})
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert client.get('/api/post/list', headers={'X-Request-Start': f't={time.time():.3f}'}).status_code == 404
+
+    def test_in_flight_limit(self, app, client):
+        limiter = app.extensions['rate_limiter']
+        limiter.max_in_flight = 1
+        limiter.enter()
+        try:
+            assert client.get('/api/post/list').status_code == 503
+        finally:
+            limiter.leave()
+
+        assert client.get('/api/post/list').status_code == 404
+
+    def test_queue_seconds_units(self):
+        now = 1_700_000_000.0
+
+        assert queue_seconds('t=1699999998', now) == pytest.approx(2.0)
+        assert queue_seconds('1699999998500', now) == pytest.approx(1.5)
+        assert queue_seconds('t=1699999999000000', now) == pytest.approx(1.0)
+        assert queue_seconds('garbage', now) == 0.0
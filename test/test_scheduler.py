@@ -0,0 +1,99 @@
+from conftest import POST
+
+
+class TestScheduler:
+    """Тесты фонового планировщика: пинг БД, прогрев и обновление кэша"""
+
+    def test_jobs_run_and_report(self, app, client, auth):
+        from utilities import scheduler
+
+        scheduler.run_pending()
+        stats = client.get('/api/scheduler', headers=auth).json
+
+        assert set(stats['jobs']) == {'db_ping', 'cache_refresh', 'cache_warm', 'search_reload'}
+        assert all(job['runs'] == 1 and job['failures'] == 0 for job in stats['jobs'].values())
+        body = client.get('/api/metrics', headers=auth).get_data(as_text=True)
+        assert 'ccrayp_scheduler_db_ping_runs_total 1' in body
+
+    def test_failures_are_counted(self, app):
+        from utilities import scheduler
+
+        def fail():
+            raise RuntimeError('database is asleep')
+
+        scheduler.add('failing', 60, fail)
+        scheduler.run(scheduler.jobs['failing'])
+
+        assert scheduler.stats()['jobs']['failing']['failures'] == 1
+        assert scheduler.stats()['jobs']['failing']['last_error'] == 'database is asleep'
+
+    def test_warm_job_fills_cache(self, app, client, auth):
+        from utilities import cache, scheduler
+
+        client.post('/api/post/new', data=POST, headers=auth)
+        cache.clear()
+
+        scheduler.run(scheduler.jobs['cache_warm'])
+
+        assert cache.get('posts', 'list?sort=id&order=asc') is not None
+
+    def test_refresh_extends_unchanged_and_rebuilds_changed(self, app, client, auth):
+        from utilities import cache
+
+        client.post('/api/post/new', data=POST, headers=auth)
+        client.get('/api/post/list', headers={'Accept-Encoding': 'gzip'})
+        entry = cache.get('posts', 'list?sort=id&order=asc')
+        entry.expires_at = 0
+
+        with app.app_context():
+            assert cache.refresh(10) == 1
+        assert cache.get('posts', 'list?sort=id&order=asc') is entry
+
+        with app.app_context():
+            from utilities import db
+            from models.post import Post
+
+            db.session.get(Post, 1).label = 'Renamed'
+            db.session.commit()
+
+            entry.expires_at = 0
+            cache.refresh(10)
+
+        refreshed = cache.get('posts', 'list?sort=id&order=asc')
+        assert refreshed is not entry
+        assert b'Renamed' in refreshed.body
+
+    def test_refresh_skips_entries_without_hits(self, app, client, auth):
+        from utilities import cache
+
+        client.post('/api/post/new', data=POST, headers=auth)
+        client.get('/api/post/list')
+        entry = cache.get('posts', 'list?sort=id&order=asc')
+        entry.expires_at = 0
+
+        with app.app_context():
+            assert cache.refresh(10) == 1
+            entry.expires_at = 0
+            # Запросов с прошлого обновления не было, запись просто истечёт
+            assert cache.refresh(10) == 0
+
+        assert cache.get('posts', 'list?sort=id&order=asc') is None
+        client.get('/api/post/list')
+        cache.get('posts', 'list?sort=id&order=asc').expires_at = 0
+        with app.app_context():
+            assert cache.refresh(10) == 1
+
+    def test_started_once_per_process(self, app):
+        from utilities import scheduler
+
+        scheduler.enabled = True
+        try:
+            scheduler.start()
+            thread = scheduler._thread
+            scheduler.start()
+
+            assert scheduler._thread is thread
+            assert scheduler.stats()['running']
+        finally:
+            scheduler.stop()
+            scheduler.enabled = False
@@ -0,0 +1,117 @@
+from conftest import POST, PROJECT
+
+
+class TestSearch:
+    """Тесты полнотекстового поиска по постам и проектам (in-memory индекс для SQLite)"""
+
+    def test_ranked_results_across_types(self, client, auth):
+        client.post('/api/post/new', data=POST, headers=auth)
+        client.post('/api/post/new', data={**POST, 'label': 'Flask tips', 'text': 'Flask blueprints and Flask config'}, headers=auth)
+        client.post('/api/project/new', data=PROJECT, headers=auth)
+
+        response = client.get('/api/search?q=flask')
+
+        assert response.status_code == 200
+        items = response.json['items']
+        assert [(item['type'], item['id']) for item in items] == [('post', 2), ('project', 1)]
+        assert items[0]['rank'] > items[1]['rank']
+        assert '<mark>Flask</mark>' in items[0]['highlight']
+        assert response.json['next_offset'] is None
+
+    def test_all_words_must_match(self, client, auth):
+        client.post('/api/post/new', data=POST, headers=auth)
+        client.post('/api/project/new', data=PROJECT, headers=auth)
+
+        assert client.get('/api/search?q=полуфинал icpc').json['items'][0]['id'] == 1
+        assert client.get('/api/search?q=icpc flask').json['items'] == []
+        assert client.get('/api/search?q=postgresql&type=post').json['items'] == []
+
+    def test_pagination(self, client, auth):
+        client.post('/api/post/bulk/new', json=[{**POST, 'label': f'ICPC {index}'} for index in range(5)], headers=auth)
+
+        first = client.get('/api/search?q=icpc&limit=2').json
+        second = client.get(f'/api/search?q=icpc&limit=2&offset={first["next_offset"]}').json
+
+        assert len(first['items']) == 2 and first['next_offset'] == 2
+        assert not {item['id'] for item in first['items']} & {item['id'] for item in second['items']}
+
+    def test_index_follows_writes(self, client, auth):
+        client.post('/api/post/new', data=POST, headers=auth)
+        assert len(client.get('/api/search?q=icpc').json['items']) == 1
+
+        client.put('/api/post/update/1', data={**POST, 'label': 'Regional final', 'text': 'Results'}, headers=auth)
+        assert client.get('/api/search?q=icpc').json['items'] == []
+        assert client.get('/api/search?q=regional').json['items'][0]['id'] == 1
+
+        client.delete('/api/post/delete/1', headers=auth)
+        assert client.get('/api/search?q=regional').json['items'] == []
+
+    def test_committed_write_survives_index_errors(self, app, client, auth, monkeypatch):
+        from services.post_service import PostService
+        from services.search_service import search_index
+
+        client.post('/api/post/new', data=POST, headers=auth)
+        assert client.get('/api/search?q=icpc').status_code == 200
+        assert len(client.get('/api/post/list').json) == 1
+
+        # Values the routes reject still must not break the index after the commit
+        with app.app_context():
+            PostService.bulk_new_posts([{**POST, 'label': 123}])
+
+        assert len(client.get('/api/post/list').json) == 2
+        assert client.get('/api/search?q=123').json['items'][0]['id'] == 2
+
+        def broken(*args):
+            raise RuntimeError('index is broken')
+
+        monkeypatch.setattr(search_index, 'put', broken)
+        assert client.post('/api/post/new', data=POST, headers=auth).status_code == 201
+
+        assert len(client.get('/api/post/list').json) == 3
+
+    def test_highlight_is_escaped(self, client, auth):
+        client.post('/api/post/new', data={**POST, 'text': '<script>alert(1)</script> ICPC & co'}, headers=auth)
+
+        highlight = client.get('/api/search?q=icpc').json['items'][0]['highlight']
+
+        assert highlight == '&lt;script&gt;alert(1)&lt;/script&gt; <mark>ICPC</mark> &amp; co'
+
+    def test_reload_keeps_concurrent_writes(self, app, client, auth, monkeypatch):
+        from services.search_service import SearchIndex, search_index
+
+        client.post('/api/post/new', data=POST, headers=auth)
+        assert client.get('/api/search?q=icpc').json['items'][0]['id'] == 1
+
+        # A write of another worker, visible only after a reload
+        with app.app_context():
+            from sqlalchemy import update
+            from models.post import Post
+            from utilities import db
+            db.session.execute(update(Post).where(Post.id == 1).values(label='Regional final'))
+            db.session.commit()
+
+        assert client.get('/api/search?q=regional').json['items'] == []
+        with app.app_context():
+            search_index.reload()
+        assert client.get('/api/search?q=regional').json['items'][0]['id'] == 1
+
+        load = SearchIndex._load
+
+        def concurrent_load(index):
+            load(index)
+            search_index.remove('post', [1])
+
+        monkeypatch.setattr(SearchIndex, '_load', concurrent_load)
+        with app.app_context():
+            search_index.reload()
+
+        assert client.get('/api/search?q=regional').json['items'] == []
+
+    def test_invalid_parameters(self, client):
+        assert client.get('/api/search').status_code == 400
+        assert client.get('/api/search?q=a&type=technology').status_code == 400
+        assert client.get('/api/search?q=a&limit=0').status_code == 400
+        assert client.get('/api/search?q=a&offset=-1').status_code == 400
+        # str.isdigit() принимает и надстрочные цифры, int() на них падает
+        assert client.get('/api/search?q=a&offset=%C2%B2').status_code == 400
+        assert client.get('/api/search?q=a&limit=%C2%B2').status_code == 400
@@ -0,0 +1,30 @@
+from conftest import POST
+
+
+class TestSerializers:
+    """Тесты сериализаторов моделей и параметра fields"""
+
+    def test_list_contains_all_columns(self, client, auth):
+        client.post('/api/post/new', data=POST, headers=auth)
+
+        post = client.get('/api/post/list').json[0]
+        assert set(post) == {'id', 'label', 'text', 'img', 'img_url', 'img_srcset', 'date', 'link', 'mode'}
+        assert post['mode'] is True
+
+    def test_list_projection(self, client, auth):
+        client.post('/api/post/new', data=POST, headers=auth)
+
+        response = client.get('/api/post/list?fields=id,label')
+        assert response.status_code == 200
+        assert response.json == [{'id': 1, 'label': POST['label']}]
+
+    def test_by_id_projection(self, client, auth):
+        client.post('/api/post/new', data=POST, headers=auth)
+
+        response = client.get('/api/post/1?fields=text', headers=auth)
+        assert response.json == {'text': POST['text']}
+
+    def test_unknown_field(self, client):
+        response = client.get('/api/post/list?fields=id,password')
+        assert response.status_code == 400
+        assert 'password' in response.json['message']
@@ -0,0 +1,112 @@
+import gzip
+
+import pytest
+
+from conftest import CREDENTIALS, POST
+from conftest import TECHNOLOGY
+
+
+@pytest.fixture
+def app(make_app, tmp_path):
+    return make_app(SNAPSHOT_DIR=str(tmp_path))
+
+
+class TestSnapshot:
+    """Тесты статических снапшотов публичных списков"""
+
+    def test_write_exports_lists(self, app, client, auth, tmp_path):
+        client.post('/api/post/new', data=POST, headers=auth)
+        client.post('/api/technology/new', data=TECHNOLOGY, headers=auth)
+
+        body = (tmp_path / 'api/post/list.json').read_bytes()
+        assert gzip.decompress((tmp_path / 'api/post/list.json.gz').read_bytes()) == body
+        assert (tmp_path / 'api/technology/list/lang_tech.json').exists()
+        assert not (tmp_path / 'api/project/list.json').exists()
+
+        response = client.get('/api/post/list')
+        assert response.status_code == 200
+        assert response.data == body
+        assert response.headers['Access-Control-Allow-Origin'] == '*'
+
+    def test_served_without_database(self, app, client, auth, monkeypatch):
+        from services.post_service import PostService
+
+        client.post('/api/post/new', data=POST, headers=auth)
+
+        def unavailable(*args, **kwargs):
+            raise RuntimeError('database is asleep')
+
+        monkeypatch.setattr(PostService, 'get_all_posts', unavailable)
+
+        assert client.get('/api/post/list').json[0]['label'] == POST['label']
+        assert client.get('/api/post/list?limit=1').status_code == 500
+        assert app.extensions['snapshot'].hits == 1
+
+    def test_conditional_and_compressed(self, client, auth):
+        client.post('/api/post/bulk/new', json=[POST] * 10, headers=auth)
+
+        response = client.get('/api/post/list', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert len(gzip.decompress(response.data)) > len(response.data)
+
+        etag = response.headers['ETag']
+        again = client.get('/api/post/list', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        assert again.status_code == 304
+
+    def test_protected_lists_stay_behind_jwt(self, client, auth, tmp_path):
+        client.post('/api/technology/new', data=TECHNOLOGY, headers=auth)
+
+        assert (tmp_path / 'api/technology/list/lang_tech.json').exists()
+        assert client.get('/api/technology/list/lang_tech').status_code == 401
+
+    def test_delete_removes_export(self, client, auth, tmp_path):
+        client.post('/api/post/new', data=POST, headers=auth)
+        client.delete('/api/post/delete/1', headers=auth)
+
+        assert not (tmp_path / 'api/post/list.json').exists()
+        assert client.get('/api/post/list').status_code == 404
+
+    def test_cli_export(self, app, client, auth, tmp_path):
+        client.post('/api/post/new', data=POST, headers=auth)
+        (tmp_path / 'api/post/list.json').unlink()
+
+        result = app.test_cli_runner().invoke(args=['export-snapshot'])
+
+        assert '/api/post/list: written' in result.output
+        assert (tmp_path / 'api/post/list.json').exists()
+
+    def test_export_skips_worker_cache(self, app, client, auth, tmp_path):
+        from sqlalchemy import text
+
+        from services.post_service import PostService
+        from utilities import db, snapshot
+
+        client.post('/api/post/new', data=POST, headers=auth)
+        with app.app_context():
+            PostService.get_all_posts_json()
+            db.session.execute(text("UPDATE posts SET label = 'Renamed'"))
+            db.session.commit()
+
+        snapshot.export(('posts',))
+
+        assert b'Renamed' in (tmp_path / 'api/post/list.json').read_bytes()
+
+    def test_older_export_does_not_overwrite(self, make_app, tmp_path):
+        import json
+
+        from utilities import snapshot
+
+        app = make_app(SNAPSHOT_DIR=str(tmp_path / 'snapshot'), CACHE_VERSION_STORAGE=str(tmp_path / 'versions.sqlite'))
+        client = app.test_client()
+        auth = {'Authorization': f'Bearer {client.post("/api/login", json=CREDENTIALS).json["access_token"]}'}
+        client.post('/api/post/new', data=POST, headers=auth)
+
+        stamps = tmp_path / 'snapshot' / '.versions.json'
+        assert json.loads(stamps.read_text())['/api/post/list'] == {'posts': 1}
+
+        # Другой воркер уже выгрузил более новую версию
+        stamps.write_text(json.dumps({'/api/post/list': {'posts': 5}}))
+        (tmp_path / 'snapshot/api/post/list.json').write_bytes(b'[]')
+
+        assert snapshot.export(('posts',)) == {'/api/post/list': False}
+        assert (tmp_path / 'snapshot/api/post/list.json').read_bytes() == b'[]'
@@ -0,0 +1,89 @@
+from sqlalchemy import insert
+
+from conftest import PROJECT, TECHNOLOGY
+
+
+class TestStacks:
+    """Тесты связей проектов с технологиями (таблица project_technologies)"""
+
+    def create_technologies(self, client, auth):
+        client.post('/api/technology/bulk/new', json=[{**TECHNOLOGY, 'label': 'Flask'}, TECHNOLOGY, {**TECHNOLOGY, 'label': 'Docker'}], headers=auth)
+
+    def test_projects_by_technology(self, client, auth):
+        self.create_technologies(client, auth)
+        client.post('/api/project/new', data=PROJECT, headers=auth)
+        client.post('/api/project/new', data={**PROJECT, 'label': 'bot', 'stack': 'python; docker'}, headers=auth)
+
+        response = client.get('/api/project/list/technology/2?fields=id,label')
+
+        assert response.status_code == 200
+        assert response.json == [{'id': 1, 'label': 'ccrayp-api'}, {'id': 2, 'label': 'bot'}]
+        assert [project['id'] for project in client.get('/api/project/list/technology/1').json] == [1]
+        assert client.get('/api/project/list/technology/99').status_code == 404
+
+    def test_technologies_by_project(self, client, auth):
+        self.create_technologies(client, auth)
+        client.post('/api/project/new', data=PROJECT, headers=auth)
+
+        assert client.get('/api/technology/list/project/1').status_code == 401
+
+        response = client.get('/api/technology/list/project/1?fields=label', headers=auth)
+
+        assert response.status_code == 200
+        assert response.json == [{'label': 'Flask'}, {'label': 'Python'}]
+
+    def test_links_follow_writes(self, client, auth):
+        client.post('/api/project/new', data=PROJECT, headers=auth)
+        assert client.get('/api/project/list/technology/1').status_code == 404
+
+        # Технология, добавленная позже, связывается с уже существующими проектами
+        self.create_technologies(client, auth)
+        assert len(client.get('/api/project/list/technology/1').json) == 1
+
+        client.put('/api/project/update/1', data={**PROJECT, 'stack': 'Docker'}, headers=auth)
+        assert client.get('/api/project/list/technology/1').status_code == 404
+        assert len(client.get('/api/project/list/technology/3').json) == 1
+
+        client.delete('/api/technology/bulk/delete', json=[3], headers=auth)
+        assert client.get('/api/technology/list/project/1', headers=auth).status_code == 404
+
+    def test_technology_writes_relink_matching_projects_only(self, client, auth, monkeypatch):
+        from services.project_service import ProjectService
+
+        self.create_technologies(client, auth)
+        client.post('/api/project/new', data=PROJECT, headers=auth)
+        client.post('/api/project/new', data={**PROJECT, 'label': 'bot', 'stack': 'python; docker'}, headers=auth)
+        client.post('/api/project/new', data={**PROJECT, 'label': 'site', 'stack': 'React'}, headers=auth)
+
+        relinked = []
+        link_technologies = ProjectService.link_technologies
+        monkeypatch.setattr(ProjectService, 'link_technologies', lambda stacks: relinked.append(set(stacks)) or link_technologies(stacks))
+
+        # Переименование затрагивает проекты со старым и с новым названием
+        client.put('/api/technology/update/3', data={**TECHNOLOGY, 'label': 'React'}, headers=auth)
+        assert relinked == [{2, 3}]
+        assert [project['id'] for project in client.get('/api/project/list/technology/3').json] == [3]
+
+        client.post('/api/technology/bulk/new', json=[{**TECHNOLOGY, 'label': 'Rust'}], headers=auth)
+        assert relinked == [{2, 3}]
+
+        client.put('/api/technology/bulk/update', json=[{**TECHNOLOGY, 'id': 1, 'label': 'Docker'}], headers=auth)
+        assert relinked == [{2, 3}, {1, 2}]
+        assert [project['id'] for project in client.get('/api/project/list/technology/1').json] == [2]
+
+    def test_migration_links_existing_stacks(self, app, client, auth):
+        from migrations import link_project_stacks
+        from models.projects import Project
+        from utilities import db
+
+        self.create_technologies(client, auth)
+        with app.app_context():
+            # Проект, записанный в обход сервиса, как строки до миграции
+            db.session.execute(insert(Project), [{**PROJECT, 'stack': 'Flask, Rust', 'mode': True}])
+            db.session.commit()
+
+            linked, unknown = link_project_stacks()
+
+        assert linked == 1
+        assert unknown == {'rust'}
+        assert [technology['label'] for technology in client.get('/api/technology/list/project/1', headers=auth).json] == ['Flask']
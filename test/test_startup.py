@@ -0,0 +1,49 @@
+class TestStartup:
+    """Тесты ленивого старта: Swagger по первому запросу, предсобранная спецификация, тайминги"""
+
+    def test_spec_is_built_on_first_docs_request(self, client):
+        response = client.get('/apispec_1.json')
+
+        assert response.status_code == 200
+        assert '/api/post/list' in response.json['paths']
+        assert 'get' in response.json['paths']['/api/post/{id}']
+        assert client.get('/apidocs/').status_code == 200
+
+    def test_precompiled_spec_is_served(self, app, monkeypatch, tmp_path):
+        import apidocs
+
+        spec = tmp_path / 'apispec_1.json'
+        monkeypatch.setattr(apidocs, 'APISPEC_FILE', str(spec))
+
+        result = app.test_cli_runner().invoke(args=['build-apispec'])
+        assert result.exit_code == 0
+        assert spec.exists()
+
+        spec.write_text('{"paths": {}}')
+        response = app.test_client().get('/apispec_1.json')
+
+        assert response.json == {'paths': {}}
+
+    def test_startup_timing_in_metrics(self, client, auth):
+        body = client.get('/api/metrics', headers=auth).get_data(as_text=True)
+
+        assert 'ccrayp_startup_import_seconds' in body
+        assert 'ccrayp_startup_init_seconds' in body
+
+    def test_warm_caches_fills_list_entries(self, app, client, auth):
+        from app import warm_caches
+        from utilities import cache
+        from conftest import POST
+
+        client.post('/api/post/new', data=POST, headers=auth)
+        cache.clear()
+
+        warm_caches(app)
+
+        assert cache.get('posts', 'list?sort=id&order=asc') is not None
+
+    def test_unknown_path_is_json_404(self, client):
+        response = client.get('/api/unknown')
+
+        assert response.status_code == 404
+        assert response.json == {'message': "path wasn't found"}
@@ -0,0 +1,38 @@
+import json
+
+from conftest import POST
+from conftest import TECHNOLOGY
+
+
+class TestStreaming:
+    """Тесты потоковой отдачи списков (JSON-массив и NDJSON)"""
+
+    def test_streamed_array_matches_regular_list(self, app, client, auth):
+        app.config['STREAM_BATCH_SIZE'] = 2
+        client.post('/api/post/bulk/new', json=[{**POST, 'label': f'Post {index}'} for index in range(5)], headers=auth)
+
+        response = client.get('/api/post/list?stream=true')
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.headers['Content-Type'] == 'application/json'
+        assert response.json == client.get('/api/post/list').json
+
+    def test_ndjson(self, app, client, auth):
+        app.config['STREAM_BATCH_SIZE'] = 2
+        client.post('/api/post/bulk/new', json=[{**POST, 'label': f'Post {index}'} for index in range(3)], headers=auth)
+
+        response = client.get('/api/post/list?fields=id,label&sort=id&order=desc', headers={'Accept': 'application/x-ndjson'})
+
+        assert response.headers['Content-Type'] == 'application/x-ndjson'
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line) for line in lines] == [{'id': 3, 'label': 'Post 2'}, {'id': 2, 'label': 'Post 1'}, {'id': 1, 'label': 'Post 0'}]
+
+    def test_other_lists(self, client, auth):
+        client.post('/api/technology/new', data=TECHNOLOGY, headers=auth)
+
+        assert client.get('/api/technology/list?stream=true&fields=label').json == [{'label': 'Python'}]
+        assert client.get('/api/project/list?stream=true').status_code == 404
+
+    def test_pagination_is_rejected(self, client):
+        assert client.get('/api/post/list?stream=true&limit=2').status_code == 400
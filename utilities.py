@@ -1,31 +1,556 @@
-from flasgger import Swagger
+import base64
+import json as jsonlib
+import re
+from collections.abc import Mapping
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import chain
+from operator import attrgetter
+from typing import NamedTuple
+from urllib.parse import parse_qs, quote
+
+from flask import current_app, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_sqlalchemy import SQLAlchemy
-from flask_jwt_extended import JWTManager
+from sqlalchemy import select, text, tuple_
 from werkzeug.security import generate_password_hash
 
+import images
+from apidocs import LazySwagger
+from auth import CachingJWTManager, LoginGuard
+from async_database import AsyncDatabase
+from cache import ResponseCache
+from compression import Compression
+from config import Config
+from instrumentation import Instrumentation, access_logger, timer
+from metrics import Metrics
+from ratelimit import RateLimiter, forwarded_address
+from scheduler import Scheduler
+from snapshot import Snapshot
+
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask JSON provider on orjson when it is installed (JSON_ENCODER: auto, orjson, stdlib).
+
+    Both encoders produce the same data: ISO dates, Decimals as strings, row
+    mappings as objects, sorted keys, non-ASCII text as UTF-8 rather than
+    \\u escapes. dumps_bytes() is what response bodies use, orjson writes them
+    without an intermediate str.
+    """
+
+    # orjson has no ASCII mode, the stdlib follows it
+    ensure_ascii = False
+
+    def __init__(self, app):
+        super().__init__(app)
+
+        encoder = app.config.get('JSON_ENCODER', 'auto')
+        if encoder == 'orjson' and orjson is None:
+            raise RuntimeError('JSON_ENCODER is orjson, but orjson is not installed')
+        self.encoder = 'orjson' if orjson is not None and encoder != 'stdlib' else 'stdlib'
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, date):
+            return o.isoformat()
+        if isinstance(o, Decimal):
+            return str(o)
+        if isinstance(o, Mapping):
+            return dict(o)
+
+        return DefaultJSONProvider.default(o)
+
+    def dumps_bytes(self, obj) -> bytes:
+        if self.encoder == 'orjson':
+            try:
+                return orjson.dumps(obj, default=self.default, option=orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+            except TypeError:
+                # Non-string keys or integers beyond 64 bits, the stdlib handles those
+                pass
+
+        return jsonlib.dumps(
+            obj, default=self.default, ensure_ascii=self.ensure_ascii, sort_keys=self.sort_keys, separators=(',', ':')
+        ).encode('utf-8')
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs or self.encoder != 'orjson':
+            return super().dumps(obj, **kwargs)
+
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        # Debug mode pretty-prints through the stdlib
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
+
 
 db = SQLAlchemy()
-swagger = Swagger()
-jwt = JWTManager()
+swagger = LazySwagger()
+jwt = CachingJWTManager()
+login_guard = LoginGuard()
+cache = ResponseCache()
+compression = Compression()
+instrumentation = Instrumentation()
+metrics = Metrics()
+async_db = AsyncDatabase()
+scheduler = Scheduler()
+snapshot = Snapshot()
+rate_limiter = RateLimiter()
+
+
+def pool_stats() -> dict[str, any]:
+    pool = db.engine.pool
+    stats = {'pool': type(pool).__name__}
+
+    if hasattr(pool, 'checkedout'):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+
+    return stats
+
+
+def ping_database():
+    db.session.execute(text('SELECT 1'))
+
+
+def client_address() -> str:
+    return forwarded_address(request.environ, current_app.config['TRUSTED_PROXIES'])
 
 
 def check_method(current: str, targer: str) -> bool:
     return current.upper() == targer.upper()
 
 
-def image_url(path: str) -> str:
-    return 'https://raw.githubusercontent.com/ccrayp/ccrayp/refs/heads/main/assets/' + path
+def asset_url(variant: str) -> str:
+    return f'{Config.ASSETS_URL}/assets/{quote(variant)}'
 
 
-def json(project) -> dict[str, any]:
-    if not project:
-        return {}
-        
-    result = {}
-    for key, value in project.__dict__.items():
-        if key.startswith('_'):
+def image_sources(path: str) -> dict[str, str] | None:
+    sources = images.variants(path)
+    if not sources:
+        return None
+
+    return {
+        format: ', '.join(f'{asset_url(variant)} {width}w' for width, variant in sizes)
+        for format, sizes in sources.items()
+    }
+
+
+def image_url(path: str, width: int | None = None, format: str = 'webp') -> str:
+    sources = images.variants(path)
+    if not sources:
+        return 'https://raw.githubusercontent.com/ccrayp/ccrayp/refs/heads/main/assets/' + path
+
+    sizes = sources.get(format) or next(iter(sources.values()))
+    fitting = [variant for size, variant in sizes if width is None or size >= width]
+    return asset_url(fitting[0] if width is not None and fitting else sizes[-1][1])
+
+
+def image_fields(row: dict) -> dict:
+    # Built variants of img for the clients: the one to show and a srcset per format
+    if isinstance(row.get('img'), str):
+        row['img_url'] = image_url(row['img'], Config.IMAGE_WIDTH)
+        row['img_srcset'] = image_sources(row['img'])
+
+    return row
+
+
+DATE_FORMATS = ('%Y-%m-%d', '%d.%m.%Y', '%d.%m.%y', '%d/%m/%Y')
+
+
+def parse_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+
+    value = str(value).strip()
+    for format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, format).date()
+        except ValueError:
+            continue
+
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        raise ValueError(f'Invalid date {value}. Expected YYYY-MM-DD')
+
+
+def parse_mode(value) -> bool:
+    return value is True or str(value).lower() == 'true'
+
+
+def check_item_values(item: dict, fields: list[str]):
+    # Values are checked up front, so a bad item is an error result and not a failed transaction
+    for field in fields:
+        if field == 'id':
             continue
+        if field == 'mode':
+            if not isinstance(item['mode'], bool) and item['mode'] not in ('true', 'false'):
+                raise ValueError(f'Invalid mode {item["mode"]!r}. Expected true or false')
+        elif not isinstance(item[field], str):
+            raise ValueError(f'Field {field} must be a string')
+
+
+def bulk_items(data, required_fields: list[str], max_items: int, validate=None) -> tuple[list, list]:
+    if not isinstance(data, list) or not data:
+        raise ValueError('Expected a non-empty JSON array')
+    if len(data) > max_items:
+        raise ValueError(f'Too many items. Maximum is {max_items}')
+
+    items, errors = [], []
+    for index, item in enumerate(data):
+        if not isinstance(item, dict):
+            errors.append({'index': index, 'status': 'error', 'message': 'Error. Item must be an object'})
+            continue
+
+        missing_fields = [field for field in required_fields if field not in item]
+        if missing_fields:
+            errors.append({
+                'index': index,
+                'status': 'error',
+                'message': f'Error. Missing required fields: {", ".join(missing_fields)}'
+            })
+            continue
+
+        try:
+            check_item_values(item, required_fields)
+            if validate:
+                validate(item)
+        except (ValueError, TypeError) as e:
+            errors.append({'index': index, 'status': 'error', 'message': f'Error. {str(e)}'})
+            continue
+
+        items.append((index, item))
+
+    return items, errors
+
+
+STACK_SEPARATORS = re.compile(r'[,;|\n]')
+
+
+def parse_stack(value: str | None) -> list[str]:
+    return list(dict.fromkeys(tag.strip().lower() for tag in STACK_SEPARATORS.split(value or '') if tag.strip()))
+
+
+def check_item_id(item: dict):
+    if not isinstance(item['id'], int) or isinstance(item['id'], bool) or item['id'] < 0:
+        raise ValueError('Invalid id')
+
+
+def bulk_ids(data, max_items: int) -> list[int]:
+    if not isinstance(data, list) or not data:
+        raise ValueError('Expected a non-empty JSON array of ids')
+    if len(data) > max_items:
+        raise ValueError(f'Too many items. Maximum is {max_items}')
+    if not all(isinstance(id, int) and not isinstance(id, bool) and id >= 0 for id in data):
+        raise ValueError('Ids must be non-negative integers')
+
+    return data
+
+
+def bulk_results(results: list[dict]) -> list[dict]:
+    return sorted(results, key=lambda result: result['index'])
+
+
+_serializers = {}
+
+
+def model_fields(model) -> tuple[str, ...]:
+    return tuple(attribute.key for attribute in model.__mapper__.column_attrs)
+
+
+def parse_fields(model, value: str | None) -> tuple[str, ...] | None:
+    if not value:
+        return None
+
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in model_fields(model)]
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+
+    return fields or None
+
+
+def serializer(model, fields: tuple[str, ...] | None = None):
+    key = (model, fields)
+    if key not in _serializers:
+        names = fields or model_fields(model)
+        getter = attrgetter(*names)
+
+        if len(names) == 1:
+            _serializers[key] = lambda item: {names[0]: getter(item)}
+        else:
+            _serializers[key] = lambda item: dict(zip(names, getter(item)))
+
+    return _serializers[key]
+
+
+def select_columns(model, fields: tuple[str, ...] | None = None):
+    table = model.__table__
+    return select(*(table.c[name] for name in fields or model_fields(model)))
+
+
+class Page(NamedTuple):
+    limit: int | None = None
+    cursor: tuple | None = None
+    mode: bool | None = None
+    sort: str = 'id'
+    order: str = 'asc'
+
+    @property
+    def paginated(self) -> bool:
+        return self.limit is not None
+
+    def key(self) -> str:
+        params = [f'sort={self.sort}', f'order={self.order}']
+        if self.mode is not None:
+            params.append(f'mode={str(self.mode).lower()}')
+        if self.paginated:
+            params.append(f'limit={self.limit}')
+        if self.cursor is not None:
+            params.append(f'cursor={encode_cursor(self.cursor)}')
+
+        return '&'.join(params)
+
+
+def encode_cursor(values: tuple) -> str:
+    raw = jsonlib.dumps(list(values), separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, convert=int) -> tuple:
+    try:
+        values = jsonlib.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != 2 or not isinstance(values[1], int):
+            raise ValueError
+
+        return convert(values[0]), values[1]
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+
+def parse_page(args, sorts: dict | None = None, max_limit: int = 100) -> Page:
+    sorts = sorts or {'id': int}
+
+    sort = args.get('sort', 'id')
+    if sort not in sorts:
+        raise ValueError(f'Invalid sort {sort}. Allowed: {", ".join(sorts)}')
+
+    order = args.get('order', 'asc').lower()
+    if order not in ('asc', 'desc'):
+        raise ValueError(f'Invalid order {order}')
+
+    mode = args.get('mode')
+    if mode is not None:
+        if mode not in ('true', 'false'):
+            raise ValueError(f'Invalid mode {mode}')
+        mode = mode == 'true'
+
+    cursor = args.get('cursor')
+    if cursor is not None:
+        cursor = decode_cursor(cursor, sorts[sort])
+
+    limit = args.get('limit')
+    if limit is not None:
+        if not (limit.isascii() and limit.isdigit()) or not 0 < int(limit) <= max_limit:
+            raise ValueError(f'Invalid limit {limit}. Must be between 1 and {max_limit}')
+        limit = int(limit)
+    elif cursor is not None:
+        limit = max_limit
+
+    return Page(limit, cursor, mode, sort, order)
+
+
+def select_page(model, fields: tuple[str, ...] | None, page: Page):
+    table = model.__table__
+    names = fields or model_fields(model)
+    extra = [name for name in dict.fromkeys(('id', page.sort)) if name not in names]
+    statement = select(*(table.c[name] for name in (*names, *extra)))
+
+    if page.mode is not None:
+        statement = statement.where(table.c.mode == page.mode)
+
+    key = table.c.id
+    column = table.c[page.sort]
+    bound = key if page.sort == 'id' else tuple_(column, key)
+
+    if page.cursor is not None:
+        value = page.cursor[1] if page.sort == 'id' else tuple_(*page.cursor)
+        statement = statement.where(bound > value if page.order == 'asc' else bound < value)
+
+    if page.sort == 'id':
+        order_by = [key.asc() if page.order == 'asc' else key.desc()]
+    else:
+        order_by = [column.asc(), key.asc()] if page.order == 'asc' else [column.desc(), key.desc()]
+    statement = statement.order_by(*order_by)
+
+    if page.paginated:
+        # One extra row tells whether there is a next page
+        statement = statement.limit(page.limit + 1)
+
+    return statement
+
+
+def cache_key(name: str, fields: tuple[str, ...] | None = None, page: Page | None = None) -> str:
+    params = []
+    if fields:
+        params.append(f'fields={",".join(fields)}')
+    if page is not None:
+        params.append(page.key())
+
+    if not params:
+        return name
+
+    return f'{name}?{"&".join(params)}'
+
+
+@contextmanager
+def after_commit(*collections: str):
+    # Bumps the cache and runs the block's index updates for a committed write. A failure here
+    # must not turn the write into an error response: it is logged, the cache TTL and the
+    # search reload job bound the staleness it leaves
+    try:
+        cache.bump(*collections)
+        yield
+    except Exception as e:
+        access_logger.warning(jsonlib.dumps({'warning': 'post-commit update failed', 'collections': collections, 'error': str(e)}))
+
+
+def json(item, fields: tuple[str, ...] | None = None) -> dict[str, any]:
+    if not item:
+        return {}
+
+    return image_fields(serializer(type(item), fields)(item))
+
+
+def dumps(data) -> bytes:
+    with timer('serialize'):
+        return current_app.json.dumps_bytes(data)
+
+
+def json_one(item, fields: tuple[str, ...] | None = None) -> bytes | None:
+    if not item:
+        return None
+
+    return dumps(json(item, fields))
+
+
+def json_value(data) -> bytes | None:
+    if not data:
+        return None
+
+    return dumps(data)
+
+
+def json_rows(rows) -> bytes | None:
+    if not rows:
+        return None
+
+    return dumps([image_fields(dict(row)) for row in rows])
+
+
+def json_page(model, rows, fields: tuple[str, ...] | None, page: Page) -> bytes | None:
+    if not rows:
+        return None
+
+    names = fields or model_fields(model)
+    items = rows[:page.limit] if page.paginated else rows
+    data = [image_fields({name: row[name] for name in names}) for row in items]
+
+    if not page.paginated:
+        return dumps(data)
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        last = items[-1]
+        next_cursor = encode_cursor((last[page.sort], last['id']))
+
+    return dumps({'items': data, 'next_cursor': next_cursor})
+
+
+def json_response(payload: bytes):
+    return current_app.response_class(payload, mimetype='application/json')
+
+
+def cached_response(entry, private: bool = False):
+    encoding, body = compression.encode_entry(entry)
+
+    response = json_response(body)
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+        response.set_etag(f'{entry.etag}-{encoding}')
+    else:
+        response.set_etag(entry.etag)
+    response.cache_control.no_cache = True
+    if private:
+        response.cache_control.private = True
+
+    return response.make_conditional(request)
+
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def stream_format(environ) -> str | None:
+    # NDJSON when the Accept header names it, a streamed JSON array with ?stream=true
+    if NDJSON_MIMETYPE in environ.get('HTTP_ACCEPT', ''):
+        return 'ndjson'
+    if parse_qs(environ.get('QUERY_STRING', '')).get('stream') == ['true']:
+        return 'json'
+
+    return None
+
+
+def streamed(statement):
+    # Server-side cursor on Postgres, rows fetched STREAM_BATCH_SIZE at a time
+    return statement.execution_options(yield_per=current_app.config['STREAM_BATCH_SIZE'])
+
+
+def stream_response(result, names: tuple[str, ...], format: str):
+    partitions = result.mappings().partitions()
+    first = next(partitions, None)
+    if not first:
+        result.close()
+        return None
+
+    encode = current_app.json.dumps_bytes
+
+    def generate():
+        try:
+            if format == 'ndjson':
+                for partition in chain([first], partitions):
+                    yield b''.join(encode(image_fields({name: row[name] for name in names})) + b'\n' for row in partition)
+            else:
+                separator = b'['
+                for partition in chain([first], partitions):
+                    yield separator + b','.join(encode(image_fields({name: row[name] for name in names})) for row in partition)
+                    separator = b','
+                yield b']'
+        finally:
+            result.close()
+
+    # The request context (and its session) stays open until the last chunk is sent
+    response = current_app.response_class(
+        stream_with_context(generate()),
+        mimetype=NDJSON_MIMETYPE if format == 'ndjson' else 'application/json'
+    )
+    response.cache_control.no_cache = True
 
-        result[key] = value
-            
-    return result
\ No newline at end of file
+    return response